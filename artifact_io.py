@@ -0,0 +1,110 @@
+import os
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Format des fichiers intermédiaires entre les étapes du pipeline :
+#  - 'feather' : colonnes Arrow typées, relues sans analyse de texte (par défaut si pyarrow est installé)
+#  - 'parquet' : colonnes typées et compressées, fichiers plus petits
+#  - 'csv'     : format texte historique, utilisé en repli si pyarrow est absent
+# Le format peut être imposé avec la variable d'environnement PIPELINE_FORMAT.
+EXTENSIONS = {"feather": ".feather", "parquet": ".parquet", "csv": ".csv"}
+DEFAULT_FORMAT = os.environ.get("PIPELINE_FORMAT", "feather" if HAS_PYARROW else "csv")
+
+
+def artifact_stem(path):
+    """Retire l'extension connue (.csv, .feather, .parquet) d'un chemin d'artefact."""
+    stem, ext = os.path.splitext(path)
+    return stem if ext in EXTENSIONS.values() else path
+
+
+def resolve_artifact(path):
+    """
+    Retourne le fichier existant correspondant à un artefact, quel que soit son format.
+    Si plusieurs formats coexistent, le plus récent est utilisé.
+    :param path: Chemin de l'artefact, avec ou sans extension.
+    """
+    stem = artifact_stem(path)
+    candidates = [stem + ext for ext in EXTENSIONS.values() if os.path.exists(stem + ext)]
+    if not candidates:
+        raise FileNotFoundError(f"Le fichier {stem}.(csv|feather|parquet) n'existe pas.")
+    return max(candidates, key=os.path.getmtime)
+
+
+def save_frame(df, path, fmt=None):
+    """
+    Enregistre un DataFrame intermédiaire en conservant les types de colonnes.
+    :param df: DataFrame à enregistrer (l'index n'est pas conservé).
+    :param path: Chemin de l'artefact, avec ou sans extension.
+    :param fmt: 'feather', 'parquet' ou 'csv' (par défaut DEFAULT_FORMAT).
+    :return: Chemin du fichier écrit.
+    """
+    fmt = fmt or DEFAULT_FORMAT
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Format d'artefact inconnu : {fmt}")
+    if fmt != "csv" and not HAS_PYARROW:
+        fmt = "csv"
+
+    target = artifact_stem(path) + EXTENSIONS[fmt]
+    if fmt == "feather":
+        df.reset_index(drop=True).to_feather(target)
+    elif fmt == "parquet":
+        df.to_parquet(target, index=False)
+    else:
+        df.to_csv(target, index=False, sep=',', encoding='utf-8')
+    return target
+
+
+def load_frame(path, columns=None):
+    """
+    Charge un DataFrame intermédiaire depuis son format binaire ou, à défaut, depuis le CSV.
+    :param path: Chemin de l'artefact, avec ou sans extension.
+    :param columns: Sous-ensemble de colonnes à lire (lecture en colonnes pour les formats binaires).
+    """
+    target = resolve_artifact(path)
+    if target.endswith(EXTENSIONS["feather"]):
+        return pd.read_feather(target, columns=columns)
+    if target.endswith(EXTENSIONS["parquet"]):
+        return pd.read_parquet(target, columns=columns)
+    return pd.read_csv(target, sep=',', encoding='utf-8', usecols=columns)
+
+
+def iter_frames(path, chunksize, columns=None):
+    """
+    Lit un DataFrame intermédiaire par blocs de `chunksize` lignes, sans le charger en entier.
+    Les fichiers feather sont projetés en mémoire et lus lot par lot ; les fichiers parquet sont lus
+    par lots de lignes ; le CSV est lu par blocs.
+    :param path: Chemin de l'artefact, avec ou sans extension.
+    :param columns: Sous-ensemble de colonnes à lire.
+    :return: Générateur de DataFrames (index 0..n-1 propre à chaque bloc).
+    """
+    target = resolve_artifact(path)
+    if target.endswith(EXTENSIONS["csv"]):
+        yield from pd.read_csv(target, sep=',', encoding='utf-8', usecols=columns, chunksize=chunksize)
+        return
+
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+    if target.endswith(EXTENSIONS["feather"]):
+        reader = pa.ipc.open_file(pa.memory_map(target))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    else:
+        batches = pa.parquet.ParquetFile(target).iter_batches(batch_size=chunksize, columns=columns)
+
+    # Les lots du fichier sont regroupés ou redécoupés en blocs de `chunksize` lignes (tranches sans copie)
+    pending = None
+    for batch in batches:
+        if columns is not None and target.endswith(EXTENSIONS["feather"]):
+            batch = batch.select(columns)
+        table = pa.Table.from_batches([batch])
+        pending = table if pending is None else pa.concat_tables([pending, table])
+        while pending.num_rows >= chunksize:
+            yield pending.slice(0, chunksize).to_pandas()
+            pending = pending.slice(chunksize)
+    if pending is not None and pending.num_rows:
+        yield pending.to_pandas()
@@ -0,0 +1,58 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from artifact_io import iter_frames, save_frame
+from feature_transformer import TRANSFORMER_PATH, load_transformer
+from instrumentation import REPORT, stage
+from metrics import positive_scores
+from model_store import ModelStore
+
+
+def score_features(features_path, model_dir, model_name, chunksize=100000, threshold=0.5,
+                   transformer_path=TRANSFORMER_PATH):
+    """
+    Réévalue des comptes à partir de leurs caractéristiques brutes (sortie de feature.py), sans repasser par
+    DataPreparation : chaque bloc lu sur disque passe par le prétraitement appris puis par le modèle.
+    :param features_path: Fichier des caractéristiques brutes (par ex. Datatest/Tache2/Partie1/polluters_features).
+    :param model_dir: Dossier des modèles (ModelStore).
+    :param chunksize: Nombre de comptes évalués à la fois.
+    :param transformer_path: Prétraitement appris par data_preparation.py (feature_transformer.json).
+    :return: DataFrame UserId, Probability, Label.
+    """
+    store = ModelStore(model_dir)
+    model = store.load(model_name)
+    columns = (store.info(model_name) or {}).get("feature_names") or list(model.feature_names_in_)
+    transformer = load_transformer(transformer_path)
+
+    results = []
+    with stage("batch_scoring") as record:
+        for chunk in iter_frames(features_path, chunksize):
+            X = pd.DataFrame(transformer.transform(chunk[columns].to_numpy(dtype=np.float64), columns),
+                             columns=columns)
+            proba = positive_scores(model, X)
+            results.append(pd.DataFrame({"UserId": chunk["UserId"].to_numpy(), "Probability": proba,
+                                         "Label": (proba > threshold).astype("int8")}))
+        scores = pd.concat(results, ignore_index=True) if results else pd.DataFrame(
+            columns=["UserId", "Probability", "Label"])
+        record["rows_out"] = len(scores)
+    return scores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Réévaluation par lots de comptes à partir des caractéristiques brutes")
+    parser.add_argument("features", help="Fichier des caractéristiques brutes (sortie de feature.py)")
+    parser.add_argument("--model", default="RandomForest", help="Nom du modèle")
+    parser.add_argument("--model-dir", default="Datatest/Tache3/Entrainement")
+    parser.add_argument("--transformer", default=TRANSFORMER_PATH, help="Prétraitement appris par data_preparation.py")
+    parser.add_argument("--output", default="Datatest/Tache3/Results/batch_scores", help="Fichier des scores")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    scores = score_features(args.features, args.model_dir, args.model, args.chunksize, args.threshold,
+                            args.transformer)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    output_file = save_frame(scores, args.output)
+    print(f"{len(scores)} comptes évalués ({int(scores['Label'].sum())} pollueurs), scores enregistrés dans {output_file}")
+    REPORT.save()
@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import pandas as pd
+from pipeline import ROOT_DIR, STAGES
+from synthetic_data import BASE_USERS, SUMMARY_FILE
+
+# Étapes chronométrées, dans l'ordre du pipeline
+BENCHMARK_STAGES = ["feature", "data_preparation", "data_final", "model_trainer", "model_evaluator"]
+
+# Référence des mesures (une entrée par configuration de jeu synthétique)
+BASELINE_FILE = os.path.join(ROOT_DIR, "benchmark_baseline.json")
+
+
+def run_stage(script, workdir, env=None):
+    """
+    Exécute le script d'une étape dans un processus séparé et mesure ses ressources.
+    Le pic de mémoire (RSS) est celui du processus de l'étape seul, lu dans ses statistiques de fin (wait4).
+    :return: (durée en secondes, temps CPU en secondes, pic RSS en Mo).
+    """
+    with open(os.path.join(workdir, f"benchmark_{os.path.splitext(script)[0]}.log"), "w") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, script)], cwd=workdir, env=env,
+                                   stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"{script} a échoué (code {process.returncode}), voir {log.name}")
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    peak = usage.ru_maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024)
+    return seconds, usage.ru_utime + usage.ru_stime, peak
+
+
+def stage_rows(stage, summary):
+    """Lignes traitées par une étape : tweets et utilisateurs pour l'extraction, utilisateurs ensuite."""
+    users = sum(rows["users"] for rows in summary["rows"].values())
+    if stage == "feature":
+        return users + sum(rows["tweets"] for rows in summary["rows"].values())
+    return users
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """
+    Compare les mesures à la référence.
+    :return: Liste des régressions (messages) ; une étape est en régression si sa durée ou son pic de
+             mémoire dépasse la référence de plus de la tolérance relative.
+    """
+    regressions = []
+    for stage, measure in results.items():
+        reference = baseline.get(stage)
+        if reference is None:
+            continue
+        if measure["seconds"] > reference["seconds"] * (1 + time_tolerance):
+            regressions.append(f"{stage} : {measure['seconds']:.2f} s contre {reference['seconds']:.2f} s")
+        if measure["peak_rss_mb"] > reference["peak_rss_mb"] * (1 + memory_tolerance):
+            regressions.append(f"{stage} : {measure['peak_rss_mb']:.0f} Mo contre {reference['peak_rss_mb']:.0f} Mo")
+    return regressions
+
+
+class PipelineBenchmark:
+    def __init__(self, workdir, n_users=BASE_USERS, scale=1.0, distribution="poisson", seed=42,
+                 stages=BENCHMARK_STAGES):
+        """
+        Banc d'essai de bout en bout du pipeline sur un jeu de données synthétique.
+        Les étapes sont exécutées dans un dossier de travail séparé (Datasets/ et Datatest/ y sont créés),
+        sans graphiques, dans l'ordre du pipeline.
+        :param workdir: Dossier de travail du banc d'essai.
+        :param n_users, scale, distribution, seed: Paramètres du jeu synthétique (voir synthetic_data).
+        :param stages: Étapes à chronométrer (les étapes amont doivent déjà avoir produit leurs artefacts).
+        """
+        self.workdir = os.path.abspath(workdir)
+        self.dataset = {"users": n_users, "scale": scale, "distribution": distribution, "seed": seed}
+        self.stages = [stage for stage in STAGES if stage.name in stages]
+        self.key = f"users={int(round(n_users * scale))},distribution={distribution},seed={seed}"
+
+    def prepare(self):
+        """Génère le jeu synthétique, sauf s'il existe déjà avec les mêmes paramètres."""
+        datasets = os.path.join(self.workdir, "Datasets")
+        summary_path = os.path.join(datasets, SUMMARY_FILE)
+        if os.path.exists(summary_path):
+            with open(summary_path, encoding="utf-8") as f:
+                summary = json.load(f)
+            if [summary["users_per_class"], summary["distribution"], summary["seed"]] == \
+                    [int(round(self.dataset["users"] * self.dataset["scale"])), self.dataset["distribution"],
+                     self.dataset["seed"]]:
+                print(f"Jeu synthétique réutilisé : {datasets}")
+                return summary
+        # Génération dans un processus séparé : les étapes sont lancées par fork/exec et héritent du pic
+        # de mémoire du processus parent, qui doit donc rester léger
+        subprocess.run([sys.executable, os.path.join(ROOT_DIR, "synthetic_data.py"), "--output", datasets,
+                        "--users", str(self.dataset["users"]), "--scale", str(self.dataset["scale"]),
+                        "--distribution", self.dataset["distribution"], "--seed", str(self.dataset["seed"])],
+                       check=True)
+        with open(summary_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def run(self):
+        """
+        Exécute et mesure chaque étape.
+        :return: Dictionnaire étape -> {seconds, cpu_seconds, peak_rss_mb, rows, rows_per_second}.
+        """
+        summary = self.prepare()
+        env = dict(os.environ, PIPELINE_PLOTS="0")
+        results = {}
+        for stage in self.stages:
+            print(f"-- Étape {stage.name}...")
+            seconds, cpu_seconds, peak = run_stage(stage.script, self.workdir, env)
+            rows = stage_rows(stage.name, summary)
+            results[stage.name] = {"seconds": round(seconds, 3), "cpu_seconds": round(cpu_seconds, 3),
+                                   "peak_rss_mb": round(peak, 1), "rows": rows,
+                                   "rows_per_second": round(rows / seconds, 1)}
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai de bout en bout du pipeline sur données synthétiques")
+    parser.add_argument("--workdir", default=os.path.join("Benchmark", "run"), help="Dossier de travail")
+    parser.add_argument("--users", type=int, default=BASE_USERS, help="Utilisateurs par classe à l'échelle 1")
+    parser.add_argument("--scale", type=float, default=1.0, help="Facteur d'échelle (ex. 10 ou 100)")
+    parser.add_argument("--distribution", choices=["poisson", "lognormal"], default="poisson")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stages", nargs="*", default=BENCHMARK_STAGES, choices=BENCHMARK_STAGES)
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Fichier JSON des mesures de référence")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Enregistre les mesures comme nouvelle référence au lieu de les comparer")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="Dépassement de durée toléré (0.25 = +25 %%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.15, help="Dépassement de mémoire toléré")
+    args = parser.parse_args()
+
+    benchmark = PipelineBenchmark(args.workdir, args.users, args.scale, args.distribution, args.seed, args.stages)
+    results = benchmark.run()
+
+    with pd.option_context("display.width", 120):
+        print(pd.DataFrame(results).T.to_string())
+    with open(os.path.join(benchmark.workdir, "benchmark_results.json"), "w", encoding="utf-8") as f:
+        json.dump({"dataset": benchmark.key, "stages": results}, f, indent=2)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baselines = json.load(f)
+
+    if args.update_baseline or benchmark.key not in baselines:
+        baselines.setdefault(benchmark.key, {}).update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2)
+        print(f"Référence enregistrée pour {benchmark.key} : {args.baseline}")
+        sys.exit(0)
+
+    regressions = compare(results, baselines[benchmark.key], args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("Régressions par rapport à la référence :")
+        for message in regressions:
+            print(f" - {message}")
+        sys.exit(1)
+    print(f"Aucune régression par rapport à la référence ({benchmark.key}).")
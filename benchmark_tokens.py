@@ -0,0 +1,66 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from token_counter import count_tokens
+
+
+def count_mentions(tweet):
+    """Ancienne version par tweet : nombre de mots commençant par '@'."""
+    return sum(1 for word in tweet.split() if word.startswith('@')) if isinstance(tweet, str) else 0
+
+
+def count_hashtags(tweet):
+    """Ancienne version par tweet : nombre de caractères '#'."""
+    return tweet.count("#") if isinstance(tweet, str) else 0
+
+
+def apply_path(text):
+    """Comptage historique : un appel Python par tweet via Series.apply."""
+    return pd.DataFrame({
+        'URLCount': text.str.contains(r'http://|https://', regex=True, na=False).astype('int64'),
+        'MentionCount': text.apply(count_mentions),
+        'HashtagCount': text.apply(count_hashtags)
+    })
+
+
+def synthetic_tweets(n, seed=42):
+    """Génère `n` tweets artificiels contenant mentions, hashtags et URLs."""
+    rng = np.random.default_rng(seed)
+    words = np.array(["hello", "@user", "#tag", "http://t.co/abc", "https://bit.ly/x", "RT", "spam", "a#b", "mail@site", "Free"])
+    lengths = rng.integers(1, 15, n)
+    picks = rng.choice(words, lengths.sum())
+    bounds = np.cumsum(lengths)[:-1]
+    return pd.Series([" ".join(parts) for parts in np.split(picks, bounds)])
+
+
+def timed(func, text, repeat):
+    """Meilleur temps sur `repeat` exécutions."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparaison apply vs comptage vectorisé des jetons")
+    parser.add_argument("--tweets", default=None, help="Fichier de tweets (sinon données synthétiques)")
+    parser.add_argument("--rows", type=int, default=200000, help="Nombre de tweets synthétiques")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.tweets:
+        text = pd.read_csv(args.tweets, sep='\t', header=None, usecols=[2], dtype={2: str})[2]
+    else:
+        text = synthetic_tweets(args.rows)
+
+    apply_time, expected = timed(apply_path, text, args.repeat)
+    vector_time, result = timed(count_tokens, text, args.repeat)
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+
+    print(f"Tweets : {len(text)}")
+    print(f"Series.apply    : {apply_time:.3f} s ({len(text) / apply_time:,.0f} tweets/s)")
+    print(f"count_tokens    : {vector_time:.3f} s ({len(text) / vector_time:,.0f} tweets/s)")
+    print(f"Accélération    : x{apply_time / vector_time:.1f} (résultats identiques)")
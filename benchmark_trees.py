@@ -0,0 +1,52 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from artifact_io import load_frame
+from model_store import ModelStore
+from tree_export import export_model
+
+
+def timed(func, X, repeat):
+    """Meilleur temps sur `repeat` exécutions."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(X)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparaison sklearn vs ensembles d'arbres aplatis (predict_proba)")
+    parser.add_argument("--data", default="Datatest/Tache2_donnees_final/data_final")
+    parser.add_argument("--model-dir", default="Datatest/Tache3/Entrainement")
+    parser.add_argument("--models", nargs="*", default=["DecisionTree", "Bagging", "AdaBoost", "GradientBoosting",
+                                                        "RandomForest"])
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--atol", type=float, default=1e-9, help="Écart maximal toléré sur les probabilités")
+    args = parser.parse_args()
+
+    X = load_frame(args.data).drop(columns=['Classe'])
+    store = ModelStore(args.model_dir)
+    rng = np.random.default_rng(42)
+
+    rows = []
+    for name in args.models:
+        model = store.load(name)
+        packed = export_model(model)
+        print(f"{name} : {packed.n_trees} arbres, {packed.n_nodes} nœuds, profondeur {packed.depth}")
+        for batch_size in args.batch_sizes:
+            batch = X.iloc[rng.integers(0, len(X), batch_size)]
+            values = batch.to_numpy()
+            sklearn_time, expected = timed(model.predict_proba, batch, args.repeat)
+            packed_time, result = timed(packed.predict_proba, values, args.repeat)
+            error = np.abs(result - expected).max()
+            assert error <= args.atol, f"{name} : écart {error:.2e} > {args.atol:.0e} pour un lot de {batch_size}"
+            rows.append({"Modèle": name, "Lot": batch_size, "sklearn (ms)": sklearn_time * 1000,
+                         "Aplati (ms)": packed_time * 1000, "Accélération": sklearn_time / packed_time,
+                         "Écart max": error})
+
+    with pd.option_context("display.float_format", "{:.4g}".format, "display.width", 120):
+        print(pd.DataFrame(rows).to_string(index=False))
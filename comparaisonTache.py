@@ -1,20 +1,22 @@
+import argparse
 import os
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+from reporting import ChartRenderer, render_grouped_bar, render_lines, render_table
 
 class ComparaisonTache:
-    def __init__(self, tache3_path, tache4_path, output_dir="Datatest/Comparaison_Tache3_Tache4"):
+    def __init__(self, tache3_path, tache4_path, output_dir="Datatest/Comparaison_Tache3_Tache4", plots=None):
         """
         Classe pour comparer les performances des modèles entre la Tâche 3 (équilibrée) et la Tâche 4 (déséquilibrée).
         :param tache3_path: Chemin du fichier CSV des résultats de la Tâche 3.
         :param tache4_path: Chemin du fichier CSV des résultats de la Tâche 4.
         :param output_dir: Dossier de sauvegarde des comparaisons.
+        :param plots: Génère les graphiques (par défaut selon PIPELINE_PLOTS) ; ils sont rendus en arrière-plan.
         """
         self.tache3_path = tache3_path
         self.tache4_path = tache4_path
         self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
+        self.renderer = ChartRenderer(self.output_dir, enabled=plots)
 
         # Chargement des données
         self.df_tache3, self.df_tache4 = self.load_data()
@@ -53,70 +55,58 @@ class ComparaisonTache:
         metrics = ["TP_Rate", "FP_Rate", "F1-score", "AUC"]
 
         for metric in metrics:
-            plt.figure(figsize=(10, 5))
             df_melted = self.df_comparatif.melt(id_vars=["Model"], value_vars=[f"{metric}_Tache3", f"{metric}_Tache4"],
                                                 var_name="Tâche", value_name=metric)
             df_melted["Tâche"] = df_melted["Tâche"].replace({f"{metric}_Tache3": "Équilibré", f"{metric}_Tache4": "Déséquilibré"})
 
-            sns.barplot(data=df_melted, x="Model", y=metric, hue="Tâche", palette=["blue", "red"])
-            plt.title(f"Comparaison {metric} - Tâche 3 vs Tâche 4")
-            plt.xticks(rotation=45)
-            plt.legend(title="Tâche")
             save_path = os.path.join(self.output_dir, f"{metric}_comparaison.png")
-            plt.savefig(save_path)
-            print(f"Graphique sauvegardé : {save_path}")
-            plt.close()
+            self.renderer.submit(render_grouped_bar, save_path, records=df_melted.to_dict(orient="records"),
+                                 x="Model", y=metric, hue="Tâche", palette=["blue", "red"],
+                                 title=f"Comparaison {metric} - Tâche 3 vs Tâche 4", legend_title="Tâche")
 
         # Génération du graphique combiné
         self.plot_global_comparison()
 
     def plot_global_comparison(self):
         """Génère un graphique combiné comparant toutes les métriques."""
-        plt.figure(figsize=(12, 6))
-        models = self.df_comparatif["Model"]
+        models = self.df_comparatif["Model"].tolist()
 
+        series = []
         for metric, color, marker in zip(["TP_Rate", "FP_Rate", "F1-score", "AUC"], ["blue", "red", "green", "purple"], ["o", "s", "D", "*"]):
-            scores_t3 = self.df_comparatif[f"{metric}_Tache3"]
-            scores_t4 = self.df_comparatif[f"{metric}_Tache4"]
+            series.append({"values": self.df_comparatif[f"{metric}_Tache3"].tolist(), "label": f"{metric} (Équilibré)",
+                           "color": color, "marker": marker, "linestyle": "-"})
+            series.append({"values": self.df_comparatif[f"{metric}_Tache4"].tolist(), "label": f"{metric} (Déséquilibré)",
+                           "color": color, "marker": marker, "linestyle": "--", "alpha": 0.6})
 
-            plt.plot(models, scores_t3, marker=marker, linestyle="-", linewidth=2, markersize=8, label=f"{metric} (Équilibré)", color=color)
-            plt.plot(models, scores_t4, marker=marker, linestyle="--", linewidth=2, markersize=8, label=f"{metric} (Déséquilibré)", color=color, alpha=0.6)
-
-        plt.xlabel("Modèles")
-        plt.ylabel("Score")
-        plt.title("Comparaison globale des performances des modèles (Tâche 3 vs Tâche 4)")
-        plt.legend()
         save_path = os.path.join(self.output_dir, "comparaison_globale.png")
-        plt.savefig(save_path)
-        print(f"Graphique global sauvegardé : {save_path}")
-        plt.close()
+        self.renderer.submit(render_lines, save_path, x=models, series=series,
+                             title="Comparaison globale des performances des modèles (Tâche 3 vs Tâche 4)")
 
     def save_comparison_table(self):
         """Génère un tableau comparatif des résultats sous format PNG."""
-        fig, ax = plt.subplots(figsize=(10, 4))
-        ax.axis('tight')
-        ax.axis('off')
-
-        table = ax.table(cellText=self.df_comparatif.round(4).values,
-                         colLabels=self.df_comparatif.columns,
-                         cellLoc='center', loc='center')
-        table.auto_set_font_size(False)
-        table.set_fontsize(10)
-        table.scale(1.2, 1.2)
-
         save_path = os.path.join(self.output_dir, "comparatif_T3_T4.png")
-        plt.savefig(save_path, bbox_inches='tight')
-        print(f"Tableau comparatif sauvegardé : {save_path}")
-        plt.close()
+        self.renderer.submit(render_table, save_path, values=self.df_comparatif.round(4).values.tolist(),
+                             columns=self.df_comparatif.columns.tolist())
 
 # **Exécution du script**
-if __name__ == "__main__":
+def main(argv=None):
+    """Point d'entrée du script : compare les résultats des Tâches 3 et 4."""
     tache3_csv = "Datatest/Tache3/Results/summary_table.csv"
     tache4_csv = "Datatest/Tache4/Results/model_performance.csv"
 
+    parser = argparse.ArgumentParser(description="Comparaison des Tâches 3 et 4")
+    parser.add_argument("--no-plots", action="store_true", help="N'écrit que le tableau CSV, sans graphiques")
+    args = parser.parse_args(argv)
+
     # Création et exécution de la comparaison
-    comparateur = ComparaisonTache(tache3_csv, tache4_csv)
+    comparateur = ComparaisonTache(tache3_csv, tache4_csv, plots=False if args.no_plots else None)
     comparateur.plot_comparison()
     comparateur.save_comparison_table()
+    comparateur.renderer.close()
 
     print("\nComparaison des Tâches 3 et 4 terminée avec succès !")
+    return comparateur
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,45 @@
 import os
 import pandas as pd
+from artifact_io import load_frame, save_frame
+from schema import FEATURE_DTYPE, FINAL, compact
 
-# Définition des chemins des fichiers d'entrée
-input_dir = "Datatest/Tache2/Partie2"
-polluters_file = os.path.join(input_dir, "polluters_features_preprocessed.csv")
-legitimate_file = os.path.join(input_dir, "legitimate_features_preprocessed.csv")
 
-# Chargement des fichiers
-polluters_df = pd.read_csv(polluters_file, sep=',', encoding='utf-8')
-legitimate_df = pd.read_csv(legitimate_file, sep=',', encoding='utf-8')
+def main():
+    """Point d'entrée du script : fusionne les caractéristiques prétraitées des deux classes avec leur classe."""
+    # Définition des chemins des fichiers d'entrée
+    input_dir = "Datatest/Tache2/Partie2"
+    polluters_file = os.path.join(input_dir, "polluters_features_preprocessed")
+    legitimate_file = os.path.join(input_dir, "legitimate_features_preprocessed")
 
-# Ajout de la colonne "Classe"
-polluters_df["Classe"] = 1  # Pollueurs
-legitimate_df["Classe"] = 0  # Utilisateurs légitimes
+    # Chargement des fichiers (format colonnes typé ou CSV)
+    polluters_df = load_frame(polluters_file)
+    legitimate_df = load_frame(legitimate_file)
 
-# Fusion des deux DataFrames
-final_df = pd.concat([polluters_df, legitimate_df], ignore_index=True)
+    # Ajout de la colonne "Classe"
+    polluters_df["Classe"] = 1  # Pollueurs
+    legitimate_df["Classe"] = 0  # Utilisateurs légitimes
 
-# Tri par UserId en ordre croissant
-final_df = final_df.sort_values(by=["UserId"]).reset_index(drop=True)
+    # Fusion des deux DataFrames
+    final_df = pd.concat([polluters_df, legitimate_df], ignore_index=True)
 
-# Définition du dossier de sortie
-output_dir = "Datatest/Tache2_donnees_final"
+    # Tri par UserId en ordre croissant
+    final_df = final_df.sort_values(by=["UserId"]).reset_index(drop=True)
 
-# Création du dossier si nécessaire
-os.makedirs(output_dir, exist_ok=True)
+    # Schéma compact : identifiant int32, caractéristiques float32, classe int8
+    final_df = compact(final_df, FINAL, "données finales", default=FEATURE_DTYPE)
 
-# Définition du nom du fichier final
-final_filename = os.path.join(output_dir, "data_final.csv")
+    # Définition du dossier de sortie
+    output_dir = "Datatest/Tache2_donnees_final"
 
-# Enregistrement du fichier final
-final_df.to_csv(final_filename, index=False, sep=',', encoding='utf-8')
+    # Création du dossier si nécessaire
+    os.makedirs(output_dir, exist_ok=True)
 
-print(f"Fichier final enregistré dans : {final_filename}")
+    # Enregistrement du fichier final (format colonnes typé, CSV en repli)
+    final_filename = save_frame(final_df, os.path.join(output_dir, "data_final"))
+
+    print(f"Fichier final enregistré dans : {final_filename}")
+    return final_df
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,49 @@
 import os
-import pandas as pd
 from sklearn.model_selection import train_test_split
+from artifact_io import load_frame, resolve_artifact
+from shared_matrix import SharedMatrix
+
+# Caches du processus : données lues (clé : fichier, date de modification, taille)
+# et jeux découpés (clé : la même, plus les paramètres de découpage)
+FRAMES = {}
+DATASETS = {}
+
+
+def file_key(data_path):
+    """Clé de cache d'un fichier de données : elle change dès que le fichier est réécrit."""
+    data_file = resolve_artifact(data_path)
+    stat = os.stat(data_file)
+    return os.path.abspath(data_file), stat.st_mtime_ns, stat.st_size
+
+
+def load_data_frame(data_path):
+    """
+    Données finales lues une seule fois par processus tant que le fichier ne change pas.
+    Le DataFrame retourné est partagé : il ne doit pas être modifié en place.
+    """
+    key = file_key(data_path)
+    if key not in FRAMES:
+        FRAMES[key] = load_frame(key[0])
+        print(f"Données chargées avec succès depuis {key[0]}")
+    return FRAMES[key]
+
+
+def load_dataset(data_path, test_size=0.2, random_state=42):
+    """
+    DataLoader partagé : l'entraînement, l'évaluation et la Tâche 4 exécutés dans un même processus
+    réutilisent les mêmes données lues et le même découpage.
+    """
+    key = file_key(data_path) + (test_size, random_state)
+    if key not in DATASETS:
+        DATASETS[key] = DataLoader(data_path, test_size, random_state)
+    return DATASETS[key]
+
 
 class DataLoader:
     def __init__(self, data_path, test_size=0.2, random_state=42):
         """
         Classe pour charger et préparer les données.
-        :param data_path: Chemin du fichier CSV contenant les données finales.
+        :param data_path: Chemin des données finales (.feather, .parquet ou .csv ; l'extension est facultative).
         :param test_size: Proportion des données utilisées pour le test.
         :param random_state: Seed pour la reproductibilité.
         """
@@ -24,12 +61,8 @@ class DataLoader:
         self.X_train, self.X_test, self.y_train, self.y_test = self.split_train_test()
     
     def load_data(self):
-        """Charge les données depuis un fichier CSV."""
-        if not os.path.exists(self.data_path):
-            raise FileNotFoundError(f"Le fichier {self.data_path} n'existe pas.")
-        
-        data = pd.read_csv(self.data_path, sep=',', encoding='utf-8')
-        print(f"Données chargées avec succès depuis {self.data_path}")
+        """Charge les données depuis le format colonnes typé ou, à défaut, depuis le CSV (cache du processus)."""
+        data = load_data_frame(self.data_path)
         print(f"Nombre total d'échantillons : {data.shape[0]}")
         return data
     
@@ -49,7 +82,29 @@ class DataLoader:
         print(f"Taille d'entraînement : {X_train.shape[0]} échantillons")
         print(f"Taille de test : {X_test.shape[0]} échantillons")
         return X_train, X_test, y_train, y_test
+
+    def share(self, dtype="float64", path=None):
+        """
+        Copie les données dans un bloc contigu projeté en mémoire (lignes d'entraînement puis de test),
+        pour que les processus parallèles s'y attachent sans recevoir chacun une copie des DataFrames.
+        :param dtype: 'float64' (valeurs identiques aux DataFrames) ou 'float32' (moitié moins de mémoire,
+                      type natif des arbres de scikit-learn).
+        :param path: Fichier du bloc (par défaut, fichier temporaire en mémoire partagée).
+        :return: SharedMatrix ; `train()` et `test()` donnent les tableaux correspondants.
+        """
+        n_train = len(self.X_train)
+        shared = SharedMatrix.allocate(n_train + len(self.X_test), self.X.shape[1], dtype,
+                                       columns=self.X.columns, n_train=n_train, path=path)
+        X, y = shared.attach(mode="r+")
+        X[:n_train] = self.X_train.to_numpy(dtype=shared.dtype)
+        X[n_train:] = self.X_test.to_numpy(dtype=shared.dtype)
+        y[:n_train] = self.y_train.to_numpy(dtype=shared.dtype)
+        y[n_train:] = self.y_test.to_numpy(dtype=shared.dtype)
+        y.flush()
+        print(f"Données partagées ({shared.dtype}) dans {shared.path}")
+        return shared
     
 #Exemple d'utilisation
-loader = DataLoader("Datatest/Tache2_donnees_final/data_final.csv")
-X_train, X_test, y_train, y_test = loader.X_train, loader.X_test, loader.y_train, loader.y_test
+if __name__ == "__main__":
+    loader = load_dataset("Datatest/Tache2_donnees_final/data_final")
+    X_train, X_test, y_train, y_test = loader.X_train, loader.X_test, loader.y_train, loader.y_test
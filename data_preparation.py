@@ -1,21 +1,26 @@
 import os
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
-import numpy as np
+from artifact_io import load_frame, save_frame
+from feature_transformer import TRANSFORMER_PATH, FeatureTransformer
+from instrumentation import REPORT, stage
+from schema import FEATURE_DTYPE, FINAL, compact
 
 class DataPreparation:
-    def __init__(self, input_dir):
+    def __init__(self, input_dir, transformer_path=TRANSFORMER_PATH):
         """
         Initialise la classe en chargeant les fichiers de données.
-        :param input_dir: Chemin du dossier contenant les fichiers CSV à traiter.
+        :param input_dir: Chemin du dossier contenant les fichiers de caractéristiques à traiter.
+        :param transformer_path: Fichier du prétraitement appris (enregistré avec les données prétraitées).
         """
         self.input_dir = input_dir
-        self.polluters_file = os.path.join(input_dir, "polluters_features.csv")
-        self.legitimate_file = os.path.join(input_dir, "legitimate_features.csv")
+        self.transformer_path = transformer_path
+        self.transformer = None
+        self.polluters_file = os.path.join(input_dir, "polluters_features")
+        self.legitimate_file = os.path.join(input_dir, "legitimate_features")
         
-        # Chargement des fichiers
-        self.polluters_df = pd.read_csv(self.polluters_file, sep=',', encoding='utf-8')
-        self.legitimate_df = pd.read_csv(self.legitimate_file, sep=',', encoding='utf-8')
+        # Chargement des fichiers (format colonnes typé ou CSV)
+        self.polluters_df = load_frame(self.polluters_file)
+        self.legitimate_df = load_frame(self.legitimate_file)
         
     def remove_duplicates(self):
         """
@@ -24,66 +29,55 @@ class DataPreparation:
         self.polluters_df.drop_duplicates(inplace=True)
         self.legitimate_df.drop_duplicates(inplace=True)
     
-    def handle_missing_values(self):
+    def fit_transformer(self):
         """
-        Remplace les valeurs manquantes par la médiane de chaque colonne.
+        Apprend le prétraitement (médianes, bornes Min-Max, colonnes en log) une seule fois, sur les
+        pollueurs et les légitimes réunis, et l'enregistre à côté des modèles pour l'évaluation de nouveaux comptes.
         """
-        for df in [self.polluters_df, self.legitimate_df]:
-            for col in df.columns:
-                if df[col].isnull().sum() > 0:
-                    df[col].fillna(df[col].median(), inplace=True)
-    
+        self.transformer = FeatureTransformer.fit(pd.concat([self.polluters_df, self.legitimate_df], ignore_index=True))
+        path = self.transformer.save(self.transformer_path)
+        print(f"Transformateur enregistré : {path}")
+
     def normalize_data(self):
         """
-        Normalise les colonnes numériques avec Log-Transformation ou Min-Max Scaling selon les recommandations.
+        Remplace les valeurs manquantes par la médiane, puis normalise avec Min-Max Scaling ou log(1 + x)
+        (voir feature_transformer), en une transformation vectorisée par DataFrame.
         """
-        # Colonnes à normaliser avec Min-Max Scaling
-        min_max_cols = ['LengthOfScreenName', 'LengthOfDescriptionInUserProfile', 'MentionRatio']
-        
-        # Colonnes à normaliser avec transformation logarithmique (car elles doivent rester positives)
-        log_transform_cols = ['AccountLongevity', 'NumerOfFollowings', 'NumberOfFollowers', 
-                              'TweetsPerDay', 'URLRatio', 'MeanTimeBetweenTweets', 
-                              'MaxTimeBetweenTweets', 'HashtagRatio', 'FollowBackRatio']
-        
-        # Colonnes qui peuvent être normalisées avec Z-Score (si elles ont des valeurs négatives)
-        zscore_cols = ['RatioFollowingFollowers']
-        
-        min_max_scaler = MinMaxScaler()
-        
-        for df in [self.polluters_df, self.legitimate_df]:
-            df[min_max_cols] = min_max_scaler.fit_transform(df[min_max_cols])
-            
-            # Transformation logarithmique (log(1 + x))
-            for col in log_transform_cols:
-                df[col] = np.log1p(df[col])
-    
+        self.polluters_df = self.transformer.transform_frame(self.polluters_df)
+        self.legitimate_df = self.transformer.transform_frame(self.legitimate_df)
+
+    def rows(self):
+        return len(self.polluters_df) + len(self.legitimate_df)
+
     def process(self):
         """
         Effectue toutes les étapes de nettoyage et de normalisation des données.
         """
-        self.remove_duplicates()
-        self.handle_missing_values()
-        self.normalize_data()
+        with stage("data_preparation", rows_in=self.rows()) as total:
+            for step in [self.remove_duplicates, self.fit_transformer, self.normalize_data]:
+                with stage(step.__name__, rows_in=self.rows()) as record:
+                    step()
+                    record["rows_out"] = self.rows()
+            # Les valeurs normalisées sont calculées en float64 puis conservées en float32
+            compact(self.polluters_df, FINAL, "normalisées (pollueurs)", default=FEATURE_DTYPE)
+            compact(self.legitimate_df, FINAL, "normalisées (légitimes)", default=FEATURE_DTYPE)
+            total["rows_out"] = self.rows()
         print("Prétraitement terminé : doublons supprimés, valeurs manquantes traitées, données normalisées.")
 
 # Création et exécution du prétraitement
-prep = DataPreparation("Datatest/Tache2/Partie1")
-prep.process()
-
-# Définition du dossier de sortie
-output_dir = "Datatest/Tache2/Partie2"
-
-# Création du dossier si nécessaire
-os.makedirs(output_dir, exist_ok=True)
-
-# Définition des noms de fichiers
-polluters_filename = os.path.join(output_dir, "polluters_features_preprocessed.csv")
-legitimate_filename = os.path.join(output_dir, "legitimate_features_preprocessed.csv")
+if __name__ == "__main__":
+    prep = DataPreparation("Datatest/Tache2/Partie1")
+    prep.process()
 
-# Enregistrement des fichiers
-prep.polluters_df.to_csv(polluters_filename, index=False, sep=',', encoding='utf-8')
-prep.legitimate_df.to_csv(legitimate_filename, index=False, sep=',', encoding='utf-8')
+    # Définition du dossier de sortie
+    output_dir = "Datatest/Tache2/Partie2"
 
-print(f"Fichiers enregistrés dans {output_dir} :\n - {polluters_filename}\n - {legitimate_filename}")
+    # Création du dossier si nécessaire
+    os.makedirs(output_dir, exist_ok=True)
 
+    # Enregistrement des fichiers
+    polluters_filename = save_frame(prep.polluters_df, os.path.join(output_dir, "polluters_features_preprocessed"))
+    legitimate_filename = save_frame(prep.legitimate_df, os.path.join(output_dir, "legitimate_features_preprocessed"))
 
+    print(f"Fichiers enregistrés dans {output_dir} :\n - {polluters_filename}\n - {legitimate_filename}")
+    REPORT.save()
@@ -0,0 +1,235 @@
+import pandas as pd
+from following_series import following_statistics
+from instrumentation import stage
+from timestamps import elapsed_days, parse_timestamps
+from tweet_stats import aggregate_tweet_columns, aggregate_tweets_in_chunks, read_tweet_columns
+
+# Registre des nœuds du graphe de calcul : nom -> (entrées, fonction)
+# Les entrées sont d'autres nœuds ou des sources fournies à l'exécuteur :
+#  - 'users'        : table brute des utilisateurs (content_polluters.txt / legitimate_users.txt)
+#  - 'tweets'       : chemin du fichier de tweets (lu seulement si une caractéristique en dépend)
+#  - 'sort_by_time' : tri chronologique des tweets avant le calcul des écarts
+#  - 'chunksize'    : taille des blocs de lecture des tweets (None = tweets déjà en mémoire)
+#  - 'followings'   : chemin du fichier des séries de followings, ou FollowingSeries déjà lue (None = aucune série)
+NODES = {}
+
+# Caractéristiques finales, dans l'ordre des colonnes des fichiers de sortie
+FEATURES = []
+
+
+def node(name, *inputs, feature=False):
+    """
+    Déclare un nœud du graphe de calcul.
+    :param name: Nom du nœud (nom de colonne pour une caractéristique).
+    :param inputs: Noms des nœuds ou sources dont dépend le calcul.
+    :param feature: True si le nœud est une caractéristique exportée.
+    """
+    def register(func):
+        NODES[name] = (inputs, func)
+        if feature:
+            FEATURES.append(name)
+        return func
+    return register
+
+
+# --- Colonnes utilisateur ---
+
+@node('UserId', 'users', feature=True)
+def user_id(users):
+    return users.iloc[:, 0]
+
+
+#-1- Longueur du nom d’utilisateur
+@node('LengthOfScreenName', 'users', feature=True)
+def length_of_screen_name(users):
+    return users.iloc[:, 6]
+
+
+#-2- Longueur de la description du profil
+@node('LengthOfDescriptionInUserProfile', 'users', feature=True)
+def length_of_description(users):
+    return users.iloc[:, 7]
+
+
+#-3- Durée de vie du compte (jours entiers, calculés sur les secondes depuis l'époque Unix)
+@node('AccountLongevity', 'users', feature=True)
+def account_longevity(users):
+    created, collected = parse_timestamps(users.iloc[:, 1]), parse_timestamps(users.iloc[:, 2])
+    return pd.Series(elapsed_days(created, collected), index=users.index)
+
+
+#-4- Nombre de following
+@node('NumerOfFollowings', 'users', feature=True)
+def number_of_followings(users):
+    return users.iloc[:, 3]
+
+
+#-5- Nombre de followers
+@node('NumberOfFollowers', 'users', feature=True)
+def number_of_followers(users):
+    return users.iloc[:, 4]
+
+
+#-6- Rapport « following/followers »
+@node('RatioFollowingFollowers', 'NumerOfFollowings', 'NumberOfFollowers', feature=True)
+def ratio_following_followers(followings, followers):
+    return followings / (followers + 1)
+
+
+#-7- Nombre moyen de tweets par jour
+@node('TweetsPerDay', 'NumerOfFollowings', 'AccountLongevity', feature=True)
+def tweets_per_day(followings, longevity):
+    return followings / (longevity + 1)
+
+
+# --- Agrégats de tweets partagés ---
+
+# Nombre de tweets déclaré dans le profil
+@node('DeclaredTweetCount', 'users')
+def declared_tweet_count(users):
+    return users.iloc[:, 5]
+
+
+@node('TweetStats', 'tweets', 'sort_by_time', 'chunksize')
+def tweet_stats(tweets, sort_by_time, chunksize):
+    if chunksize is not None:
+        return aggregate_tweets_in_chunks(tweets, chunksize)
+    # Le texte n'est jamais chargé en entier : seules les colonnes compactes par tweet sont gardées
+    return aggregate_tweet_columns(read_tweet_columns(tweets), sort_by_time=sort_by_time)
+
+
+# Statistiques alignées sur les lignes de la table utilisateur (une seule jointure)
+@node('UserTweetStats', 'UserId', 'TweetStats')
+def user_tweet_stats(user_ids, stats):
+    aligned = stats.set_index('UserId').reindex(user_ids.values).fillna(0)
+    return aligned.set_index(user_ids.index)
+
+
+#-8- Proportion d’URL dans les tweets
+@node('URLRatio', 'UserTweetStats', 'DeclaredTweetCount', feature=True)
+def url_ratio(stats, tweet_count):
+    return (stats['URLCount'] / (tweet_count + 1)).fillna(0)
+
+
+#-9- Proportion de mentions @ dans les tweets
+@node('MentionRatio', 'UserTweetStats', 'DeclaredTweetCount', feature=True)
+def mention_ratio(stats, tweet_count):
+    return (stats['MentionCount'] / tweet_count).fillna(0)
+
+
+#-10- Temps moyen entre deux tweets consécutifs (minutes)
+@node('MeanTimeBetweenTweets', 'UserTweetStats', feature=True)
+def mean_time_between_tweets(stats):
+    return stats['MeanTimeBetweenTweets']
+
+
+#-11- Temps maximal entre deux tweets consécutifs (minutes)
+@node('MaxTimeBetweenTweets', 'UserTweetStats', feature=True)
+def max_time_between_tweets(stats):
+    return stats['MaxTimeBetweenTweets']
+
+
+#-12- Taux d'utilisation des hashtags
+@node('HashtagRatio', 'UserTweetStats', 'DeclaredTweetCount', feature=True)
+def hashtag_ratio(stats, tweet_count):
+    return stats['HashtagCount'] / (tweet_count + 1)
+
+
+#-13- Ratio Follow-back
+@node('FollowBackRatio', 'NumberOfFollowers', 'NumerOfFollowings', feature=True)
+def follow_back_ratio(followers, followings):
+    return followers / (followings + 1)
+
+
+# --- Séries de followings (relevés successifs du nombre de comptes suivis) ---
+
+@node('FollowingStats', 'followings')
+def following_stats(followings):
+    return following_statistics(followings)
+
+
+# Statistiques alignées sur la table utilisateur ; un utilisateur sans série n'a aucune variation (0)
+@node('UserFollowingStats', 'UserId', 'FollowingStats')
+def user_following_stats(user_ids, stats):
+    aligned = stats.set_index('UserId').reindex(user_ids.values).fillna(0)
+    return aligned.set_index(user_ids.index)
+
+
+#-14- Variation moyenne du nombre de followings entre deux relevés
+@node('FollowingsGrowthRate', 'UserFollowingStats', feature=True)
+def followings_growth_rate(stats):
+    return stats['FollowingsGrowthRate']
+
+
+#-15- Volatilité (écart-type) des variations du nombre de followings
+@node('FollowingsVolatility', 'UserFollowingStats', feature=True)
+def followings_volatility(stats):
+    return stats['FollowingsVolatility']
+
+
+#-16- Plus forte hausse du nombre de followings entre deux relevés consécutifs
+@node('FollowingsMaxBurst', 'UserFollowingStats', feature=True)
+def followings_max_burst(stats):
+    return stats['FollowingsMaxBurst']
+
+
+class FeatureExecutor:
+    def __init__(self, sources):
+        """
+        Exécute le graphe de calcul des caractéristiques pour une classe d'utilisateurs.
+        Chaque nœud est calculé au plus une fois et partagé entre les caractéristiques qui en dépendent.
+        :param sources: Dictionnaire des sources ('users', 'tweets', 'sort_by_time', 'chunksize', 'followings').
+        """
+        self.values = dict(sources)
+
+    @staticmethod
+    def plan(names):
+        """
+        Ordre topologique des nœuds nécessaires au calcul des caractéristiques demandées.
+        :param names: Noms des caractéristiques ou nœuds demandés.
+        """
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done or name not in NODES:
+                return
+            if name in visiting:
+                raise ValueError(f"Dépendance circulaire détectée sur le nœud {name}")
+            visiting.add(name)
+            for dependency in NODES[name][0]:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in names:
+            if name not in NODES:
+                raise KeyError(f"Caractéristique inconnue : {name}")
+            visit(name)
+        return order
+
+    def get(self, name):
+        """
+        Retourne la valeur d'un nœud en calculant au besoin ses dépendances.
+        Chaque nœud calculé est mesuré comme une étape (durée, mémoire, lignes produites).
+        """
+        for step in self.plan([name]):
+            if step not in self.values:
+                inputs, func = NODES[step]
+                with stage(step) as record:
+                    self.values[step] = func(*(self.values[dependency] for dependency in inputs))
+                    record["rows_out"] = len(self.values[step])
+        return self.values[name]
+
+    def compute(self, features=None):
+        """
+        Calcule les caractéristiques demandées (toutes par défaut).
+        :param features: Liste de caractéristiques ; 'UserId' est toujours inclus.
+        :return: DataFrame avec une colonne par caractéristique, dans l'ordre de FEATURES.
+        """
+        requested = set(FEATURES if features is None else features) | {'UserId'}
+        unknown = requested - set(FEATURES)
+        if unknown:
+            raise KeyError(f"Caractéristiques inconnues : {sorted(unknown)}")
+        columns = [name for name in FEATURES if name in requested]
+        return pd.DataFrame({name: self.get(name) for name in columns})
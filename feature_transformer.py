@@ -0,0 +1,130 @@
+import json
+import os
+import warnings
+import numpy as np
+
+# Transformateur enregistré avec les données prétraitées (sortie de data_preparation)
+TRANSFORMER_FILE = "feature_transformer.json"
+TRANSFORMER_PATH = os.path.join("Datatest", "Tache2", "Partie2", TRANSFORMER_FILE)
+
+# Colonnes normalisées par Min-Max Scaling
+# (les variations de followings peuvent être négatives : pas de log)
+MIN_MAX_COLUMNS = ['LengthOfScreenName', 'LengthOfDescriptionInUserProfile', 'MentionRatio',
+                   'FollowingsGrowthRate', 'FollowingsMaxBurst']
+
+# Colonnes normalisées par transformation logarithmique log(1 + x) (car elles doivent rester positives)
+LOG_COLUMNS = ['AccountLongevity', 'NumerOfFollowings', 'NumberOfFollowers',
+               'TweetsPerDay', 'URLRatio', 'MeanTimeBetweenTweets',
+               'MaxTimeBetweenTweets', 'HashtagRatio', 'FollowBackRatio', 'FollowingsVolatility']
+
+# Colonnes jamais transformées (ni imputées) : identifiant et classe
+# RatioFollowingFollowers, pouvant être négatif, reste aussi sans transformation
+PASSTHROUGH_COLUMNS = ['UserId', 'Classe']
+
+
+class FeatureTransformer:
+    def __init__(self, columns, medians, minimums, scales, log_columns):
+        """
+        Prétraitement appris une seule fois et appliqué tel quel aux nouvelles données :
+        imputation des valeurs manquantes par la médiane, Min-Max Scaling puis log(1 + x).
+        Les paramètres sont des tableaux alignés sur `columns` : la transformation d'un bloc numpy
+        se fait en quelques opérations sur le bloc entier, sans boucle sur les colonnes.
+        :param columns: Colonnes d'entrée, dans l'ordre du bloc attendu.
+        :param medians: Médiane de chaque colonne (NaN = pas d'imputation).
+        :param minimums, scales: x -> (x - minimum) * scale ; (0, 1) pour les colonnes non normalisées.
+        :param log_columns: Masque des colonnes passées au log(1 + x).
+        """
+        self.columns = list(columns)
+        self.medians = np.asarray(medians, dtype=np.float64)
+        self.minimums = np.asarray(minimums, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.log_columns = np.asarray(log_columns, dtype=bool)
+
+    @classmethod
+    def fit(cls, frame, min_max_columns=MIN_MAX_COLUMNS, log_columns=LOG_COLUMNS):
+        """
+        Apprend les paramètres sur toutes les lignes d'entraînement (pollueurs et légitimes ensemble).
+        :param frame: DataFrame des caractéristiques ; les colonnes PASSTHROUGH_COLUMNS sont gardées telles quelles.
+        """
+        columns = [column for column in frame.columns if column != 'Classe']
+        values = frame[columns].to_numpy(dtype=np.float64)
+        transformed = np.array([column not in PASSTHROUGH_COLUMNS for column in columns])
+
+        observed = ~np.isnan(values)
+        with warnings.catch_warnings():
+            # Colonne entièrement vide : médiane NaN, la colonne n'est pas imputée
+            warnings.simplefilter('ignore', RuntimeWarning)
+            medians = np.where(transformed, np.nanmedian(values, axis=0), np.nan)
+        # Bornes des valeurs observées (l'imputation par la médiane ne les change pas)
+        minimums = np.min(values, axis=0, initial=np.inf, where=observed)
+        maximums = np.max(values, axis=0, initial=-np.inf, where=observed)
+        scaled = np.array([column in min_max_columns for column in columns]) & np.isfinite(minimums)
+        ranges = np.where(scaled, maximums - minimums, 1.0)
+        # Une colonne constante est ramenée à 0 (même convention que MinMaxScaler)
+        minimums = np.where(scaled, minimums, 0.0)
+        scales = np.where(ranges > 0, 1.0 / np.where(ranges > 0, ranges, 1.0), 1.0)
+        return cls(columns, medians, minimums, scales, [column in log_columns for column in columns])
+
+    def positions(self, columns):
+        """Position de chaque colonne d'un bloc dans `self.columns` (colonnes inconnues : KeyError)."""
+        index = {column: i for i, column in enumerate(self.columns)}
+        missing = [column for column in columns if column not in index]
+        if missing:
+            raise KeyError(f"Colonnes inconnues du transformateur : {missing}")
+        return np.array([index[column] for column in columns], dtype=np.intp)
+
+    def transform(self, values, columns=None):
+        """
+        Transforme un bloc numpy (lignes x colonnes).
+        :param values: Tableau 2D dans l'ordre de `self.columns`, ou dans celui de `columns` s'il est fourni.
+        :param columns: Noms des colonnes du bloc (sous-ensemble ou autre ordre de `self.columns`).
+        :return: Nouveau tableau float64 de même forme.
+        """
+        values = np.array(values, dtype=np.float64)
+        if columns is None:
+            medians, minimums, scales, logs = self.medians, self.minimums, self.scales, self.log_columns
+        else:
+            positions = self.positions(columns)
+            medians, minimums, scales, logs = (self.medians[positions], self.minimums[positions],
+                                               self.scales[positions], self.log_columns[positions])
+        missing = np.isnan(values)
+        values[missing] = np.broadcast_to(medians, values.shape)[missing]
+        values -= minimums
+        values *= scales
+        values[:, logs] = np.log1p(values[:, logs])
+        return values
+
+    def transform_frame(self, frame):
+        """Transforme les colonnes connues d'un DataFrame (les autres, comme Classe, sont conservées)."""
+        columns = [column for column in frame.columns
+                   if column in self.columns and column not in PASSTHROUGH_COLUMNS]
+        transformed = frame.copy()
+        transformed[columns] = self.transform(frame[columns].to_numpy(dtype=np.float64), columns)
+        return transformed
+
+    def to_dict(self):
+        return {"columns": self.columns,
+                "medians": [None if np.isnan(value) else float(value) for value in self.medians],
+                "minimums": self.minimums.tolist(), "scales": self.scales.tolist(),
+                "log_columns": self.log_columns.tolist()}
+
+    def save(self, path=TRANSFORMER_PATH):
+        """Enregistre les paramètres (JSON lisible, valeurs flottantes exactes)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path=TRANSFORMER_PATH):
+        with open(path, encoding="utf-8") as f:
+            params = json.load(f)
+        medians = [np.nan if value is None else value for value in params["medians"]]
+        return cls(params["columns"], medians, params["minimums"], params["scales"], params["log_columns"])
+
+
+def load_transformer(path=TRANSFORMER_PATH):
+    """Transformateur enregistré par data_preparation.py (FileNotFoundError s'il n'a pas encore été appris)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Transformateur introuvable : {path} (exécuter data_preparation.py)")
+    return FeatureTransformer.load(path)
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from schema import COUNT_DTYPE, ID_DTYPE, RAW_FOLLOWINGS, narrow
+
+# Statistiques produites par utilisateur à partir des séries de followings, dans l'ordre
+FOLLOWING_COLUMNS = ['UserId', 'SnapshotCount', 'FollowingsGrowthRate', 'FollowingsVolatility',
+                     'FollowingsMaxBurst']
+
+
+class FollowingSeries:
+    def __init__(self, user_ids, offsets, values):
+        """
+        Séries de followings de tous les utilisateurs d'une classe, au format CSR :
+        les relevés de l'utilisateur i sont values[offsets[i]:offsets[i + 1]].
+        Un seul tableau numérique contigu remplace une liste Python par utilisateur ; les statistiques
+        sont calculées par réductions segmentées sur ce tableau, sans boucle sur les utilisateurs.
+        :param user_ids: Identifiants des utilisateurs (int32), un par série.
+        :param offsets: Début de chaque série dans `values` (int64, longueur len(user_ids) + 1).
+        :param values: Nombres de comptes suivis, relevés successifs concaténés.
+        """
+        self.user_ids = user_ids
+        self.offsets = offsets
+        self.values = values
+
+    @classmethod
+    def read(cls, followings_file):
+        """
+        Lit un fichier *_followings.txt (UserId, tabulation, relevés séparés par des virgules) en une passe.
+        Si un utilisateur apparaît sur plusieurs lignes, seule la dernière est gardée.
+        """
+        lines = narrow(pd.read_csv(followings_file, sep='\t', header=None, dtype={1: RAW_FOLLOWINGS[1]}),
+                       RAW_FOLLOWINGS)
+        lines = lines.drop_duplicates(subset=0, keep='last')
+        series = lines[1].fillna('').str.strip()
+        lengths = np.where(series == '', 0, series.str.count(',') + 1).astype('int64')
+        offsets = np.zeros(len(lines) + 1, dtype='int64')
+        np.cumsum(lengths, out=offsets[1:])
+
+        # Toutes les séries sont jointes puis converties par numpy en un seul appel
+        try:
+            values = np.fromstring(','.join(series[lengths > 0]), dtype='int64', sep=',') if offsets[-1] else \
+                np.empty(0, dtype='int64')
+        except ValueError:
+            values = None
+        if values is None or len(values) != offsets[-1]:
+            raise ValueError(f"Relevé de followings illisible dans {followings_file}")
+        if len(values) and values.min() >= 0 and values.max() <= np.iinfo(COUNT_DTYPE).max:
+            values = values.astype(COUNT_DTYPE)
+        return cls(lines[0].to_numpy(ID_DTYPE), offsets, values)
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def lengths(self):
+        """Nombre de relevés de chaque série."""
+        return np.diff(self.offsets)
+
+    def increments(self):
+        """
+        Variations entre relevés consécutifs d'un même utilisateur, au format CSR.
+        :return: (offsets, increments) ; l'utilisateur i a max(n_i - 1, 0) variations.
+        """
+        values = self.values.astype('int64')
+        counts = np.maximum(self.lengths() - 1, 0)
+        offsets = np.zeros(len(self) + 1, dtype='int64')
+        np.cumsum(counts, out=offsets[1:])
+        # Les différences qui enjambent deux séries sont retirées (dernier relevé d'une série -> premier du suivant)
+        keep = np.ones(max(len(values) - 1, 0), dtype=bool)
+        boundaries = self.offsets[1:-1] - 1
+        keep[boundaries[(boundaries >= 0) & (boundaries < len(keep))]] = False
+        return offsets, np.diff(values)[keep]
+
+    def statistics(self):
+        """
+        Statistiques de chaque série (0 pour les séries de moins de deux relevés) :
+         - FollowingsGrowthRate : variation moyenne entre deux relevés ((dernier - premier) / (n - 1)) ;
+         - FollowingsVolatility : écart-type des variations entre relevés ;
+         - FollowingsMaxBurst   : plus forte hausse entre deux relevés consécutifs.
+        :return: DataFrame avec les colonnes FOLLOWING_COLUMNS, une ligne par série.
+        """
+        offsets, increments = self.increments()
+        counts = np.diff(offsets)
+        present = counts > 0
+        starts = offsets[:-1][present]
+
+        growth = np.zeros(len(self))
+        volatility = np.zeros(len(self))
+        burst = np.zeros(len(self))
+        if len(increments):
+            # Réductions segmentées : une réduction par série non vide, en un seul appel numpy
+            mean = np.add.reduceat(increments, starts) / counts[present]
+            deviations = increments - np.repeat(mean, counts[present])
+            growth[present] = mean
+            volatility[present] = np.sqrt(np.add.reduceat(deviations ** 2, starts) / counts[present])
+            burst[present] = np.maximum.reduceat(increments, starts)
+
+        return pd.DataFrame({
+            'UserId': self.user_ids,
+            'SnapshotCount': self.lengths().astype(COUNT_DTYPE),
+            'FollowingsGrowthRate': growth,
+            'FollowingsVolatility': volatility,
+            'FollowingsMaxBurst': burst
+        }, columns=FOLLOWING_COLUMNS)
+
+
+def following_statistics(followings):
+    """
+    Statistiques par utilisateur des séries de followings.
+    :param followings: Chemin d'un fichier *_followings.txt, FollowingSeries déjà lue, ou None (aucune série).
+    """
+    if followings is None:
+        # Frame vide mais typée : les caractéristiques dérivées restent numériques après la jointure
+        return FollowingSeries(np.empty(0, dtype=ID_DTYPE), np.zeros(1, dtype='int64'),
+                               np.empty(0, dtype=COUNT_DTYPE)).statistics()
+    if not isinstance(followings, FollowingSeries):
+        followings = FollowingSeries.read(followings)
+    return followings.statistics()
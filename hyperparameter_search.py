@@ -0,0 +1,291 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import BaggingClassifier, AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.naive_bayes import GaussianNB
+from data_loader import load_dataset
+from metrics import positive_scores
+from model_store import dataset_hash
+
+# Les résultats de la recherche sont rangés à côté du dossier des modèles de la Tâche 3, et non dedans :
+# ce dossier est la sortie (hachée) de l'étape model_trainer du pipeline
+SEARCH_DIR = os.path.join("Datatest", "Tache3", "search")
+
+# Familles de modèles : modèle de base et valeurs possibles de chaque hyperparamètre
+SEARCH_SPACES = {
+    "DecisionTree": (DecisionTreeClassifier(random_state=42), {
+        "max_depth": [None, 3, 5, 8, 12, 20],
+        "min_samples_leaf": [1, 2, 5, 10, 20],
+        "criterion": ["gini", "entropy"]
+    }),
+    "Bagging": (BaggingClassifier(estimator=DecisionTreeClassifier(), random_state=42), {
+        "n_estimators": [10, 25, 50, 100],
+        "max_samples": [0.5, 0.75, 1.0],
+        "max_features": [0.5, 0.75, 1.0]
+    }),
+    "AdaBoost": (AdaBoostClassifier(random_state=42), {
+        "n_estimators": [25, 50, 100, 200],
+        "learning_rate": [0.1, 0.3, 0.5, 1.0, 2.0]
+    }),
+    "GradientBoosting": (GradientBoostingClassifier(random_state=42), {
+        "n_estimators": [50, 100, 200],
+        "learning_rate": [0.03, 0.1, 0.3],
+        "max_depth": [2, 3, 4, 5],
+        "subsample": [0.7, 1.0]
+    }),
+    "RandomForest": (RandomForestClassifier(random_state=42), {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [None, 8, 16],
+        "max_features": ["sqrt", "log2", 0.5],
+        "min_samples_leaf": [1, 2, 5]
+    }),
+    "NaiveBayes": (GaussianNB(), {
+        "var_smoothing": [1e-11, 1e-10, 1e-9, 1e-8, 1e-7]
+    })
+}
+
+
+def sample_candidates(space, n_candidates, seed):
+    """Tire `n_candidates` combinations distinctes (au plus) d'hyperparamètres, de façon reproductible."""
+    rng = np.random.RandomState(seed)
+    names = sorted(space)
+    total = int(np.prod([len(space[name]) for name in names]))
+    picks = rng.choice(total, min(n_candidates, total), replace=False)
+    candidates = []
+    for pick in picks:
+        params = {}
+        for name in names:
+            pick, position = divmod(int(pick), len(space[name]))
+            params[name] = space[name][position]
+        candidates.append(params)
+    return candidates
+
+
+def budget_params(model, params, fraction):
+    """
+    Hyperparamètres d'un candidat pour un budget partiel : les ensembles utilisent aussi moins d'arbres
+    (au moins 5), en plus d'un sous-échantillon des données.
+    """
+    params = dict(params)
+    if "n_estimators" in model.get_params() and fraction < 1:
+        n_estimators = params.get("n_estimators", model.get_params()["n_estimators"])
+        params["n_estimators"] = max(5, int(round(n_estimators * fraction)))
+    return params
+
+
+def evaluate_job(key, model, params, X, y, train_index, test_index):
+    """
+    Tâche d'un processus du pool : entraîne un candidat sur un fold et retourne son AUC.
+    :param key: (famille, candidat, palier, fold), renvoyé tel quel pour identifier le résultat.
+    """
+    start = time.perf_counter()
+    estimator = clone(model).set_params(**params)
+    estimator.fit(X[train_index], y[train_index])
+    auc = roc_auc_score(y[test_index], positive_scores(estimator, X[test_index]))
+    return key, float(auc), time.perf_counter() - start
+
+
+def rung_count(n_candidates, eta):
+    """
+    Nombre de paliers : 1 + le plus grand r tel que eta^r <= n_candidates.
+    Calcul entier (un log flottant donne un palier de moins pour les puissances exactes, par ex. 243 et 3).
+    """
+    if eta < 2:
+        raise ValueError(f"eta doit être au moins 2 (reçu : {eta})")
+    n_rungs = 1
+    while eta ** n_rungs <= n_candidates:
+        n_rungs += 1
+    return n_rungs
+
+
+class SuccessiveHalvingSearch:
+    def __init__(self, X, y, spaces=SEARCH_SPACES, n_candidates=27, eta=3, min_fraction=None, cv=3,
+                 n_jobs=1, seed=42, save_dir=SEARCH_DIR):
+        """
+        Recherche d'hyperparamètres par divisions successives (successive halving), menée en parallèle
+        pour toutes les familles de modèles.
+        Au palier r, chaque candidat restant est évalué (AUC en validation croisée) sur une fraction
+        min_fraction * eta^r des données d'entraînement (et, pour les ensembles, avec autant moins d'arbres) ;
+        seul le meilleur tiers (1/eta) de chaque famille passe au palier suivant, jusqu'au budget complet.
+        Chaque évaluation (candidat, palier, fold) est ajoutée au journal dès qu'elle est terminée :
+        une recherche interrompue reprend là où elle s'était arrêtée.
+        :param X, y: Données d'entraînement (tableau ou DataFrame, labels 0/1).
+        :param n_candidates: Nombre de candidats tirés par famille.
+        :param eta: Facteur de réduction entre deux paliers.
+        :param min_fraction: Fraction des données au premier palier (par défaut eta^-(paliers - 1)).
+        :param cv: Nombre de folds de la validation croisée.
+        :param save_dir: Dossier du journal, des résultats et des meilleurs hyperparamètres.
+        """
+        self.X = np.asarray(X, dtype=np.float64)
+        self.y = np.asarray(y).astype(np.int64)
+        self.feature_names = list(X.columns) if hasattr(X, "columns") else None
+        self.spaces = spaces
+        self.n_candidates = n_candidates
+        self.eta = eta
+        self.n_rungs = rung_count(n_candidates, eta)
+        self.min_fraction = min_fraction or float(eta) ** -(self.n_rungs - 1)
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.seed = seed
+        self.save_dir = save_dir
+        self.log_path = os.path.join(save_dir, "search_log.jsonl")
+        self.config_path = os.path.join(save_dir, "search_config.json")
+
+        self.candidates = {family: sample_candidates(space, n_candidates, seed + i)
+                           for i, (family, (_, space)) in enumerate(spaces.items())}
+        self.config = {
+            "families": {family: {"model": repr(model), "space": space} for family, (model, space) in spaces.items()},
+            "n_candidates": n_candidates, "eta": eta, "min_fraction": self.min_fraction, "cv": cv, "seed": seed,
+            "data_hash": dataset_hash(self.X, self.y)
+        }
+        self.config_hash = hashlib.sha256(json.dumps(self.config, sort_keys=True, default=str).encode()).hexdigest()
+        self.evaluations = self.load_log()
+
+    def load_log(self):
+        """
+        Évaluations déjà réalisées, si le journal correspond à la même configuration ;
+        sinon le journal précédent est mis de côté et la recherche repart de zéro.
+        """
+        os.makedirs(self.save_dir, exist_ok=True)
+        if os.path.exists(self.config_path):
+            with open(self.config_path, encoding="utf-8") as f:
+                previous = json.load(f).get("config_hash")
+            if previous != self.config_hash and os.path.exists(self.log_path):
+                os.replace(self.log_path, self.log_path + ".old")
+                print("Configuration de recherche modifiée : l'ancien journal est conservé sous search_log.jsonl.old")
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            json.dump({"config_hash": self.config_hash, "config": self.config}, f, indent=2, default=str)
+
+        evaluations = {}
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par une interruption
+                        continue
+                    evaluations[tuple(entry["key"])] = entry
+        if evaluations:
+            print(f"Reprise de la recherche : {len(evaluations)} évaluations déjà au journal.")
+        return evaluations
+
+    def fraction(self, rung):
+        return min(1.0, self.min_fraction * self.eta ** rung)
+
+    def rung_splits(self, rung):
+        """Sous-échantillon stratifié du palier (le même pour tous les candidats) et ses folds."""
+        indices = np.arange(len(self.y))
+        fraction = self.fraction(rung)
+        if fraction < 1:
+            size = max(int(round(fraction * len(indices))), 10 * self.cv)
+            if size < len(indices):
+                indices, _ = train_test_split(indices, train_size=size, stratify=self.y,
+                                              random_state=self.seed + rung)
+        folds = StratifiedKFold(self.cv, shuffle=True, random_state=self.seed)
+        return [(indices[train], indices[test]) for train, test in folds.split(indices, self.y[indices])]
+
+    def mean_score(self, family, candidate, rung):
+        """AUC moyenne d'un candidat sur les folds d'un palier."""
+        return float(np.mean([self.evaluations[(family, candidate, rung, fold)]["auc"] for fold in range(self.cv)]))
+
+    def run(self):
+        """
+        Exécute (ou reprend) la recherche.
+        :return: DataFrame de toutes les évaluations agrégées (famille, candidat, palier, AUC moyenne).
+        """
+        alive = {family: list(range(len(candidates))) for family, candidates in self.candidates.items()}
+        for rung in range(self.n_rungs):
+            splits = self.rung_splits(rung)
+            fraction = self.fraction(rung)
+            jobs = []
+            for family, survivors in alive.items():
+                model = self.spaces[family][0]
+                for candidate in survivors:
+                    params = budget_params(model, self.candidates[family][candidate], fraction)
+                    for fold, (train_index, test_index) in enumerate(splits):
+                        key = (family, candidate, rung, fold)
+                        if key not in self.evaluations:
+                            jobs.append(delayed(evaluate_job)(key, model, params, self.X, self.y,
+                                                              train_index, test_index))
+            print(f"Palier {rung + 1}/{self.n_rungs} : {fraction:.1%} des données, "
+                  f"{sum(len(s) for s in alive.values())} candidats, {len(jobs)} évaluations à faire")
+
+            if jobs:
+                with open(self.log_path, "a", encoding="utf-8") as log:
+                    for key, auc, seconds in Parallel(n_jobs=self.n_jobs, return_as="generator_unordered")(jobs):
+                        entry = {"key": list(key), "auc": auc, "seconds": seconds}
+                        log.write(json.dumps(entry) + "\n")
+                        log.flush()
+                        self.evaluations[key] = entry
+
+            # Promotion : le meilleur 1/eta de chaque famille
+            if rung < self.n_rungs - 1:
+                for family, survivors in alive.items():
+                    keep = max(1, len(survivors) // self.eta)
+                    ranked = sorted(survivors, key=lambda c: self.mean_score(family, c, rung), reverse=True)
+                    alive[family] = ranked[:keep]
+
+        return self.save_results(alive)
+
+    def save_results(self, alive):
+        """Enregistre le tableau des évaluations et les meilleurs hyperparamètres de chaque famille."""
+        rows = []
+        for family, candidate, rung in sorted({key[:3] for key in self.evaluations}):
+            if family in self.candidates and all((family, candidate, rung, fold) in self.evaluations
+                                                 for fold in range(self.cv)):
+                rows.append({"Model": family, "Candidate": candidate, "Rung": rung, "Fraction": self.fraction(rung),
+                             "AUC": self.mean_score(family, candidate, rung),
+                             "Params": json.dumps(self.candidates[family][candidate], default=str)})
+        results = pd.DataFrame(rows)
+        results.to_csv(os.path.join(self.save_dir, "search_results.csv"), index=False, sep=',', encoding='utf-8')
+
+        best = {}
+        last_rung = self.n_rungs - 1
+        for family, survivors in alive.items():
+            winner = max(survivors, key=lambda c: self.mean_score(family, c, last_rung))
+            best[family] = {"params": self.candidates[family][winner], "auc": self.mean_score(family, winner, last_rung),
+                            "candidate": winner}
+        best_path = os.path.join(self.save_dir, "best_params.json")
+        with open(best_path, "w", encoding="utf-8") as f:
+            json.dump(best, f, indent=2, default=str)
+        print(f"Meilleurs hyperparamètres enregistrés : {best_path}")
+        for family, entry in best.items():
+            print(f"  {family}: AUC = {entry['auc']:.4f}, {entry['params']}")
+        return results
+
+
+def load_best_params(save_dir=SEARCH_DIR):
+    """Meilleurs hyperparamètres par famille (dictionnaire vide si aucune recherche n'a abouti)."""
+    best_path = os.path.join(save_dir, "best_params.json")
+    if not os.path.exists(best_path):
+        return {}
+    with open(best_path, encoding="utf-8") as f:
+        return {family: entry["params"] for family, entry in json.load(f).items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recherche d'hyperparamètres par divisions successives (reprise automatique)")
+    parser.add_argument("--families", nargs="*", default=list(SEARCH_SPACES), help="Familles de modèles à régler")
+    parser.add_argument("--candidates", type=int, default=27, help="Candidats tirés par famille")
+    parser.add_argument("--eta", type=int, default=3, help="Facteur de réduction entre paliers")
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    loader = load_dataset("Datatest/Tache2_donnees_final/data_final")
+    search = SuccessiveHalvingSearch(loader.X_train, loader.y_train,
+                                     spaces={family: SEARCH_SPACES[family] for family in args.families},
+                                     n_candidates=args.candidates, eta=args.eta, cv=args.cv,
+                                     n_jobs=args.n_jobs, seed=args.seed)
+    search.run()
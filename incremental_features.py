@@ -0,0 +1,108 @@
+import argparse
+import os
+import pandas as pd
+from artifact_io import resolve_artifact, save_frame
+from feature_registry import FeatureExecutor
+from following_series import FollowingSeries
+from instrumentation import REPORT
+from schema import RAW_USERS, narrow
+from tweet_stats import TweetStatsAccumulator, read_tweets
+
+
+class IncrementalFeatures:
+    def __init__(self, users_file, state_path, followings_file=None):
+        """
+        Mise à jour incrémentale des caractéristiques d'une classe d'utilisateurs.
+        L'état par utilisateur (compteurs URL/mentions/hashtags, nombre de tweets, dernier tweet, somme,
+        nombre et maximum des écarts) est persisté : appliquer un lot de nouveaux tweets coûte
+        proportionnellement à la taille du lot, pas à celle de l'historique.
+        Les tweets de chaque utilisateur doivent arriver dans l'ordre chronologique d'un lot à l'autre.
+        :param users_file: Fichier des utilisateurs (content_polluters.txt ou legitimate_users.txt).
+        :param state_path: Chemin de l'état persisté (créé au premier enregistrement).
+        :param followings_file: Fichier des séries de followings de la classe (None = caractéristiques à 0).
+        """
+        self.users = self.read_users(users_file)
+        self.followings = FollowingSeries.read(followings_file) if followings_file is not None else None
+        self.state_path = state_path
+        try:
+            resolve_artifact(state_path)
+            self.accumulator = TweetStatsAccumulator.load(state_path)
+        except FileNotFoundError:
+            self.accumulator = TweetStatsAccumulator()
+
+    @staticmethod
+    def read_users(users_file):
+        """Table des utilisateurs indexée par UserId (recherche en temps constant)."""
+        users = narrow(pd.read_csv(users_file, sep='\t', header=None), RAW_USERS)
+        return users.set_index(users[0].values)
+
+    def add_users(self, users_file):
+        """
+        Ajoute de nouveaux utilisateurs ou remplace le profil d'utilisateurs existants.
+        :return: Identifiants des utilisateurs touchés.
+        """
+        new_users = self.read_users(users_file)
+        kept = self.users[~self.users.index.isin(new_users.index)]
+        self.users = pd.concat([kept, new_users])
+        return new_users.index.tolist()
+
+    def apply_tweets(self, tweets_file, chunksize=100000):
+        """
+        Applique un lot de nouveaux tweets à l'état persisté.
+        :param tweets_file: Fichier de tweets du lot (même format que les fichiers bruts).
+        :param chunksize: Nombre de lignes lues à la fois.
+        :return: Identifiants des utilisateurs touchés.
+        """
+        touched = []
+        for chunk in read_tweets(tweets_file, chunksize):
+            touched.extend(self.accumulator.update(chunk).tolist())
+        return list(dict.fromkeys(touched))
+
+    def features(self, user_ids):
+        """
+        Recalcule les caractéristiques des utilisateurs donnés à partir de l'état courant.
+        :param user_ids: Identifiants des utilisateurs à rafraîchir (ceux absents de la table sont ignorés).
+        """
+        known = [user for user in dict.fromkeys(user_ids) if user in self.users.index]
+        executor = FeatureExecutor({
+            'users': self.users.loc[known],
+            'TweetStats': self.accumulator.result(known),
+            'followings': self.followings
+        })
+        return executor.compute().reset_index(drop=True)
+
+    def update(self, tweets_file=None, users_file=None, chunksize=100000):
+        """
+        Applique un lot (nouveaux utilisateurs et/ou nouveaux tweets), enregistre l'état
+        et retourne les caractéristiques des seuls utilisateurs touchés.
+        """
+        touched = []
+        if users_file is not None:
+            touched.extend(self.add_users(users_file))
+        if tweets_file is not None:
+            touched.extend(self.apply_tweets(tweets_file, chunksize))
+        self.save()
+        return self.features(touched)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        self.accumulator.save(self.state_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mise à jour incrémentale des caractéristiques")
+    parser.add_argument("--users", required=True, help="Fichier des utilisateurs de la classe")
+    parser.add_argument("--tweets", default=None, help="Lot de nouveaux tweets")
+    parser.add_argument("--new-users", default=None, help="Lot de nouveaux utilisateurs ou profils mis à jour")
+    parser.add_argument("--followings", default=None, help="Fichier des séries de followings de la classe")
+    parser.add_argument("--state", required=True, help="Chemin de l'état persisté par utilisateur")
+    parser.add_argument("--output", required=True, help="Fichier des caractéristiques rafraîchies")
+    parser.add_argument("--chunksize", type=int, default=100000)
+    args = parser.parse_args()
+
+    incremental = IncrementalFeatures(args.users, args.state, args.followings)
+    refreshed = incremental.update(args.tweets, args.new_users, args.chunksize)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    output_file = save_frame(refreshed, args.output)
+    print(f"{len(refreshed)} utilisateurs rafraîchis, enregistrés dans {output_file}")
+    REPORT.save()
@@ -0,0 +1,194 @@
+import os
+import time
+import joblib
+import numpy as np
+from sklearn.ensemble import BaggingClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn.tree import DecisionTreeClassifier
+from artifact_io import iter_frames
+from data_loader import file_key
+from instrumentation import record, stage
+from metrics import classification_metrics, positive_scores
+from model_store import ModelStore
+
+# Dossier des modèles entraînés par blocs, de leur manifeste et du point de reprise
+INCREMENTAL_DIR = os.path.join("Datatest", "Tache3", "Entrainement", "incremental")
+CHECKPOINT_FILE = "checkpoint.joblib"
+
+# Classes connues dès le premier bloc (un bloc peut ne contenir qu'une classe)
+CLASSES = np.array([0, 1])
+
+
+def holdout_mask(n_rows, index, test_size, random_state):
+    """
+    Lignes d'un bloc réservées au test : tirage reproductible propre à chaque bloc (même résultat
+    à l'entraînement, à la reprise et à l'évaluation, sans garder de liste de lignes en mémoire).
+    """
+    return np.random.default_rng([random_state, index]).random(n_rows) < test_size
+
+
+class IncrementalTrainer:
+    def __init__(self, data_path, chunksize=10000, test_size=0.2, random_state=42, trees_per_chunk=5,
+                 max_estimators=100, save_dir=INCREMENTAL_DIR):
+        """
+        Entraînement hors mémoire : les données finales sont lues bloc par bloc depuis le disque et les modèles
+        sont mis à jour à chaque bloc, la mémoire utilisée dépend donc de la taille d'un bloc et non du jeu complet.
+         - les modèles qui ont `partial_fit` (GaussianNB, SGDClassifier…) voient tous les blocs ;
+         - les ensembles d'arbres (warm_start) reçoivent `trees_per_chunk` nouveaux arbres (ou étapes de
+           boosting) entraînés sur chaque bloc, jusqu'à `max_estimators`.
+        Un point de reprise est écrit après chaque bloc : une exécution interrompue reprend au bloc suivant.
+        :param data_path: Chemin des données finales (.feather, .parquet ou .csv ; extension facultative).
+        :param chunksize: Nombre de lignes par bloc.
+        :param test_size: Proportion des lignes de chaque bloc réservées à l'évaluation.
+        :param random_state: Seed du tirage des lignes de test et des modèles.
+        :param trees_per_chunk: Arbres ajoutés aux ensembles à chaque bloc.
+        :param max_estimators: Taille maximale des ensembles ; les blocs suivants ne servent qu'aux modèles à partial_fit.
+        :param save_dir: Dossier des modèles et du point de reprise.
+        """
+        self.data_path = data_path
+        self.chunksize = chunksize
+        self.test_size = test_size
+        self.random_state = random_state
+        self.trees_per_chunk = trees_per_chunk
+        self.max_estimators = max_estimators
+        self.save_dir = save_dir
+        self.checkpoint_path = os.path.join(save_dir, CHECKPOINT_FILE)
+        self.store = ModelStore(save_dir)
+
+        # Modèles mis à jour par `partial_fit`
+        self.partial_models = {
+            "NaiveBayes": GaussianNB()
+        }
+        # Ensembles agrandis par warm_start (le nombre d'estimateurs est augmenté avant chaque bloc)
+        self.ensemble_models = {
+            "Bagging": BaggingClassifier(estimator=DecisionTreeClassifier(), n_estimators=trees_per_chunk,
+                                         warm_start=True, random_state=random_state),
+            "GradientBoosting": GradientBoostingClassifier(n_estimators=trees_per_chunk, warm_start=True,
+                                                           random_state=random_state),
+            "RandomForest": RandomForestClassifier(n_estimators=trees_per_chunk, warm_start=True,
+                                                   random_state=random_state)
+        }
+
+        # Progression : prochain bloc à lire, lignes d'entraînement vues et durée d'entraînement par modèle
+        self.next_chunk = 0
+        self.rows = 0
+        self.fit_seconds = {name: 0.0 for name in self.models}
+        self.scores = {}
+
+    @property
+    def models(self):
+        return {**self.partial_models, **self.ensemble_models}
+
+    def fitted_models(self):
+        """Modèles ayant reçu au moins un bloc (un ensemble n'en reçoit pas si aucun bloc n'a les deux classes)."""
+        return {name: model for name, model in self.models.items() if hasattr(model, "classes_")}
+
+    def identity(self):
+        """Description des données et du découpage : un point de reprise n'est valable que pour la même."""
+        return {"data": list(file_key(self.data_path)), "chunksize": self.chunksize, "test_size": self.test_size,
+                "random_state": self.random_state, "trees_per_chunk": self.trees_per_chunk,
+                "max_estimators": self.max_estimators}
+
+    def save_checkpoint(self):
+        """Écrit l'état courant (modèles et progression) ; le fichier est remplacé d'un coup (pas d'état partiel)."""
+        os.makedirs(self.save_dir, exist_ok=True)
+        temporary = self.checkpoint_path + ".tmp"
+        joblib.dump({"identity": self.identity(), "next_chunk": self.next_chunk, "rows": self.rows,
+                     "fit_seconds": self.fit_seconds, "partial_models": self.partial_models,
+                     "ensemble_models": self.ensemble_models}, temporary)
+        os.replace(temporary, self.checkpoint_path)
+
+    def load_checkpoint(self):
+        """
+        Reprend un entraînement interrompu.
+        :return: True si un point de reprise compatible a été chargé.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return False
+        state = joblib.load(self.checkpoint_path)
+        if state["identity"] != self.identity():
+            print(f"Point de reprise ignoré (données ou paramètres différents) : {self.checkpoint_path}")
+            return False
+        self.next_chunk, self.rows = state["next_chunk"], state["rows"]
+        self.fit_seconds = state["fit_seconds"]
+        self.partial_models, self.ensemble_models = state["partial_models"], state["ensemble_models"]
+        print(f"Reprise de l'entraînement au bloc {self.next_chunk} ({self.rows} lignes déjà vues)")
+        return True
+
+    def chunks(self, start=0):
+        """Blocs (index, X, y) des données finales à partir du bloc `start`, parties entraînement et test."""
+        for index, chunk in enumerate(iter_frames(self.data_path, self.chunksize)):
+            if index < start:
+                continue
+            test = holdout_mask(len(chunk), index, self.test_size, self.random_state)
+            X, y = chunk.drop(columns=['Classe']), chunk['Classe'].to_numpy()
+            yield index, (X[~test], y[~test]), (X[test], y[test])
+
+    def fit_chunk(self, X, y):
+        """Met à jour chaque modèle avec un bloc d'entraînement."""
+        for name, model in self.partial_models.items():
+            start = time.perf_counter()
+            model.partial_fit(X, y, classes=CLASSES)
+            self.fit_seconds[name] += time.perf_counter() - start
+
+        # Les arbres d'un ensemble doivent tous connaître les deux classes
+        if len(np.unique(y)) < len(CLASSES):
+            return
+        for name, model in self.ensemble_models.items():
+            size = len(getattr(model, "estimators_", []))
+            if size >= self.max_estimators:
+                continue
+            start = time.perf_counter()
+            model.set_params(n_estimators=min(size + self.trees_per_chunk, self.max_estimators))
+            model.fit(X, y)
+            self.fit_seconds[name] += time.perf_counter() - start
+
+    def train(self, resume=True):
+        """
+        Entraîne les modèles sur tous les blocs, puis les évalue et les enregistre.
+        :param resume: Reprend au dernier point de reprise compatible ; sinon l'entraînement recommence.
+        """
+        if not (resume and self.load_checkpoint()):
+            self.next_chunk, self.rows = 0, 0
+        print(f"\nEntraînement par blocs de {self.chunksize} lignes depuis {self.data_path}...")
+        with stage("train_incremental") as total:
+            for index, (X, y), _ in self.chunks(self.next_chunk):
+                self.fit_chunk(X, y)
+                self.rows += len(y)
+                self.next_chunk = index + 1
+                self.save_checkpoint()
+                print(f"Bloc {index} : {len(y)} lignes d'entraînement ({self.rows} au total)")
+            total["rows_out"] = self.rows
+            for name in self.models:
+                record(f"fit.{name}", self.fit_seconds[name], rows_in=self.rows)
+
+        self.evaluate()
+        for name, model in self.fitted_models().items():
+            model_path = self.store.save(name, model, metrics=self.scores[name])
+            print(f"Modèle {name} sauvegardé sous {model_path}")
+        # Entraînement terminé : le point de reprise n'est plus utile
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        print("Entraînement par blocs terminé pour tous les modèles.")
+
+    def evaluate(self):
+        """Évalue les modèles sur les lignes de test de chaque bloc (relues depuis le disque, bloc par bloc)."""
+        models = self.fitted_models()
+        y_test, scores = [], {name: [] for name in models}
+        with stage("evaluate_incremental") as total:
+            for _, _, (X, y) in self.chunks():
+                y_test.append(y)
+                for name, model in models.items():
+                    scores[name].append(positive_scores(model, X))
+            y_test = np.concatenate(y_test)
+            total["rows_out"] = len(y_test)
+
+        for name in models:
+            proba = np.concatenate(scores[name])
+            # Même règle que `predict` : la classe 1 doit être strictement plus probable
+            y_pred = (proba > 0.5).astype(y_test.dtype)
+            self.scores[name] = {"Accuracy": np.mean(y_pred == y_test),
+                                 **classification_metrics(y_test, y_pred, proba)}
+
+    def get_results(self):
+        return self.scores
@@ -0,0 +1,237 @@
+import cProfile
+import fnmatch
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+# Rapport JSON des exécutions : une entrée par script, remplacée à chaque exécution du script
+REPORT_PATH = os.environ.get("PIPELINE_REPORT", os.path.join("Datatest", "run_report.json"))
+
+# Profilage à la demande : PIPELINE_PROFILE=<motif du nom d'étape> (ex. "fit.*" ou "*TweetStats"),
+# PIPELINE_PROFILER=cprofile (défaut) ou sampling (échantillonnage de la pile, faible surcoût)
+PROFILE_PATTERN = os.environ.get("PIPELINE_PROFILE")
+PROFILER = os.environ.get("PIPELINE_PROFILER", "cprofile")
+PROFILE_DIR = os.path.join("Datatest", "profiles")
+
+# Pic de mémoire par étape : sous Linux, un thread relève la mémoire résidente courante (VmRSS) toutes les
+# RSS_INTERVAL secondes pendant les étapes ; les compteurs du noyau (VmHWM, ru_maxrss) ne sont jamais modifiés.
+# Ailleurs, seul le pic depuis le lancement du processus est disponible (ru_maxrss).
+STATUS_FILE = "/proc/self/status"
+RSS_INTERVAL = 0.01
+
+
+def read_status(field):
+    """Valeur (Mo) d'un champ de /proc/self/status, None si le fichier n'est pas disponible."""
+    try:
+        with open(STATUS_FILE) as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_mb():
+    """Mémoire résidente courante du processus (Mo), None si elle n'est pas disponible."""
+    return read_status("VmRSS:")
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus depuis son lancement (Mo)."""
+    peak = read_status("VmHWM:")
+    if peak is not None:
+        return peak
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024)
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005):
+        """
+        Profileur par échantillonnage : un thread relève la pile du thread profilé toutes les `interval`
+        secondes. Le surcoût ne dépend pas du nombre d'appels, contrairement à cProfile.
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self.thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self.sample, daemon=True)
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def enable(self):
+        self.sampler.start()
+
+    def disable(self):
+        self.stopped.set()
+        self.sampler.join()
+
+    def save(self, path):
+        """Écrit les piles agrégées au format « folded » (flamegraph.pl, speedscope)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def summary(self, limit=15):
+        """Fonctions les plus souvent en haut de la pile (temps propre)."""
+        total = sum(self.stacks.values()) or 1
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return "\n".join(f"{count / total:6.1%}  {name}" for name, count in leaves.most_common(limit))
+
+
+class RunReport:
+    def __init__(self, name, path=REPORT_PATH):
+        """
+        Mesures des étapes d'un script : durée, temps CPU, pic de mémoire et nombre de lignes.
+        Les étapes peuvent être imbriquées ; leur nom complet est le chemin « parent/enfant ».
+        :param name: Nom du script (clé de l'entrée dans le rapport JSON).
+        :param path: Fichier du rapport JSON, partagé par tous les scripts du pipeline.
+        """
+        self.name = name
+        self.path = path
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.stages = []
+        self.open = []
+        self.peak_per_stage = current_rss_mb() is not None
+        # Plus forte mémoire relevée pendant chaque étape ouverte ([Mo], dans l'ordre de `open`) :
+        # seul le thread de relevé (démarré à la première étape) les modifie
+        self.samples = []
+        self.sampling = threading.Event()
+        self.sampler = None
+
+    def start_sampler(self):
+        """Démarre le thread de relevé de la mémoire (de nouveau dans un processus fils après un fork)."""
+        if self.peak_per_stage and (self.sampler is None or not self.sampler.is_alive()):
+            self.sampling = threading.Event()
+            self.sampler = threading.Thread(target=self.sample, daemon=True)
+            self.sampler.start()
+
+    def sample(self):
+        """
+        Reporte la mémoire courante sur toutes les étapes ouvertes ; le pic de l'étape est calculé à sa fermeture.
+        Une pointe plus courte que l'intervalle peut échapper au relevé ; le pic exact du processus reste
+        celui du noyau (process_peak_rss_mb).
+        """
+        while True:
+            self.sampling.wait()
+            rss = current_rss_mb()
+            for sample in list(self.samples):
+                sample[0] = max(sample[0], rss)
+            time.sleep(RSS_INTERVAL)
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Mesure une étape. Le dictionnaire retourné peut être complété (par ex. record["rows_out"] = len(df)).
+        Si le nom complet correspond à PIPELINE_PROFILE, l'étape est aussi profilée.
+        """
+        path = "/".join([self.open[-1]["name"], name]) if self.open else name
+        record = {"name": path, "rows_in": rows_in, "rows_out": None}
+        # Sans relevé possible, le pic de l'étape est celui du processus (depuis son lancement)
+        record["peak_rss_mb"] = current_rss_mb() if self.peak_per_stage else peak_rss_mb()
+        sample = [record["peak_rss_mb"]]
+        self.start_sampler()
+        self.open.append(record)
+        self.samples.append(sample)
+        self.sampling.set()
+
+        profiler = None
+        if PROFILE_PATTERN and fnmatch.fnmatch(path, PROFILE_PATTERN):
+            profiler = SamplingProfiler() if PROFILER == "sampling" else cProfile.Profile()
+            profiler.enable()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 4)
+            record["cpu_seconds"] = round(time.process_time() - cpu_start, 4)
+            if profiler is not None:
+                profiler.disable()
+                record["profile"] = self.save_profile(path, profiler)
+            self.open.pop()
+            self.samples.pop()
+            if not self.open:
+                self.sampling.clear()
+            end = current_rss_mb() if self.peak_per_stage else peak_rss_mb()
+            peak = max(record["peak_rss_mb"], sample[0], end)
+            for parent in self.open:
+                parent["peak_rss_mb"] = max(parent["peak_rss_mb"], peak)
+            record["peak_rss_mb"] = round(peak, 1)
+            self.stages.append(record)
+
+    def annotate(self, **fields):
+        """Ajoute des informations à l'étape en cours (par ex. la mémoire gagnée) ; sans effet hors d'une étape."""
+        if self.open:
+            self.open[-1].update(fields)
+
+    def record(self, name, seconds, cpu_seconds=None, rows_in=None, rows_out=None, **extra):
+        """Ajoute une étape mesurée ailleurs (par ex. dans un processus du pool), sans pic de mémoire."""
+        path = "/".join([self.open[-1]["name"], name]) if self.open else name
+        self.stages.append({"name": path, "rows_in": rows_in, "rows_out": rows_out, "seconds": round(seconds, 4),
+                            "cpu_seconds": None if cpu_seconds is None else round(cpu_seconds, 4),
+                            "peak_rss_mb": None, **extra})
+
+    def save_profile(self, path, profiler):
+        """Enregistre le profil d'une étape dans Datatest/profiles et affiche les fonctions les plus coûteuses."""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"{self.name}.{path.replace('/', '.')}")
+        if isinstance(profiler, SamplingProfiler):
+            target = base + ".folded"
+            profiler.save(target)
+            summary = profiler.summary()
+        else:
+            target = base + ".prof"
+            profiler.dump_stats(target)
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(15)
+            summary = output.getvalue()
+        print(f"Profil de l'étape {path} enregistré : {target}\n{summary}")
+        return target
+
+    def to_dict(self):
+        return {"started": self.started, "pid": os.getpid(), "peak_per_stage": self.peak_per_stage,
+                "process_peak_rss_mb": round(peak_rss_mb(), 1), "stages": self.stages}
+
+    def save(self):
+        """Enregistre les mesures dans le rapport JSON (les entrées des autres scripts sont conservées)."""
+        if not self.stages:
+            return
+        report = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    report = json.load(f)
+            except (OSError, ValueError):
+                report = {}
+        report[self.name] = self.to_dict()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+# Rapport du processus courant : chaque script l'enregistre explicitement à la fin de son main (REPORT.save()),
+# un module importé comme bibliothèque n'écrit donc aucun fichier
+REPORT = RunReport(os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python")
+stage = REPORT.stage
+record = REPORT.record
+annotate = REPORT.annotate
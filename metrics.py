@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from sklearn.metrics import confusion_matrix
+
+# Métriques de comparaison utilisées dans tout le projet
+METRICS = ["TP_Rate", "FP_Rate", "F1-score", "AUC"]
+
+
+def count_metrics(tp, fp, fn, tn):
+    """
+    TP Rate, FP Rate, précision et F1-score de la classe 1 à partir des comptes de la matrice de confusion.
+    Seule implémentation de ces formules dans le projet : toutes les autres fonctions de ce module s'en servent.
+    Les comptes peuvent être des scalaires ou des tableaux (une valeur par modèle ou par seuil) ;
+    une métrique dont le dénominateur est nul vaut 0.
+    :return: Dictionnaire nom -> tableau de métriques.
+    """
+    tp, fp, fn, tn = (np.asarray(count, dtype=np.float64) for count in (tp, fp, fn, tn))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {"TP_Rate": np.where(tp + fn > 0, tp / (tp + fn), 0.0),
+                "FP_Rate": np.where(fp + tn > 0, fp / (fp + tn), 0.0),
+                "Precision": np.where(tp + fp > 0, tp / (tp + fp), 0.0),
+                "F1-score": np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)}
+
+
+def classification_metrics(y_true, y_pred, y_prob=None):
+    """
+    Calcule le taux de vrais positifs, le taux de faux positifs, le F1-score de la classe 1 et l'AUC
+    (mêmes formules que `evaluate_scores`, voir count_metrics et curve_auc).
+    :param y_true: Labels réels (0 = légitime, 1 = pollueur).
+    :param y_pred: Labels prédits.
+    :param y_prob: Probabilités de la classe 1 (AUC = NaN si absentes ou si y_true ne contient qu'une classe).
+    """
+    tn, fp, fn, tp = confusion_matrix(y_true, y_pred, labels=[0, 1]).ravel()
+    metrics = count_metrics(tp, fp, fn, tn)
+    auc = curve_auc(threshold_curve(y_true, y_prob)) if y_prob is not None else np.nan
+    return {"TP_Rate": float(metrics["TP_Rate"]), "FP_Rate": float(metrics["FP_Rate"]),
+            "F1-score": float(metrics["F1-score"]), "AUC": auc}
+
+
+def positive_scores(model, X):
+    """
+    Probabilités de la classe 1 obtenues en un seul appel à `predict_proba`
+    (à défaut, labels de `predict`, utilisés comme scores).
+    """
+    if hasattr(model, "predict_proba"):
+        proba = model.predict_proba(X)
+        return proba[:, list(model.classes_).index(1)]
+    return np.asarray(model.predict(X), dtype=np.float64)
+
+
+def threshold_curve(y_true, scores):
+    """
+    Courbes ROC et précision-rappel à partir d'un seul tri des scores.
+    Chaque ligne correspond à un score distinct t, avec la règle « pollueur si score >= t ».
+    :return: Dictionnaire de tableaux : Threshold, TP, FP, TP_Rate, FP_Rate, Precision, F1-score (seuils décroissants).
+    """
+    y_true = np.asarray(y_true) == 1
+    scores = np.asarray(scores, dtype=np.float64)
+    order = np.argsort(scores, kind="mergesort")[::-1]
+    sorted_scores = scores[order]
+    # Dernière position de chaque score distinct : les ex æquo franchissent le seuil ensemble
+    last = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(scores) - 1]
+    tp = np.cumsum(y_true[order])[last]
+    fp = last + 1 - tp
+    positives, negatives = y_true.sum(), len(y_true) - y_true.sum()
+    return {"Threshold": sorted_scores[last], "TP": tp, "FP": fp,
+            **count_metrics(tp, fp, positives - tp, negatives - fp),
+            "Positives": positives, "Negatives": negatives}
+
+
+def curve_auc(curve):
+    """Aire sous la courbe ROC (trapèzes depuis (0, 0)), égale à `roc_auc_score`."""
+    if curve["Positives"] == 0 or curve["Negatives"] == 0:
+        return np.nan
+    tp_rate, fp_rate = np.r_[0.0, curve["TP_Rate"]], np.r_[0.0, curve["FP_Rate"]]
+    return float(np.sum(np.diff(fp_rate) * (tp_rate[1:] + tp_rate[:-1]) / 2))
+
+
+def metrics_at_thresholds(curve, thresholds):
+    """
+    Métriques pour plusieurs seuils, lues sur la courbe sans recalcul : règle « pollueur si score > seuil »
+    (celle de `predict` pour un classifieur binaire au seuil 0.5).
+    :return: DataFrame indexé par seuil (TP_Rate, FP_Rate, Precision, F1-score).
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    # Nombre de scores distincts strictement supérieurs à chaque seuil (les seuils de la courbe sont décroissants)
+    count = np.searchsorted(-curve["Threshold"], -thresholds, side="left")
+    tp = np.where(count > 0, curve["TP"][np.maximum(count - 1, 0)], 0)
+    fp = np.where(count > 0, curve["FP"][np.maximum(count - 1, 0)], 0)
+    metrics = count_metrics(tp, fp, curve["Positives"] - tp, curve["Negatives"] - fp)
+    return pd.DataFrame(metrics, index=pd.Index(thresholds, name="Threshold"))
+
+
+def evaluate_scores(y_true, scores, threshold=0.5):
+    """
+    TP Rate, FP Rate, F1-score et AUC de plusieurs modèles en une passe vectorisée.
+    Les labels sont déduits des scores (pollueur si score > seuil) : aucun appel à `predict`.
+    :param scores: Dictionnaire nom du modèle -> probabilités de la classe 1 (même ordre que y_true).
+    :return: (DataFrame des métriques par modèle, dictionnaire nom -> courbe de `threshold_curve`).
+    """
+    names = list(scores)
+    y_true = np.asarray(y_true) == 1
+    matrix = np.vstack([np.asarray(scores[name], dtype=np.float64) for name in names])
+    predicted = matrix > threshold
+    tp = (predicted & y_true).sum(axis=1)
+    fp = (predicted & ~y_true).sum(axis=1)
+    fn = y_true.sum() - tp
+    tn = (~y_true).sum() - fp
+    curves = {name: threshold_curve(y_true, matrix[i]) for i, name in enumerate(names)}
+    metrics = count_metrics(tp, fp, fn, tn)
+    results = pd.DataFrame({"TP_Rate": metrics["TP_Rate"], "FP_Rate": metrics["FP_Rate"],
+                            "F1-score": metrics["F1-score"], "AUC": [curve_auc(curves[name]) for name in names]},
+                           index=names)
+    return results, curves
+
+
+def curves_frame(curves):
+    """Courbes ROC/PR de tous les modèles dans un seul DataFrame (une ligne par modèle et par seuil)."""
+    columns = ["Threshold", "TP_Rate", "FP_Rate", "Precision", "F1-score"]
+    return pd.concat([pd.DataFrame({column: curve[column] for column in columns}).assign(Model=name)
+                      for name, curve in curves.items()], ignore_index=True)[["Model"] + columns]
+
+
+def threshold_table(curves, thresholds=np.linspace(0.05, 0.95, 19)):
+    """Métriques de tous les modèles sur une grille de seuils (une ligne par modèle et par seuil)."""
+    table = pd.concat([metrics_at_thresholds(curve, thresholds).reset_index().assign(Model=name)
+                       for name, curve in curves.items()], ignore_index=True)
+    return table[["Model"] + [column for column in table.columns if column != "Model"]]
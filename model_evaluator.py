@@ -1,46 +1,46 @@
+import argparse
 import os
-import pickle
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import classification_report, roc_auc_score, confusion_matrix
 import pandas as pd
-from data_loader import DataLoader
+from data_loader import load_dataset
+from instrumentation import REPORT, stage
+from metrics import curves_frame, evaluate_scores, positive_scores, threshold_table
+from model_store import ModelStore
+from reporting import ChartRenderer, render_bar, render_heatmap, render_lines
+
+# Données finales et dossier des modèles de la Tâche 3
+DATA_PATH = "Datatest/Tache2_donnees_final/data_final"
+MODEL_DIR = "Datatest/Tache3/Entrainement"
 
 class ModelEvaluator:
-    def __init__(self, trained_models):
+    def __init__(self, trained_models, plots=None):
+        """
+        :param trained_models: Dictionnaire nom -> modèle (éventuellement chargé à la demande).
+        :param plots: Génère les graphiques (par défaut selon PIPELINE_PLOTS) ; ils sont rendus en arrière-plan.
+        """
         self.trained_models = trained_models
         self.results = {}
+        self.curves = {}
 
         # Dossier principal pour stocker les résultats
         self.save_dir = "Datatest/Tache3/Results"
         os.makedirs(self.save_dir, exist_ok=True)
+        self.renderer = ChartRenderer(self.save_dir, enabled=plots)
 
-        # Sous-dossiers pour chaque métrique
+        # Sous-dossiers pour chaque métrique (créés au rendu des graphiques)
         self.metric_dirs = {
             "TP_Rate": os.path.join(self.save_dir, "TP_Rate"),
             "FP_Rate": os.path.join(self.save_dir, "FP_Rate"),
             "F1-score": os.path.join(self.save_dir, "F1-score"),
             "AUC": os.path.join(self.save_dir, "AUC")
         }
-        for path in self.metric_dirs.values():
-            os.makedirs(path, exist_ok=True)
 
     @staticmethod
     def load_models(model_dir):
-        """Charge les modèles sauvegardés."""
-        trained_models = {}
-        if not os.path.exists(model_dir):
-            return trained_models
-        
-        for filename in os.listdir(model_dir):
-            if filename.endswith(".pkl"):
-                model_name = filename.replace(".pkl", "")
-                model_path = os.path.join(model_dir, filename)
-                with open(model_path, "rb") as f:
-                    trained_models[model_name] = pickle.load(f)
-                print(f"Modèle chargé : {model_name}")
-        return trained_models
+        """
+        Liste les modèles sauvegardés (manifeste du dossier et anciens .pkl).
+        Chaque modèle n'est chargé, par projection mémoire, qu'au moment où il est évalué.
+        """
+        return ModelStore(model_dir).lazy()
 
 
 
@@ -53,50 +53,39 @@ class ModelEvaluator:
 
         # Sauvegarde en PNG
         save_png_path = os.path.join(self.save_dir, "summary_table.png")
-        plt.figure(figsize=(10, 4))
-        sns.heatmap(df, annot=True, fmt=".4f", cmap="Blues", linewidths=0.5)
-        plt.title("Tableau récapitulatif des performances des modèles")
-        plt.savefig(save_png_path, bbox_inches='tight')
-        print(f"Tableau récapitulatif sauvegardé en image : {save_png_path}")
-        plt.close()
+        self.renderer.submit(render_heatmap, save_png_path, values=df.values.tolist(), index=df.index.tolist(),
+                             columns=df.columns.tolist(), title="Tableau récapitulatif des performances des modèles")
+
 
 
 
+    def save_curves(self):
+        """Sauvegarde les courbes ROC/PR complètes et les métriques sur une grille de seuils (CSV)."""
+        curves_path = os.path.join(self.save_dir, "roc_pr_curves.csv")
+        curves_frame(self.curves).to_csv(curves_path, index=False, sep=',', encoding='utf-8')
+        thresholds_path = os.path.join(self.save_dir, "threshold_metrics.csv")
+        threshold_table(self.curves).to_csv(thresholds_path, index=False, sep=',', encoding='utf-8')
+        print(f"Courbes et métriques par seuil sauvegardées : {curves_path}, {thresholds_path}")
 
     def plot_individual_metric(self, metric, values):
         """Génère un graphique pour une métrique spécifique."""
-        plt.figure(figsize=(10, 5))
-        sns.barplot(x=list(values.keys()), y=list(values.values()), hue=list(values.keys()), palette="viridis", legend=False)
-        plt.xlabel("Modèles")
-        plt.ylabel("Score")
-        plt.title(f"Comparaison des performances - {metric}")
-        plt.xticks(rotation=45)
         save_path = os.path.join(self.metric_dirs[metric], f"{metric}_comparaison.png")
-        plt.savefig(save_path)
-        print(f"Graphique enregistré : {save_path}")
-        plt.close()
+        self.renderer.submit(render_bar, save_path, labels=list(values.keys()), values=list(values.values()),
+                             title=f"Comparaison des performances - {metric}", xlabel="Modèles", ylabel="Score")
 
     def plot_combined_metrics(self):
         """ Génère un graphique unique combinant les 4 métriques."""
-        plt.figure(figsize=(12, 6))
-        
         models = list(self.results.keys())
         metrics = ["TP_Rate", "FP_Rate", "F1-score", "AUC"]
         colors = ["blue", "red", "green", "purple"]
         markers = ["o", "s", "D", "*"]
         
-        for metric, color, marker in zip(metrics, colors, markers):
-            scores = [self.results[model][metric] for model in models]
-            plt.plot(models, scores, marker=marker, linestyle="-", linewidth=2, markersize=8, label=metric, color=color)
-        
-        plt.xlabel("Modèles")
-        plt.ylabel("Score")
-        plt.title("Comparaison globale des performances des modèles")
-        plt.legend()
+        series = [{"values": [self.results[model][metric] for model in models], "label": metric,
+                   "color": color, "marker": marker} for metric, color, marker in zip(metrics, colors, markers)]
         
         save_path = os.path.join(self.save_dir, "Comparaison_globale.png")
-        plt.savefig(save_path)
-        plt.close()
+        self.renderer.submit(render_lines, save_path, x=models, series=series,
+                             title="Comparaison globale des performances des modèles")
 
     def plot_metrics(self):
         metrics = ["TP_Rate", "FP_Rate", "F1-score", "AUC"]
@@ -106,6 +95,7 @@ class ModelEvaluator:
             self.plot_individual_metric(metric, values)
         
         self.plot_combined_metrics()
+        self.renderer.close()
 
     def evaluate_models(self, X_test, y_test):
         print("\nDébut de l'évaluation des modèles...")
@@ -115,63 +105,62 @@ class ModelEvaluator:
         
         print("Modèles disponibles pour l'évaluation :", list(self.trained_models.keys()))
 
+        # Une seule inférence par modèle : les labels sont déduits des probabilités
+        scores = {}
         for name, model in self.trained_models.items():
             print(f"Évaluation du modèle {name}...")
             
             try:
-                y_pred = model.predict(X_test)
-                y_prob = model.predict_proba(X_test)[:, 1] if hasattr(model, "predict_proba") else None
-                
-                tn, fp, fn, tp = confusion_matrix(y_test, y_pred).ravel()
-                tp_rate = tp / (tp + fn) if (tp + fn) > 0 else 0
-                fp_rate = fp / (fp + tn) if (fp + tn) > 0 else 0
-                
-                f1 = classification_report(y_test, y_pred, output_dict=True)['1']['f1-score']
-                auc = roc_auc_score(y_test, y_prob) if y_prob is not None else np.nan
-                
-                self.results[name] = {
-                    "TP_Rate": tp_rate,
-                    "FP_Rate": fp_rate,
-                    "F1-score": f1,
-                    "AUC": auc
-                }
-                print(f"Résultats enregistrés pour {name} : {self.results[name]}")
-            
+                with stage(f"predict.{name}", rows_in=len(X_test)) as record:
+                    scores[name] = positive_scores(model, X_test)
+                    record["rows_out"] = len(scores[name])
             except Exception as e:
                 print(f"Erreur lors de l'évaluation du modèle {name} : {e}")
 
+        if not scores:
+            print("Aucun modèle n'a pu être évalué.")
+            return
+        results, self.curves = evaluate_scores(y_test, scores)
+        self.results = results.to_dict(orient="index")
+        for name in self.results:
+            print(f"Résultats enregistrés pour {name} : {self.results[name]}")
+
         print("Évaluation terminée !")
         self.generate_summary_table()
+        self.save_curves()
         self.plot_metrics()
 
-# Chargement des données
-print("Début du chargement des données...")
-loader = DataLoader("Datatest/Tache2_donnees_final/data_final.csv")
-X_test, y_test = loader.X_test, loader.y_test
-print("Données chargées avec succès.")
-
-# Chargement des modèles
-print("Début du chargement des modèles...")
-model_dir = "Datatest/Tache3/Entrainement"
-trained_models = ModelEvaluator.load_models(model_dir)
-
-# Vérification et évaluation des modèles
-if trained_models:
-    print("* Modèles trouvés, lancement de l'évaluation...")
-    evaluator = ModelEvaluator(trained_models)
-    evaluator.evaluate_models(X_test, y_test)
-else:
+def main(argv=None):
+    """
+    Point d'entrée du script : évalue les modèles sauvegardés sur l'ensemble de test.
+    Les données viennent du cache du processus : après `model_trainer.main()`, elles ne sont pas relues.
+    :return: ModelEvaluator (None si aucun modèle n'est trouvé).
+    """
+    parser = argparse.ArgumentParser(description="Évaluation des modèles de la Tâche 3")
+    parser.add_argument("--no-plots", action="store_true", help="N'écrit que les tableaux, sans graphiques")
+    args = parser.parse_args(argv)
+
+    # Chargement des données
+    print("Début du chargement des données...")
+    loader = load_dataset(DATA_PATH)
+    X_test, y_test = loader.X_test, loader.y_test
+    print("Données chargées avec succès.")
+
+    # Chargement des modèles
+    print("Début du chargement des modèles...")
+    trained_models = ModelEvaluator.load_models(MODEL_DIR)
+
+    # Vérification et évaluation des modèles
+    if trained_models:
+        print("* Modèles trouvés, lancement de l'évaluation...")
+        evaluator = ModelEvaluator(trained_models, plots=False if args.no_plots else None)
+        with stage("evaluate_models", rows_in=len(X_test)):
+            evaluator.evaluate_models(X_test, y_test)
+        return evaluator
     print("--- Aucun modèle trouvé, évaluation annulée !")
-''
-
-
-
-
-
-
-
-
-
-
+    return None
 
 
+if __name__ == "__main__":
+    main()
+    REPORT.save()
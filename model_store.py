@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import pickle
+from collections.abc import Mapping
+from datetime import datetime, timezone
+import joblib
+import numpy as np
+import pandas as pd
+
+# Manifeste des modèles d'un dossier d'entraînement
+MANIFEST_FILE = "manifest.json"
+
+
+def dataset_hash(X, y=None):
+    """
+    Empreinte SHA-256 des données d'entraînement (noms de colonnes, valeurs et labels).
+    :param X: DataFrame ou tableau numpy.
+    :param y: Labels (facultatifs).
+    """
+    digest = hashlib.sha256()
+    if hasattr(X, "columns"):
+        digest.update(json.dumps([str(column) for column in X.columns]).encode())
+    for data in (X, y):
+        if data is not None:
+            values = np.ascontiguousarray(np.asarray(data, dtype=np.float64))
+            digest.update(str(values.shape).encode())
+            digest.update(values.data)
+    return digest.hexdigest()
+
+
+def to_json(value):
+    """Convertit les scalaires numpy (et NaN) en valeurs JSON."""
+    if isinstance(value, dict):
+        return {str(key): to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_json(item) for item in value]
+    if isinstance(value, (np.integer, np.floating, float)):
+        value = float(value)
+        return None if np.isnan(value) else value
+    return value
+
+
+class ModelStore:
+    def __init__(self, directory):
+        """
+        Dossier de modèles entraînés décrit par un manifeste (manifest.json) : pour chaque modèle, son fichier,
+        le schéma des caractéristiques, l'empreinte des données d'entraînement et ses métriques.
+        Les modèles sont enregistrés avec joblib : les tableaux numpy (nœuds des arbres, poids…) sont stockés
+        à part et relus par projection mémoire au lieu d'être désérialisés.
+        Les anciens fichiers .pkl absents du manifeste restent lisibles.
+        :param directory: Dossier des modèles (par ex. Datatest/Tache3/Entrainement).
+        """
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_manifest(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def save(self, name, model, feature_names=None, data_hash=None, metrics=None, compress=0):
+        """
+        Enregistre un modèle et sa description dans le manifeste.
+        :param feature_names: Colonnes attendues en entrée (par défaut `feature_names_in_` du modèle).
+        :param data_hash: Empreinte des données d'entraînement (voir `dataset_hash`).
+        :param metrics: Dictionnaire de métriques (scores de validation croisée…).
+        :param compress: Niveau de compression joblib (0 = aucun, indispensable pour la projection mémoire).
+        :return: Chemin du fichier du modèle.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"{name}.joblib"
+        path = os.path.join(self.directory, filename)
+        joblib.dump(model, path, compress=compress)
+        # Un ancien {name}.pkl est laissé en place : l'entrée du manifeste est prioritaire (voir legacy_files)
+
+        if feature_names is None and hasattr(model, "feature_names_in_"):
+            feature_names = model.feature_names_in_
+        self.manifest[name] = {
+            "file": filename,
+            "class": type(model).__name__,
+            "feature_names": to_json(list(feature_names)) if feature_names is not None else None,
+            "data_hash": data_hash,
+            "metrics": to_json(metrics or {}),
+            "compressed": bool(compress),
+            "size": os.path.getsize(path),
+            "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds")
+        }
+        self.save_manifest()
+        return path
+
+    def record_metrics(self, name, metrics):
+        """Ajoute (ou remplace) des métriques dans l'entrée d'un modèle, par ex. après l'évaluation sur le test."""
+        self.manifest[name]["metrics"].update(to_json(metrics))
+        self.save_manifest()
+
+    def legacy_files(self):
+        """Fichiers .pkl (ancien format) dont le modèle n'est pas dans le manifeste."""
+        if not os.path.isdir(self.directory):
+            return {}
+        return {filename[:-len(".pkl")]: filename for filename in sorted(os.listdir(self.directory))
+                if filename.endswith(".pkl") and filename[:-len(".pkl")] not in self.manifest}
+
+    def names(self):
+        """Noms des modèles disponibles (manifeste puis anciens .pkl)."""
+        return list(self.manifest) + list(self.legacy_files())
+
+    def info(self, name):
+        """Entrée du manifeste d'un modèle (None pour un ancien .pkl)."""
+        return self.manifest.get(name)
+
+    def load(self, name, mmap=True):
+        """
+        Charge un seul modèle.
+        :param mmap: Relit les tableaux numpy par projection mémoire (sans effet pour un fichier compressé).
+        """
+        entry = self.manifest.get(name)
+        if entry is None:
+            with open(os.path.join(self.directory, self.legacy_files()[name]), "rb") as f:
+                return pickle.load(f)
+        mmap_mode = "r" if mmap and not entry["compressed"] else None
+        return joblib.load(os.path.join(self.directory, entry["file"]), mmap_mode=mmap_mode)
+
+    def lazy(self, mmap=True):
+        """Dictionnaire nom -> modèle dont chaque modèle n'est chargé qu'au premier accès."""
+        return LazyModels(self, mmap)
+
+    def summary(self):
+        """Manifeste sous forme de DataFrame (une ligne par modèle, métriques à plat)."""
+        rows = {name: {"class": entry["class"], "data_hash": entry["data_hash"], "size": entry["size"],
+                       **entry["metrics"]} for name, entry in self.manifest.items()}
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+
+class LazyModels(Mapping):
+    def __init__(self, store, mmap=True):
+        """
+        Vue en lecture des modèles d'un ModelStore : lister ou itérer ne lit aucun fichier,
+        chaque modèle est chargé au premier accès puis gardé en mémoire.
+        """
+        self.store = store
+        self.mmap = mmap
+        self.loaded = {}
+        self.model_names = store.names()
+
+    def __getitem__(self, name):
+        if name not in self.loaded:
+            if name not in self.model_names:
+                raise KeyError(name)
+            self.loaded[name] = self.store.load(name, self.mmap)
+            print(f"Modèle chargé : {name}")
+        return self.loaded[name]
+
+    def __iter__(self):
+        return iter(self.model_names)
+
+    def __len__(self):
+        return len(self.model_names)
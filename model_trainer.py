@@ -1,21 +1,34 @@
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import BaggingClassifier, AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
 from sklearn.naive_bayes import GaussianNB
-from sklearn.model_selection import cross_val_score
+import argparse
 import numpy as np
-import pickle
 import os
-from data_loader import DataLoader
+from data_loader import load_dataset
+from metrics import METRICS
+from model_store import ModelStore, dataset_hash
+from parallel_training import train_models
+from hyperparameter_search import load_best_params
+from incremental_training import IncrementalTrainer
+from instrumentation import REPORT, record, stage
+from tree_export import export_models
+
+# Données finales (fichier .feather, .parquet ou .csv ; extension facultative)
+DATA_PATH = "Datatest/Tache2_donnees_final/data_final"
 
 class ModelTrainer:
-    def __init__(self, X_train, y_train):
+    def __init__(self, X_train, y_train, n_jobs=1, feature_names=None):
         """
         Classe pour entraîner plusieurs modèles de classification.
         :param X_train: Données d'entraînement (features).
         :param y_train: Labels d'entraînement.
+        :param n_jobs: Nombre de processus pour l'entraînement (1 = séquentiel, -1 = tous les cœurs).
+        :param feature_names: Noms des colonnes si X_train est un tableau numpy (bloc partagé).
         """
         self.X_train = X_train
         self.y_train = y_train
+        self.n_jobs = n_jobs
+        self.feature_names = feature_names
         
         # Dictionnaire des modèles
         self.models = {
@@ -29,37 +42,62 @@ class ModelTrainer:
         
         # Dictionnaire pour stocker les performances
         self.scores = {}
+
+        # Métriques par fold et probabilités hors-fold issues de la validation croisée
+        self.fold_metrics = {}
+        self.oof_probas = {}
         
-        # Dossier pour stocker les modèles entraînés
+        # Dossier pour stocker les modèles entraînés (avec son manifeste)
         self.save_dir = "Datatest/Tache3/Entrainement"
-        os.makedirs(self.save_dir, exist_ok=True)
+        self.store = ModelStore(self.save_dir)
     
-    def train_and_evaluate(self, cv=5):
+    def apply_params(self, best_params):
+        """
+        Remplace les hyperparamètres fixes par ceux trouvés par la recherche (hyperparameter_search.py).
+        :param best_params: Dictionnaire famille -> hyperparamètres ; les familles absentes gardent leurs valeurs.
+        """
+        for name, params in best_params.items():
+            if name in self.models:
+                self.models[name].set_params(**params)
+                print(f"Hyperparamètres réglés pour {name} : {params}")
+
+    def train_and_evaluate(self, cv=5, refit=True):
         """
         Entraîne chaque modèle et effectue une validation croisée.
+        Les tâches (modèle, fold) sont réparties sur `n_jobs` processus et les prédictions hors-fold
+        servent à calculer TP/FP Rate, F1-score et AUC par fold sans entraînement supplémentaire.
         Sauvegarde également les modèles entraînés.
         :param cv: Nombre de folds pour la validation croisée.
+        :param refit: Si False, le modèle sauvegardé est l'ensemble des modèles de fold (FoldEnsemble)
+                      et l'entraînement sur tout X_train est évité.
         """
-        print("\nEntraînement des modèles...")
-        for name, model in self.models.items():
-            print(f"Entraînement du modèle {name}...")
-            
-            # Entraîner le modèle
-            model.fit(self.X_train, self.y_train)
-            
-            # Validation croisée
-            accuracy = cross_val_score(model, self.X_train, self.y_train, cv=cv, scoring='accuracy')
+        print(f"\nEntraînement des modèles (n_jobs={self.n_jobs})...")
+        data_hash = dataset_hash(self.X_train, self.y_train)
+        with stage("train_and_evaluate", rows_in=len(self.X_train)):
+            results = train_models(self.models, self.X_train, self.y_train, cv=cv, n_jobs=self.n_jobs, refit=refit,
+                                   feature_names=self.feature_names)
+            # Durée cumulée des tâches de chaque modèle, mesurée dans les processus du pool
+            for name in self.models:
+                record(f"fit.{name}", results[name]["fit_seconds"], results[name]["fit_cpu_seconds"],
+                       rows_in=len(self.X_train))
+
+        for name in self.models:
+            model = self.models[name] = results[name]["model"]
+            accuracy = results[name]["fold_accuracy"]
+            self.fold_metrics[name] = results[name]["fold_metrics"]
+            self.oof_probas[name] = results[name]["oof_proba"]
             
             # Stocker les scores
             self.scores[name] = {
                 "Mean Accuracy": np.mean(accuracy),
                 "Std Dev": np.std(accuracy)
             }
+            for metric in METRICS:
+                self.scores[name][f"CV {metric}"] = np.mean([fold[metric] for fold in self.fold_metrics[name]])
             
             # Sauvegarde du modèle entraîné
-            model_path = os.path.join(self.save_dir, f"{name}.pkl")
-            with open(model_path, 'wb') as f:
-                pickle.dump(model, f)
+            model_path = self.store.save(name, model, feature_names=self.feature_names, data_hash=data_hash,
+                                         metrics=self.scores[name])
             print(f"Modèle {name} sauvegardé sous {model_path}")
         
         print("Entraînement terminé pour tous les modèles.")
@@ -70,23 +108,66 @@ class ModelTrainer:
         """
         return self.scores
 
-# Chargement des données
-loader = DataLoader("Datatest/Tache2_donnees_final/data_final.csv")
-X_train, y_train = loader.X_train, loader.y_train
-
-# Entraînement des modèles
-trainer = ModelTrainer(X_train, y_train)
-trainer.train_and_evaluate()
-
-# Affichage des résultats
-results = trainer.get_results()
-print("\nRésultats des modèles :")
-for model, score in results.items():
-    print(f"{model}: Mean Accuracy = {score['Mean Accuracy']:.4f}, Std Dev = {score['Std Dev']:.4f}")
 
+def main(argv=None):
+    """
+    Point d'entrée du script : charge les données (cache du processus), entraîne et sauvegarde les modèles.
+    :param argv: Arguments de la ligne de commande (par défaut ceux du processus).
+    :return: ModelTrainer entraîné.
+    """
+    parser = argparse.ArgumentParser(description="Entraînement des modèles de la Tâche 3")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Nombre de processus (-1 = tous les cœurs)")
+    parser.add_argument("--no-refit", action="store_true",
+                        help="Sauvegarde l'ensemble des modèles de fold au lieu de réentraîner sur tout X_train")
+    parser.add_argument("--export-packed", action="store_true",
+                        help="Exporte aussi les ensembles d'arbres en tableaux de nœuds (Entrainement/packed)")
+    parser.add_argument("--tuned", action="store_true",
+                        help="Utilise les meilleurs hyperparamètres de la recherche (Tache3/search/best_params.json)")
+    parser.add_argument("--shared", choices=["float32", "float64"], default=None,
+                        help="Partage X_train entre les processus via un bloc projeté en mémoire de ce type")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Entraînement hors mémoire par blocs lus sur disque (partial_fit et warm_start), "
+                             "modèles dans Entrainement/incremental")
+    parser.add_argument("--chunksize", type=int, default=10000, help="Lignes par bloc en mode --incremental")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore le point de reprise du mode --incremental et recommence l'entraînement")
+    args = parser.parse_args(argv)
 
+    if args.incremental:
+        trainer = IncrementalTrainer(DATA_PATH, chunksize=args.chunksize)
+        trainer.train(resume=not args.restart)
+        print("\nRésultats des modèles (lignes de test des blocs) :")
+        for model, score in trainer.get_results().items():
+            print(f"{model}: Accuracy = {score['Accuracy']:.4f}, "
+                  + ", ".join(f"{metric} = {score[metric]:.4f}" for metric in METRICS))
+        return trainer
 
+    # Chargement des données
+    loader = load_dataset(DATA_PATH)
+    X_train, y_train = loader.X_train, loader.y_train
+    feature_names = None
+    if args.shared:
+        shared = loader.share(dtype=args.shared)
+        X_train, y_train = shared.train()
+        feature_names = shared.columns
 
+    # Entraînement des modèles
+    trainer = ModelTrainer(X_train, y_train, n_jobs=args.n_jobs, feature_names=feature_names)
+    if args.tuned:
+        trainer.apply_params(load_best_params())
+    trainer.train_and_evaluate(refit=not args.no_refit)
+    if args.export_packed:
+        export_models(trainer.models, save_dir=os.path.join(trainer.save_dir, "packed"))
 
+    # Affichage des résultats
+    results = trainer.get_results()
+    print("\nRésultats des modèles :")
+    for model, score in results.items():
+        print(f"{model}: Mean Accuracy = {score['Mean Accuracy']:.4f}, Std Dev = {score['Std Dev']:.4f}, "
+              + ", ".join(f"{metric} = {score[f'CV {metric}']:.4f}" for metric in METRICS))
+    return trainer
 
 
+if __name__ == "__main__":
+    main()
+    REPORT.save()
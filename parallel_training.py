@@ -0,0 +1,114 @@
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import check_cv
+from metrics import classification_metrics
+
+
+def take(data, indices):
+    """Sélectionne des lignes par position (DataFrame, Series ou tableau numpy)."""
+    return data.iloc[indices] if hasattr(data, "iloc") else data[indices]
+
+
+def labels_from_proba(classes, proba):
+    """Labels prédits à partir des probabilités (même règle que `predict` des classifieurs sklearn)."""
+    return np.asarray(classes).take(np.argmax(proba, axis=1))
+
+
+class FoldEnsemble:
+    def __init__(self, fold_models):
+        """
+        Modèle de service composé des modèles entraînés sur chaque fold de la validation croisée.
+        Les probabilités sont la moyenne de celles des modèles de fold ; aucun entraînement supplémentaire
+        sur l'ensemble complet n'est nécessaire.
+        :param fold_models: Liste de modèles entraînés (mêmes classes).
+        """
+        self.fold_models = fold_models
+        self.classes_ = fold_models[0].classes_
+
+    def predict_proba(self, X):
+        return np.mean([model.predict_proba(X) for model in self.fold_models], axis=0)
+
+    def predict(self, X):
+        return labels_from_proba(self.classes_, self.predict_proba(X))
+
+
+def fit_job(model, X, y, train_index=None, test_index=None, feature_names=None):
+    """
+    Tâche élémentaire exécutée par un processus du pool : entraîne une copie vierge du modèle.
+    Les modèles gardent leur `random_state` : chaque tâche est reproductible quel que soit le processus.
+    :param train_index: Lignes d'entraînement du fold (None = toutes les données).
+    :param test_index: Lignes de validation du fold (None = pas de prédiction).
+    :param feature_names: Noms des colonnes d'un tableau numpy : le modèle est entraîné sur une vue DataFrame
+                          du tableau (sans copie), et sklearn enregistre et valide lui-même ces noms.
+    :return: (modèle entraîné, probabilités hors-fold sur `test_index` ou None, (durée, temps CPU) de la tâche).
+    """
+    start, cpu_start = time.perf_counter(), time.process_time()
+    if feature_names is not None and not hasattr(X, "iloc"):
+        X = pd.DataFrame(X, columns=feature_names, copy=False)
+    estimator = clone(model)
+    if train_index is None:
+        estimator.fit(X, y)
+        proba = None
+    else:
+        estimator.fit(take(X, train_index), take(y, train_index))
+        proba = estimator.predict_proba(take(X, test_index))
+    return estimator, proba, (time.perf_counter() - start, time.process_time() - cpu_start)
+
+
+def train_models(models, X, y, cv=5, n_jobs=1, refit=True, feature_names=None):
+    """
+    Entraîne plusieurs modèles en répartissant les tâches (modèle, fold) sur un pool de processus.
+    Les folds sont ceux de `cross_val_score` (StratifiedKFold sans mélange pour un entier), les scores
+    sont donc identiques à une exécution séquentielle. Les modèles de fold et leurs prédictions hors-fold
+    sont conservés : toutes les métriques de validation en sont déduites sans entraînement supplémentaire.
+    :param models: Dictionnaire nom -> modèle non entraîné.
+    :param cv: Nombre de folds (ou objet de validation croisée) ; None pour n'entraîner que sur tout X.
+    :param n_jobs: Nombre de processus (1 = séquentiel, -1 = tous les cœurs).
+    :param refit: Réentraîne chaque modèle sur tout X ; sinon le modèle servi est un FoldEnsemble.
+    :param feature_names: Noms des colonnes lorsque X est un tableau numpy (par ex. un bloc partagé),
+                          pour que les modèles acceptent ensuite des DataFrames sans avertissement.
+    :return: Dictionnaire nom -> {"model", "fold_models", "fold_accuracy", "fold_metrics", "oof_proba",
+             "fit_seconds", "fit_cpu_seconds"} ; les durées cumulent toutes les tâches du modèle.
+    """
+    if cv is None and not refit:
+        raise ValueError("Sans validation croisée, les modèles doivent être entraînés sur tout X (refit=True).")
+    splits = list(check_cv(cv, y, classifier=True).split(X, y)) if cv is not None else []
+
+    # Une tâche par entraînement complet et une par (modèle, fold)
+    jobs = [(name, None) for name in models] if refit else []
+    jobs += [(name, fold) for name in models for fold in range(len(splits))]
+    outputs = Parallel(n_jobs=n_jobs)(
+        delayed(fit_job)(models[name], X, y, *(splits[fold] if fold is not None else (None, None)),
+                         feature_names=feature_names)
+        for name, fold in jobs
+    )
+
+    y_values = np.asarray(y)
+    results = {name: {"model": None, "fold_models": [], "fold_accuracy": [], "fold_metrics": [],
+                      "oof_proba": None, "fit_seconds": 0.0, "fit_cpu_seconds": 0.0} for name in models}
+    for (name, fold), (estimator, proba, (seconds, cpu_seconds)) in zip(jobs, outputs):
+        result = results[name]
+        result["fit_seconds"] += seconds
+        result["fit_cpu_seconds"] += cpu_seconds
+        if fold is None:
+            result["model"] = estimator
+            continue
+
+        test_index = splits[fold][1]
+        y_pred = labels_from_proba(estimator.classes_, proba)
+        y_fold = y_values[test_index]
+        result["fold_models"].append(estimator)
+        result["fold_accuracy"].append(np.mean(y_pred == y_fold))
+        result["fold_metrics"].append(classification_metrics(y_fold, y_pred, proba[:, 1]))
+        if result["oof_proba"] is None:
+            result["oof_proba"] = np.full(len(y_values), np.nan)
+        result["oof_proba"][test_index] = proba[:, 1]
+
+    for result in results.values():
+        result["fold_accuracy"] = np.array(result["fold_accuracy"])
+        if not refit:
+            result["model"] = FoldEnsemble(result["fold_models"])
+    return results
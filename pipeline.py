@@ -0,0 +1,223 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+from importlib import metadata
+
+# Dossier contenant les scripts du projet
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Manifeste des empreintes des étapes déjà exécutées (relatif au dossier de travail)
+CACHE_FILE = os.path.join("Datatest", ".pipeline_cache.json")
+
+# Bibliothèques dont la version fait partie de l'empreinte de chaque étape
+TRACKED_PACKAGES = ["numpy", "pandas", "pyarrow", "scikit-learn"]
+
+
+class Stage:
+    def __init__(self, name, script, inputs, outputs, env_params=()):
+        """
+        Étape du pipeline.
+        :param name: Nom de l'étape (identique à la cible du Makefile).
+        :param script: Script Python exécuté pour l'étape.
+        :param inputs: Fichiers ou dossiers lus par l'étape (données brutes ou artefacts amont).
+        :param outputs: Fichiers ou dossiers produits par l'étape.
+        :param env_params: Variables d'environnement qui modifient le résultat de l'étape.
+        """
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.env_params = list(env_params)
+
+
+RAW_FILES = [
+    "Datasets/content_polluters.txt", "Datasets/legitimate_users.txt",
+    "Datasets/content_polluters_tweets.txt", "Datasets/legitimate_users_tweets.txt",
+    "Datasets/content_polluters_followings.txt", "Datasets/legitimate_users_followings.txt"
+]
+
+STAGES = [
+    Stage("feature", "feature.py", RAW_FILES, ["Datatest/Tache2/Partie1"], ["PIPELINE_FORMAT"]),
+    Stage("data_preparation", "data_preparation.py", ["Datatest/Tache2/Partie1"], ["Datatest/Tache2/Partie2"],
+          ["PIPELINE_FORMAT"]),
+    Stage("data_final", "data_final.py", ["Datatest/Tache2/Partie2"], ["Datatest/Tache2_donnees_final"],
+          ["PIPELINE_FORMAT"]),
+    Stage("model_trainer", "model_trainer.py", ["Datatest/Tache2_donnees_final"], ["Datatest/Tache3/Entrainement"]),
+    Stage("model_evaluator", "model_evaluator.py", ["Datatest/Tache2_donnees_final", "Datatest/Tache3/Entrainement"],
+          ["Datatest/Tache3/Results"], ["PIPELINE_PLOTS"]),
+    Stage("tache4", "tache4_processor.py", ["Datatest/Tache2_donnees_final"], ["Datatest/Tache4"], ["PIPELINE_PLOTS"]),
+    Stage("comparison", "comparaisonTache.py",
+          ["Datatest/Tache3/Results/summary_table.csv", "Datatest/Tache4/Results/model_performance.csv"],
+          ["Datatest/Comparaison_Tache3_Tache4"], ["PIPELINE_PLOTS"]),
+]
+
+
+def list_files(path):
+    """Liste triée des fichiers d'un chemin (fichier unique ou contenu récursif d'un dossier)."""
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for directory, _, names in os.walk(path):
+        files.extend(os.path.join(directory, name) for name in names)
+    return sorted(files)
+
+
+def local_modules(script, root=ROOT_DIR):
+    """
+    Modules du projet importés (directement ou non) par un script, script compris.
+    Leur contenu constitue la « version du code » d'une étape.
+    """
+    found, pending = set(), [os.path.splitext(script)[0]]
+    while pending:
+        module = pending.pop()
+        path = os.path.join(root, module + ".py")
+        if module in found or not os.path.exists(path):
+            continue
+        found.add(module)
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for statement in ast.walk(tree):
+            if isinstance(statement, ast.Import):
+                pending.extend(alias.name.split(".")[0] for alias in statement.names)
+            elif isinstance(statement, ast.ImportFrom) and statement.module and statement.level == 0:
+                pending.append(statement.module.split(".")[0])
+    return sorted(module + ".py" for module in found)
+
+
+class PipelineRunner:
+    def __init__(self, stages=STAGES, cache_file=CACHE_FILE, workdir=None):
+        """
+        Exécute les étapes du pipeline en sautant celles dont l'empreinte n'a pas changé.
+        L'empreinte combine le contenu des entrées, le code de l'étape, ses paramètres et les versions
+        des bibliothèques.
+        :param stages: Liste ordonnée des étapes.
+        :param cache_file: Manifeste JSON des empreintes (relatif à `workdir`).
+        :param workdir: Dossier de travail des scripts, contenant Datasets/ et Datatest/ (dossier courant par défaut).
+        """
+        self.stages = stages
+        self.workdir = os.path.abspath(workdir or os.getcwd())
+        self.cache_path = os.path.join(self.workdir, cache_file)
+        self.cache = self.load_cache()
+
+    def load_cache(self):
+        """Charge le manifeste des empreintes (vide s'il n'existe pas ou est illisible)."""
+        if not os.path.exists(self.cache_path):
+            return {"files": {}, "stages": {}}
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"files": {}, "stages": {}}
+
+    def save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f, indent=2, sort_keys=True)
+
+    def file_hash(self, path):
+        """
+        Empreinte SHA-256 du contenu d'un fichier.
+        Le résultat est mémorisé par (taille, date de modification) pour ne pas relire les gros fichiers inchangés.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cached = self.cache["files"].get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.cache["files"][path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def paths_hash(self, paths, base_dir=None):
+        """
+        Empreinte d'un ensemble de fichiers ou dossiers (None si l'un d'eux est absent).
+        :param base_dir: Dossier de référence des chemins (dossier de travail par défaut).
+        """
+        base_dir = base_dir or self.workdir
+        digest = hashlib.sha256()
+        for path in paths:
+            if not os.path.exists(os.path.join(base_dir, path)):
+                return None
+            for file_path in list_files(os.path.join(base_dir, path)):
+                relative = os.path.relpath(file_path, base_dir)
+                digest.update(f"{relative}:{self.file_hash(file_path)}\n".encode())
+        return digest.hexdigest()
+
+    def fingerprint(self, stage):
+        """Empreinte complète d'une étape : entrées, code, paramètres et environnement."""
+        inputs_hash = self.paths_hash(stage.inputs)
+        if inputs_hash is None:
+            return None
+        versions = {}
+        for package in TRACKED_PACKAGES:
+            try:
+                versions[package] = metadata.version(package)
+            except metadata.PackageNotFoundError:
+                versions[package] = None
+        description = {
+            "inputs": inputs_hash,
+            "code": self.paths_hash(local_modules(stage.script), ROOT_DIR),
+            "params": {name: os.environ.get(name) for name in stage.env_params},
+            "python": platform.python_version(),
+            "packages": versions
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def is_up_to_date(self, stage, fingerprint):
+        """Vrai si l'étape a déjà été exécutée avec cette empreinte et que ses artefacts sont intacts."""
+        entry = self.cache["stages"].get(stage.name)
+        if not entry or fingerprint is None or entry["fingerprint"] != fingerprint:
+            return False
+        return self.paths_hash(stage.outputs) == entry["outputs"]
+
+    def run(self, targets=None, force=False):
+        """
+        Exécute les étapes demandées (toutes par défaut) dans l'ordre du pipeline.
+        :param targets: Noms des étapes à considérer ; les autres sont ignorées.
+        :param force: Réexécute les étapes même si leur empreinte est inchangée.
+        :return: Dictionnaire nom d'étape -> 'cached' ou 'executed'.
+        """
+        status = {}
+        for stage in self.stages:
+            if targets and stage.name not in targets:
+                continue
+
+            fingerprint = self.fingerprint(stage)
+            if not force and self.is_up_to_date(stage, fingerprint):
+                print(f"-- Étape {stage.name} : inchangée, artefacts réutilisés.")
+                status[stage.name] = "cached"
+                continue
+
+            print(f"-- Étape {stage.name} : exécution de {stage.script}...")
+            subprocess.run([sys.executable, os.path.join(ROOT_DIR, stage.script)], cwd=self.workdir, check=True)
+
+            self.cache["stages"][stage.name] = {
+                "fingerprint": fingerprint,
+                "outputs": self.paths_hash(stage.outputs)
+            }
+            self.save_cache()
+            status[stage.name] = "executed"
+        self.save_cache()
+        return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exécution incrémentale du pipeline (étapes inchangées sautées)")
+    parser.add_argument("stages", nargs="*", help="Étapes à exécuter (toutes par défaut) : "
+                                                  + ", ".join(stage.name for stage in STAGES))
+    parser.add_argument("--force", action="store_true", help="Réexécute toutes les étapes demandées")
+    parser.add_argument("--workdir", default=None, help="Dossier contenant Datasets/ et Datatest/")
+    args = parser.parse_args()
+
+    runner = PipelineRunner(workdir=args.workdir)
+    results = runner.run(args.stages, force=args.force)
+    print("\nRésumé :", ", ".join(f"{name}={state}" for name, state in results.items()))
@@ -0,0 +1,175 @@
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Les graphiques sont désactivés avec PIPELINE_PLOTS=0 (ou l'option --no-plots des scripts)
+PLOTS_ENABLED = os.environ.get("PIPELINE_PLOTS", "1") != "0"
+
+
+def pyplot():
+    """Importe matplotlib à la demande, avec un backend sans affichage."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def render_bar(path, labels, values, title, xlabel=None, ylabel=None):
+    """Diagramme en barres d'une métrique (une barre par modèle)."""
+    plt = pyplot()
+    import seaborn as sns
+    plt.figure(figsize=(10, 5))
+    sns.barplot(x=labels, y=values, hue=labels, palette="viridis", legend=False)
+    if xlabel:
+        plt.xlabel(xlabel)
+    if ylabel:
+        plt.ylabel(ylabel)
+    plt.title(title)
+    plt.xticks(rotation=45)
+    plt.savefig(path)
+    plt.close()
+
+
+def render_grouped_bar(path, records, x, y, hue, palette, title, legend_title):
+    """Diagramme en barres groupées (par ex. une barre par tâche pour chaque modèle)."""
+    plt = pyplot()
+    import pandas as pd
+    import seaborn as sns
+    plt.figure(figsize=(10, 5))
+    sns.barplot(data=pd.DataFrame(records), x=x, y=y, hue=hue, palette=palette)
+    plt.title(title)
+    plt.xticks(rotation=45)
+    plt.legend(title=legend_title)
+    plt.savefig(path)
+    plt.close()
+
+
+def render_lines(path, x, series, title, xlabel="Modèles", ylabel="Score"):
+    """
+    Courbes de plusieurs métriques sur les mêmes modèles.
+    :param series: Liste de dictionnaires {"values", "label", "color", "marker", "linestyle", "alpha"}.
+    """
+    plt = pyplot()
+    plt.figure(figsize=(12, 6))
+    for line in series:
+        plt.plot(x, line["values"], marker=line["marker"], linestyle=line.get("linestyle", "-"), linewidth=2,
+                 markersize=8, label=line["label"], color=line["color"], alpha=line.get("alpha"))
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.legend()
+    plt.savefig(path)
+    plt.close()
+
+
+def render_heatmap(path, values, index, columns, title):
+    """Tableau de scores coloré (heatmap annotée)."""
+    plt = pyplot()
+    import pandas as pd
+    import seaborn as sns
+    plt.figure(figsize=(10, 4))
+    sns.heatmap(pd.DataFrame(values, index=index, columns=columns), annot=True, fmt=".4f", cmap="Blues",
+                linewidths=0.5)
+    plt.title(title)
+    plt.savefig(path, bbox_inches='tight')
+    plt.close()
+
+
+def render_table(path, values, columns, index=None):
+    """Tableau de valeurs exporté en image."""
+    plt = pyplot()
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.axis('tight')
+    ax.axis('off')
+    table = ax.table(cellText=values, colLabels=columns, rowLabels=index, cellLoc='center', loc='center')
+    table.auto_set_font_size(False)
+    table.set_fontsize(10)
+    table.scale(1.2, 1.2)
+    plt.savefig(path, bbox_inches='tight')
+    plt.close()
+
+
+class ChartRenderer:
+    def __init__(self, output_dir, enabled=None, workers=None):
+        """
+        Génère les graphiques en arrière-plan, et seulement si les données représentées ont changé.
+        Chaque graphique est identifié par une empreinte (fonction de rendu, son code et ses données),
+        mémorisée dans `<output_dir>/.charts.json` ; un graphique dont l'empreinte et le fichier sont
+        inchangés n'est pas redessiné.
+        :param output_dir: Dossier des résultats (contient le manifeste des graphiques).
+        :param enabled: Active les graphiques (par défaut PLOTS_ENABLED) ; sinon les demandes sont ignorées.
+        :param workers: Nombre de processus de rendu (0 = rendu dans le processus courant).
+        """
+        self.output_dir = output_dir
+        self.enabled = PLOTS_ENABLED if enabled is None else enabled
+        self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+        self.manifest_path = os.path.join(output_dir, ".charts.json")
+        self.manifest = self.load_manifest()
+        self.pool = None
+        self.pending = []
+        self.skipped = 0
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def fingerprint(render, arguments):
+        description = {"render": render.__name__, "code": inspect.getsource(render), "arguments": arguments}
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+    def submit(self, render, path, **arguments):
+        """
+        Demande le rendu d'un graphique.
+        :param render: Fonction de rendu de ce module (exécutée dans un processus du pool).
+        :param path: Fichier image produit.
+        :param arguments: Données du graphique (listes et dictionnaires simples).
+        """
+        if not self.enabled:
+            return
+        key = os.path.relpath(path, self.output_dir)
+        fingerprint = self.fingerprint(render, arguments)
+        if self.manifest.get(key) == fingerprint and os.path.exists(path):
+            self.skipped += 1
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if self.workers == 0:
+            render(path, **arguments)
+            self.pending.append((key, fingerprint, None))
+            return
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.pending.append((key, fingerprint, self.pool.submit(render, path, **arguments)))
+
+    def close(self):
+        """Attend la fin des rendus, enregistre le manifeste et affiche un résumé."""
+        if not self.enabled:
+            print("Graphiques désactivés (PIPELINE_PLOTS=0 ou --no-plots).")
+            return
+        rendered = 0
+        for key, fingerprint, future in self.pending:
+            try:
+                if future is not None:
+                    future.result()
+            except Exception as e:
+                print(f"Erreur lors du rendu de {key} : {e}")
+                self.manifest.pop(key, None)
+                continue
+            self.manifest[key] = fingerprint
+            rendered += 1
+            print(f"Graphique enregistré : {os.path.join(self.output_dir, key)}")
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        self.pending = []
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        print(f"{rendered} graphique(s) générés, {self.skipped} inchangé(s).")
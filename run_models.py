@@ -0,0 +1,42 @@
+import argparse
+import time
+import comparaisonTache
+import model_evaluator
+import model_trainer
+import tache4_processor
+from data_loader import DATASETS, FRAMES
+from instrumentation import REPORT
+
+# Étapes exécutées dans un même processus, dans l'ordre du Makefile
+STEPS = {
+    "model_trainer": model_trainer.main,
+    "model_evaluator": model_evaluator.main,
+    "tache4": tache4_processor.main,
+    "comparison": comparaisonTache.main,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraînement, évaluation, Tâche 4 et comparaison dans un seul processus "
+                                                 "(données finales lues et découpées une seule fois)")
+    parser.add_argument("steps", nargs="*", default=list(STEPS), help="Étapes à exécuter : " + ", ".join(STEPS))
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Nombre de processus pour l'entraînement (Tâches 3 et 4)")
+    parser.add_argument("--no-plots", action="store_true", help="N'écrit que les tableaux, sans graphiques")
+    args = parser.parse_args()
+    # Vérification des noms d'étapes à la place de `choices`, que argparse applique aussi à la valeur par défaut
+    # d'un argument positionnel nargs="*" (appel sans étape refusé)
+    unknown = [step for step in args.steps if step not in STEPS]
+    if unknown:
+        parser.error(f"étape(s) inconnue(s) : {', '.join(unknown)} (choisir parmi : {', '.join(STEPS)})")
+
+    plot_args = ["--no-plots"] if args.no_plots else []
+    jobs_args = ["--n-jobs", str(args.n_jobs)]
+    arguments = {"model_trainer": jobs_args, "model_evaluator": plot_args,
+                 "tache4": jobs_args + plot_args, "comparison": plot_args}
+    for step in args.steps:
+        start = time.perf_counter()
+        print(f"\n-- Étape {step}...")
+        STEPS[step](arguments[step])
+        print(f"-- Étape {step} terminée en {time.perf_counter() - start:.2f} s")
+    print(f"\nDonnées lues {len(FRAMES)} fois, découpées {len(DATASETS)} fois.")
+    REPORT.save()
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from artifact_io import HAS_PYARROW
+from instrumentation import annotate
+
+# Types compacts des colonnes du pipeline
+ID_DTYPE = "int32"          # identifiants d'utilisateurs
+COUNT_DTYPE = "uint32"      # compteurs et longueurs
+FEATURE_DTYPE = "float32"   # caractéristiques réelles (ratios, durées, valeurs normalisées)
+LABEL_DTYPE = "int8"        # classe (0 = légitime, 1 = pollueur)
+# Texte et dates brutes : chaînes Arrow (tampon contigu) plutôt qu'objets Python
+TEXT_DTYPE = pd.StringDtype("pyarrow") if HAS_PYARROW else object
+
+# Tables brutes des utilisateurs : UserId, CreatedAt, CollectedAt, followings, followers, tweets,
+# longueur du nom, longueur de la description
+RAW_USERS = {0: ID_DTYPE, 1: TEXT_DTYPE, 2: TEXT_DTYPE, 3: COUNT_DTYPE, 4: COUNT_DTYPE, 5: COUNT_DTYPE,
+             6: COUNT_DTYPE, 7: COUNT_DTYPE}
+
+# Tweets bruts : seules les colonnes UserId (0), texte (2) et date (3) sont lues ; l'identifiant du tweet est ignoré
+RAW_TWEETS_COLUMNS = [0, 2, 3]
+RAW_TWEETS = {0: ID_DTYPE, 2: TEXT_DTYPE, 3: TEXT_DTYPE}
+
+# Séries de followings brutes : UserId, relevés successifs séparés par des virgules (voir following_series)
+RAW_FOLLOWINGS = {0: ID_DTYPE, 1: TEXT_DTYPE}
+
+# Colonnes par tweet après comptage des jetons (le texte n'est plus conservé)
+PER_TWEET = {"UserId": ID_DTYPE, "URLCount": COUNT_DTYPE, "MentionCount": COUNT_DTYPE, "HashtagCount": COUNT_DTYPE}
+
+# Caractéristiques extraites (Tache2/Partie1) : compteurs entiers, le reste en float32
+FEATURES = {"UserId": ID_DTYPE, "LengthOfScreenName": COUNT_DTYPE, "LengthOfDescriptionInUserProfile": COUNT_DTYPE,
+            "NumerOfFollowings": COUNT_DTYPE, "NumberOfFollowers": COUNT_DTYPE}
+
+# Caractéristiques normalisées et données finales : toutes en float32, sauf l'identifiant et la classe
+FINAL = {"UserId": ID_DTYPE, "Classe": LABEL_DTYPE}
+
+
+def memory_mb(frame):
+    """Mémoire occupée par un DataFrame (Mo), chaînes comprises."""
+    return frame.memory_usage(deep=True, index=True).sum() / 2 ** 20
+
+
+def fits(values, dtype):
+    """Vrai si toutes les valeurs d'une colonne sont représentables exactement dans le type entier `dtype`."""
+    if len(values) == 0:
+        return True
+    if values.isna().any() or not pd.api.types.is_numeric_dtype(values):
+        return False
+    info = np.iinfo(dtype)
+    array = values.to_numpy()
+    if array.dtype.kind == "f" and not np.array_equal(array, np.floor(array)):
+        return False
+    return info.min <= array.min() and array.max() <= info.max
+
+
+def narrow(frame, schema, default=None):
+    """
+    Convertit les colonnes d'un DataFrame vers les types compacts du schéma (sur place).
+    Une conversion entière n'est faite que si elle est sans perte (pas de NaN, valeurs dans l'intervalle) :
+    sinon un identifiant garde son type et un compteur passe en float32.
+    :param schema: Dictionnaire colonne -> type.
+    :param default: Type des colonnes numériques absentes du schéma (par ex. FEATURE_DTYPE), None pour les garder.
+    :return: Le DataFrame modifié.
+    """
+    for column in frame.columns:
+        dtype = schema.get(column, default)
+        if dtype is None or frame[column].dtype == dtype:
+            continue
+        if dtype is TEXT_DTYPE or isinstance(dtype, pd.StringDtype):
+            frame[column] = frame[column].astype(dtype)
+        elif np.dtype(dtype).kind in "iu":
+            if fits(frame[column], dtype):
+                frame[column] = frame[column].astype(dtype)
+            elif dtype != ID_DTYPE and pd.api.types.is_numeric_dtype(frame[column]):
+                frame[column] = frame[column].astype(FEATURE_DTYPE)
+        elif pd.api.types.is_numeric_dtype(frame[column]):
+            frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def compact(frame, schema, label=None, default=None):
+    """
+    Applique le schéma et rend compte de la mémoire gagnée (affichage et rapport de l'étape en cours).
+    :param label: Nom affiché (None = pas d'affichage).
+    """
+    before = memory_mb(frame)
+    narrow(frame, schema, default)
+    after = memory_mb(frame)
+    if label is not None:
+        annotate(**{f"memory_{label}_mb": [round(before, 2), round(after, 2)]})
+        saved = 1 - after / before if before else 0
+        print(f"Mémoire {label} : {before:.2f} Mo -> {after:.2f} Mo ({saved:.0%} économisés)")
+    return frame
@@ -0,0 +1,91 @@
+import argparse
+import json
+import threading
+import time
+import urllib.request
+import numpy as np
+from artifact_io import load_frame
+from scoring_service import latency_summary
+
+
+def post_json(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def get_json(url):
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def load_rows(data_path):
+    """Lignes de data_final (sans la colonne Classe) sous forme de dictionnaires colonne -> valeur."""
+    data = load_frame(data_path)
+    return data.drop(columns=['Classe'], errors='ignore').to_dict(orient="records")
+
+
+def run_load(url, rows, clients=8, requests_per_client=200, batch_rows=1, seed=42):
+    """
+    Génère une charge locale : `clients` fils envoient chacun `requests_per_client` requêtes de `batch_rows`
+    lignes tirées au hasard, sans attente entre deux requêtes.
+    :return: Résumé côté client (latences de bout en bout et débit).
+    """
+    latencies, lock = [], threading.Lock()
+    errors = []
+
+    def client(index):
+        rng = np.random.default_rng(seed + index)
+        for _ in range(requests_per_client):
+            body = {"rows": [rows[i] for i in rng.integers(0, len(rows), batch_rows)]}
+            start = time.perf_counter()
+            try:
+                post_json(url, body)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = latency_summary(latencies, len(latencies) * batch_rows, time.perf_counter() - start)
+    summary["errors"] = len(errors)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Générateur de charge pour le service d'évaluation")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--data", default="Datatest/Tache2_donnees_final/data_final",
+                        help="Données au schéma de data_final utilisées comme requêtes")
+    parser.add_argument("--clients", type=int, default=8, help="Nombre de clients concurrents")
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes par client")
+    parser.add_argument("--batch-rows", type=int, default=1, help="Lignes par requête")
+    parser.add_argument("--output", default=None, help="Fichier JSON du rapport")
+    args = parser.parse_args()
+
+    rows = load_rows(args.data)
+    post_json(f"{args.url}/stats/reset", {})
+    client_summary = run_load(f"{args.url}/score", rows, args.clients, args.requests, args.batch_rows)
+    report = {"client": client_summary, "server": get_json(f"{args.url}/stats"),
+              "clients": args.clients, "batch_rows": args.batch_rows}
+
+    print("\nCôté client (bout en bout) :")
+    print(f"  {client_summary['requests']} requêtes, {client_summary['rows_per_s']:.1f} lignes/s, "
+          f"p50 = {client_summary['p50_ms']:.2f} ms, p95 = {client_summary['p95_ms']:.2f} ms, "
+          f"p99 = {client_summary['p99_ms']:.2f} ms, erreurs = {client_summary['errors']}")
+    server_summary = report["server"]
+    print("Côté serveur (file d'attente + predict_proba) :")
+    print(f"  {server_summary['batches']} appels à predict_proba, {server_summary['mean_batch_rows']:.1f} lignes par lot, "
+          f"p50 = {server_summary['p50_ms']:.2f} ms, p99 = {server_summary['p99_ms']:.2f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Rapport enregistré : {args.output}")
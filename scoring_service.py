@@ -0,0 +1,276 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from feature_transformer import TRANSFORMER_PATH, load_transformer
+from model_store import ModelStore
+from tree_export import export_model
+
+
+def latency_summary(latencies, rows, elapsed):
+    """
+    Résumé des performances : percentiles de latence (ms) et débit.
+    :param latencies: Latences des requêtes en secondes.
+    :param rows: Nombre total de lignes évaluées.
+    :param elapsed: Durée de la mesure en secondes.
+    """
+    latencies = np.asarray(latencies) * 1000
+    summary = {"requests": len(latencies), "rows": rows, "elapsed_s": elapsed,
+               "requests_per_s": len(latencies) / elapsed if elapsed > 0 else 0.0,
+               "rows_per_s": rows / elapsed if elapsed > 0 else 0.0}
+    for percentile in (50, 90, 95, 99):
+        summary[f"p{percentile}_ms"] = float(np.percentile(latencies, percentile)) if len(latencies) else None
+    summary["max_ms"] = float(latencies.max()) if len(latencies) else None
+    return summary
+
+
+class PendingRequest:
+    def __init__(self, rows):
+        """Requête en attente : lignes à évaluer, probabilités retournées et instant d'arrivée."""
+        self.rows = rows
+        self.received = time.perf_counter()
+        self.done = threading.Event()
+        self.proba = None
+        self.error = None
+
+
+class MicroBatcher:
+    def __init__(self, model, max_batch=512, max_delay=0.002, feature_names=None):
+        """
+        Regroupe les requêtes concurrentes en un seul appel à `predict_proba`.
+        Un fil dédié prend la première requête en attente puis accumule les suivantes jusqu'à `max_batch` lignes
+        ou `max_delay` secondes ; le coût fixe d'un appel (validation, parcours des arbres) est ainsi partagé.
+        :param model: Modèle entraîné (chargé une seule fois).
+        :param max_batch: Nombre maximal de lignes par appel.
+        :param max_delay: Attente maximale (s) pour compléter un lot.
+        :param feature_names: Colonnes d'entraînement, redonnées au lot si le modèle a été entraîné sur un DataFrame.
+        """
+        self.model = model
+        self.feature_names = feature_names
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.reset_stats()
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def reset_stats(self):
+        with self.lock:
+            self.started = time.perf_counter()
+            self.latencies = []
+            self.batch_sizes = []
+            self.rows = 0
+
+    def score(self, rows):
+        """Évalue des lignes (tableau 2D) et retourne les probabilités de la classe 1 ; bloque jusqu'au résultat."""
+        request = PendingRequest(rows)
+        self.pending.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.proba
+
+    def next_batch(self):
+        """Première requête en attente et celles qui arrivent avant l'échéance ou le remplissage du lot."""
+        batch = [self.pending.get()]
+        size = len(batch[0].rows)
+        deadline = time.perf_counter() + self.max_delay
+        while size < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                request = self.pending.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.rows)
+        return batch
+
+    def predict(self, rows):
+        """Probabilités de la classe 1 pour un tableau 2D de lignes."""
+        if self.feature_names:
+            rows = pd.DataFrame(rows, columns=self.feature_names)
+        return self.model.predict_proba(rows)[:, 1]
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            try:
+                proba = self.predict(np.concatenate([request.rows for request in batch]))
+                start = 0
+                for request in batch:
+                    request.proba = proba[start:start + len(request.rows)]
+                    start += len(request.rows)
+            except Exception as e:
+                # Une requête invalide ne doit pas faire échouer les autres : chaque requête est réévaluée seule
+                # et seule celle qui échoue reçoit l'erreur
+                if len(batch) == 1:
+                    batch[0].error = e
+                else:
+                    for request in batch:
+                        try:
+                            request.proba = self.predict(request.rows)
+                        except Exception as error:
+                            request.error = error
+
+            finished = time.perf_counter()
+            with self.lock:
+                scored = [request for request in batch if request.error is None]
+                for request in scored:
+                    self.latencies.append(finished - request.received)
+                rows = sum(len(request.rows) for request in scored)
+                self.batch_sizes.append(rows)
+                self.rows += rows
+            for request in batch:
+                request.done.set()
+
+    def stats(self):
+        """Latences (file d'attente comprise), débit et taille moyenne des lots depuis le dernier `reset_stats`."""
+        with self.lock:
+            summary = latency_summary(self.latencies, self.rows, time.perf_counter() - self.started)
+            summary["batches"] = len(self.batch_sizes)
+            summary["mean_batch_rows"] = float(np.mean(self.batch_sizes)) if self.batch_sizes else None
+        return summary
+
+
+class ScoringService:
+    def __init__(self, model_dir, model_name, threshold=0.5, max_batch=512, max_delay=0.002, packed=False,
+                 raw=False, transformer_path=TRANSFORMER_PATH):
+        """
+        Service d'évaluation de nouveaux comptes avec un modèle entraîné.
+        Les lignes reçues suivent le schéma de data_final (la colonne Classe, si présente, est ignorée).
+        :param model_dir: Dossier des modèles (ModelStore).
+        :param model_name: Nom du modèle à servir.
+        :param threshold: Seuil de probabilité pour le label pollueur.
+        :param packed: Sert l'ensemble d'arbres aplati (tree_export) au lieu du modèle sklearn.
+        :param raw: Les lignes reçues sont les caractéristiques brutes (sortie de feature.py) : elles passent par
+                    le prétraitement appris avant l'évaluation.
+        :param transformer_path: Prétraitement appris par data_preparation.py (utilisé avec `raw`).
+        """
+        store = ModelStore(model_dir)
+        self.model_name = model_name
+        self.model = store.load(model_name)
+        info = store.info(model_name) or {}
+        self.feature_names = info.get("feature_names") or list(getattr(self.model, "feature_names_in_", []))
+        self.threshold = threshold
+        self.transformer = load_transformer(transformer_path) if raw else None
+        if packed:
+            # Le prédicteur aplati lit directement le tableau numpy, dans l'ordre des colonnes d'entraînement
+            self.model = export_model(self.model)
+        self.batcher = MicroBatcher(self.model, max_batch, max_delay, None if packed else self.feature_names)
+
+    def parse_rows(self, rows):
+        """
+        Convertit les lignes reçues en tableau 2D dans l'ordre des colonnes d'entraînement.
+        :param rows: Liste de dictionnaires colonne -> valeur, ou de listes dans l'ordre du schéma.
+        """
+        if not rows:
+            raise ValueError("Aucune ligne à évaluer.")
+        if isinstance(rows[0], dict):
+            missing = [column for column in self.feature_names if column not in rows[0]]
+            if missing:
+                raise ValueError(f"Colonnes manquantes : {missing}")
+            rows = [[row[column] for column in self.feature_names] for row in rows]
+        values = np.asarray(rows, dtype=np.float64)
+        if values.ndim != 2 or (self.feature_names and values.shape[1] != len(self.feature_names)):
+            raise ValueError(f"Chaque ligne doit contenir {len(self.feature_names)} valeurs.")
+        if self.transformer is not None:
+            values = self.transformer.transform(values, self.feature_names or None)
+        # Valeurs manquantes ou infinies (après imputation en mode brut) : refusées avant d'entrer dans un lot
+        invalid = np.flatnonzero(~np.isfinite(values).all(axis=1))
+        if len(invalid):
+            raise ValueError(f"Valeurs manquantes ou infinies dans les lignes : {invalid.tolist()}")
+        return values
+
+    def score(self, rows):
+        """Probabilités et labels (0 = légitime, 1 = pollueur) des lignes reçues."""
+        proba = self.batcher.score(self.parse_rows(rows))
+        return {"model": self.model_name, "probabilities": proba.tolist(),
+                "labels": (proba > self.threshold).astype(int).tolist()}
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """
+    POST /score   {"rows": [...]}  -> probabilités et labels
+    GET  /stats                    -> latences et débit du serveur
+    POST /stats/reset              -> remet les mesures à zéro
+    """
+    service = None
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self.send_json(200, self.service.batcher.stats())
+        else:
+            self.send_json(404, {"error": f"Chemin inconnu : {self.path}"})
+
+    def do_POST(self):
+        if self.path == "/stats/reset":
+            self.service.batcher.reset_stats()
+            self.send_json(200, {"reset": True})
+            return
+        if self.path != "/score":
+            self.send_json(404, {"error": f"Chemin inconnu : {self.path}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            self.send_json(200, self.service.score(body["rows"]))
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": str(e)})
+        except Exception as e:
+            # Erreur du modèle : la connexion reçoit quand même une réponse
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        # Pas de journal par requête : il fausserait les mesures de latence
+        pass
+
+
+def serve(service, host="127.0.0.1", port=8000):
+    """Lance le serveur HTTP (un fil par connexion, un seul fil d'évaluation)."""
+    ScoringHandler.service = service
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+    server.daemon_threads = True
+    print(f"Modèle {service.model_name} servi sur http://{host}:{server.server_port}/score")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service d'évaluation par lots de nouveaux comptes")
+    parser.add_argument("--model", default="RandomForest", help="Nom du modèle à servir")
+    parser.add_argument("--model-dir", default="Datatest/Tache3/Entrainement")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--max-batch", type=int, default=512, help="Nombre maximal de lignes par predict_proba")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="Attente maximale pour compléter un lot")
+    parser.add_argument("--packed", action="store_true", help="Sert l'ensemble d'arbres aplati en tableaux")
+    parser.add_argument("--raw", action="store_true",
+                        help="Reçoit les caractéristiques brutes et applique le prétraitement appris")
+    parser.add_argument("--transformer", default=TRANSFORMER_PATH,
+                        help="Prétraitement appris par data_preparation.py (avec --raw)")
+    args = parser.parse_args()
+
+    service = ScoringService(args.model_dir, args.model, args.threshold, args.max_batch, args.max_delay_ms / 1000,
+                             args.packed, args.raw, args.transformer)
+    server = serve(service, args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("\nStatistiques du serveur :", json.dumps(service.batcher.stats(), indent=2))
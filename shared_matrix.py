@@ -0,0 +1,97 @@
+import os
+import tempfile
+import weakref
+import numpy as np
+
+# Dossier par défaut des matrices partagées : mémoire partagée du noyau si disponible (Linux)
+SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class SharedMatrix:
+    def __init__(self, path, n_rows, n_features, dtype="float64", columns=None, n_train=None):
+        """
+        Matrice de caractéristiques et labels stockés dans un seul bloc contigu d'un fichier projeté en mémoire.
+        Le bloc contient X (n_rows x n_features, ordre C) suivi des labels, dans le même type flottant.
+        L'objet ne transporte que ces métadonnées : le transmettre à un processus ne copie pas les données,
+        chaque processus s'attache au même fichier et les pages sont partagées par le système.
+        :param path: Fichier du bloc (créé par `allocate`).
+        :param n_train: Nombre de lignes d'entraînement, rangées en tête du bloc (None = pas de découpage).
+        """
+        self.path = path
+        self.n_rows = n_rows
+        self.n_features = n_features
+        self.dtype = np.dtype(dtype)
+        self.columns = list(columns) if columns is not None else None
+        self.n_train = n_train
+        self._finalizer = None
+
+    @classmethod
+    def allocate(cls, n_rows, n_features, dtype="float64", columns=None, n_train=None, path=None):
+        """
+        Crée le fichier du bloc. Sans chemin, un fichier temporaire est créé dans SHARED_DIR et supprimé
+        lorsque l'objet créateur disparaît (les copies transmises aux processus ne le suppriment pas).
+        """
+        temporary = path is None
+        if temporary:
+            handle, path = tempfile.mkstemp(prefix="features_", suffix=".dat", dir=SHARED_DIR)
+            os.close(handle)
+        shared = cls(path, n_rows, n_features, dtype, columns, n_train)
+        np.memmap(path, dtype=shared.dtype, mode="w+", shape=(shared.size,)).flush()
+        if temporary:
+            shared._finalizer = weakref.finalize(shared, os.remove, path)
+        return shared
+
+    @classmethod
+    def from_frame(cls, X, y, dtype="float64", path=None):
+        """
+        Copie un DataFrame de caractéristiques et ses labels dans un nouveau bloc (ordre des lignes conservé).
+        Les sous-ensembles se désignent ensuite par des tableaux d'indices, sans nouvelle copie du bloc.
+        """
+        shared = cls.allocate(len(X), X.shape[1], dtype, columns=X.columns, path=path)
+        X_block, y_block = shared.attach(mode="r+")
+        X_block[:] = X.to_numpy(dtype=shared.dtype)
+        y_block[:] = y.to_numpy(dtype=shared.dtype)
+        y_block.flush()
+        return shared
+
+    @property
+    def size(self):
+        """Nombre d'éléments du bloc (caractéristiques puis labels)."""
+        return self.n_rows * (self.n_features + 1)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_finalizer"] = None
+        return state
+
+    def attach(self, mode="r"):
+        """
+        Projette le bloc en mémoire, sans copie.
+        :param mode: 'r' (lecture seule) ou 'r+' (remplissage).
+        :return: (X, y) : vues du bloc ; ce sont des np.memmap, que joblib transmet aux processus par référence.
+        """
+        block = np.memmap(self.path, dtype=self.dtype, mode=mode, shape=(self.size,))
+        X = block[:self.n_rows * self.n_features].reshape(self.n_rows, self.n_features)
+        y = block[self.n_rows * self.n_features:]
+        return X, y
+
+    def labels(self, y):
+        """Labels entiers (copie d'un simple vecteur, pour que les modèles gardent des classes entières)."""
+        return y.astype(np.int64)
+
+    def train(self):
+        """(X_train, y_train) : lignes de tête du bloc ; X_train reste une vue sans copie."""
+        X, y = self.attach()
+        return X[:self.n_train], self.labels(y[:self.n_train])
+
+    def test(self):
+        """(X_test, y_test) : lignes suivant celles d'entraînement."""
+        X, y = self.attach()
+        return X[self.n_train:], self.labels(y[self.n_train:])
+
+    def release(self):
+        """Supprime le fichier du bloc (les projections existantes restent valides jusqu'à leur fermeture)."""
+        if self._finalizer is not None:
+            self._finalizer()
+        elif os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Nombre d'utilisateurs par classe du jeu de données du cours (échelle 1)
+BASE_USERS = 20000
+
+# Fichiers bruts produits pour chaque classe (mêmes noms que dans Datasets/)
+CLASS_FILES = {"polluters": "content_polluters", "legitimate": "legitimate_users"}
+FILE_SUFFIXES = {"users": "", "tweets": "_tweets", "followings": "_followings"}
+
+# Dossier de sortie par défaut : jamais Datasets/, dont les fichiers réels ne peuvent pas être régénérés
+OUTPUT_DIR = os.path.join("Benchmark", "data")
+# Marqueur d'un dossier produit par ce générateur (ses fichiers peuvent être écrasés)
+SUMMARY_FILE = "synthetic.json"
+
+# Mots des tweets synthétiques : texte simple, mentions, hashtags et URLs (dont des cas limites)
+WORDS = np.array(["hello", "world", "free", "follow", "RT", "@user", "@bob", "#tag", "#win", "a#b",
+                  "mail@site", "http://t.co/abc", "https://bit.ly/x"])
+
+# Profils de chaque classe : les pollueurs suivent plus de comptes, tweetent davantage et publient plus d'URLs
+PROFILES = {
+    "polluters": {"followings": 900, "followers": 300, "tweets_per_user": 60, "url_weight": 4.0,
+                  "mean_gap_minutes": 90, "account_days": 300},
+    "legitimate": {"followings": 250, "followers": 400, "tweets_per_user": 40, "url_weight": 1.0,
+                   "mean_gap_minutes": 600, "account_days": 700},
+}
+
+
+def word_probabilities(url_weight):
+    """Probabilités de tirage des mots, les URLs étant pondérées par `url_weight`."""
+    weights = np.where(np.char.startswith(WORDS.astype(str), "http"), url_weight, 1.0)
+    return weights / weights.sum()
+
+
+def tweet_counts(rng, n_users, mean, distribution):
+    """
+    Nombre de tweets de chaque utilisateur.
+    :param distribution: 'poisson' (activité homogène) ou 'lognormal' (queue lourde : quelques comptes très actifs).
+    """
+    if distribution == "lognormal":
+        sigma = 1.0
+        return rng.lognormal(np.log(mean) - sigma ** 2 / 2, sigma, n_users).astype(np.int64)
+    return rng.poisson(mean, n_users)
+
+
+def generate_users(rng, user_ids, profile):
+    """
+    Table des utilisateurs au format de content_polluters.txt / legitimate_users.txt :
+    UserId, CreatedAt, CollectedAt, NumerOfFollowings, NumberOfFollowers, NumberOfTweets,
+    LengthOfScreenName, LengthOfDescriptionInUserProfile.
+    """
+    n = len(user_ids)
+    collected = pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 200, n), unit="D")
+    created = collected - pd.to_timedelta(rng.exponential(profile["account_days"], n).astype(np.int64) + 1, unit="D") \
+        - pd.to_timedelta(rng.integers(0, 86400, n), unit="s")
+    return pd.DataFrame({
+        0: user_ids,
+        1: created.strftime("%Y-%m-%d %H:%M:%S"),
+        2: collected.strftime("%Y-%m-%d %H:%M:%S"),
+        3: rng.geometric(1 / profile["followings"], n),
+        4: rng.geometric(1 / profile["followers"], n),
+        5: rng.geometric(1 / (profile["tweets_per_user"] * 20), n),
+        6: rng.integers(3, 16, n),
+        7: rng.integers(0, 161, n),
+    })
+
+
+def generate_tweets(rng, user_ids, counts, first_tweet_id, profile, max_words=8):
+    """
+    Tweets au format de *_tweets.txt : UserId, TweetId, texte, CreatedAt.
+    Les tweets des utilisateurs sont mélangés, comme dans les fichiers d'origine.
+    """
+    owners = np.repeat(user_ids, counts)
+    n = len(owners)
+    order = rng.permutation(n)
+    owners = owners[order]
+
+    # Texte : de 1 à max_words mots tirés selon le profil, assemblés colonne par colonne
+    lengths = rng.integers(1, max_words + 1, n)
+    picks = WORDS[rng.choice(len(WORDS), (n, max_words), p=word_probabilities(profile["url_weight"]))]
+    text = pd.Series(picks[:, 0], dtype=object)
+    for position in range(1, max_words):
+        text = text + np.where(lengths > position, " " + picks[:, position].astype(object), "")
+
+    # Dates : décalages exponentiels après un début propre à chaque utilisateur (échelle selon le profil)
+    gaps = rng.exponential(profile["mean_gap_minutes"] * 60, n).astype(np.int64)
+    starts = pd.Timestamp("2009-06-01").value // 10 ** 9 + rng.integers(0, 180 * 86400, len(user_ids))
+    times = np.repeat(starts, counts)[order] + gaps
+    created = pd.to_datetime(times, unit="s").strftime("%Y-%m-%d %H:%M:%S")
+    return pd.DataFrame({0: owners, 1: first_tweet_id + np.arange(n), 2: text, 3: created})
+
+
+def generate_followings(rng, user_ids, profile, max_points=30):
+    """
+    Séries de followings au format de *_followings.txt : UserId, puis nombre de comptes suivis
+    relevé à chaque collecte (valeurs croissantes séparées par des virgules).
+    """
+    n = len(user_ids)
+    lengths = rng.integers(1, max_points + 1, n)
+    steps = rng.poisson(profile["followings"] / max_points, lengths.sum())
+    series = np.cumsum(steps)
+    # Les séries repartent de leur propre origine : on retire le cumul des utilisateurs précédents
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    offsets = np.repeat(np.concatenate(([0], series[starts[1:] - 1])), lengths)
+    values = pd.Series(series - offsets).astype(str)
+    text = values.groupby(np.repeat(np.arange(n), lengths), sort=False).agg(",".join)
+    return pd.DataFrame({0: user_ids, 1: text.to_numpy()})
+
+
+def dataset_files(output_dir):
+    """Chemins des fichiers bruts écrits par le générateur : classe -> type de fichier -> chemin."""
+    return {label: {kind: os.path.join(output_dir, f"{prefix}{suffix}.txt") for kind, suffix in FILE_SUFFIXES.items()}
+            for label, prefix in CLASS_FILES.items()}
+
+
+def check_output(output_dir, force=False):
+    """
+    Refuse d'écraser des fichiers bruts qui n'ont pas été produits par ce générateur (dossier sans synthetic.json),
+    par exemple les vrais fichiers de Datasets/.
+    :param force: Écrase quand même les fichiers existants.
+    """
+    if force or os.path.exists(os.path.join(output_dir, SUMMARY_FILE)):
+        return
+    existing = [path for paths in dataset_files(output_dir).values() for path in paths.values()
+                if os.path.exists(path)]
+    if existing:
+        raise FileExistsError(f"{output_dir} contient des fichiers bruts non synthétiques ({', '.join(existing)}) ; "
+                              f"choisir un autre dossier ou utiliser --force pour les écraser")
+
+
+def generate_dataset(output_dir=OUTPUT_DIR, n_users=BASE_USERS, scale=1.0, distribution="poisson", seed=42,
+                     chunk_users=20000, force=False):
+    """
+    Écrit un jeu de données synthétique dans les formats bruts lus par Preprocessing et feature.py
+    (séparateur tabulation, sans en-tête), pour les deux classes.
+    Les utilisateurs sont générés par blocs de `chunk_users` et ajoutés aux fichiers : la mémoire
+    reste bornée quelle que soit l'échelle.
+    :param n_users: Nombre d'utilisateurs par classe à l'échelle 1.
+    :param scale: Facteur d'échelle (10 = dix fois plus d'utilisateurs, et donc de tweets).
+    :param distribution: Loi du nombre de tweets par utilisateur ('poisson' ou 'lognormal').
+    :param force: Écrase les fichiers bruts existants même si le dossier n'a pas de synthetic.json (voir check_output).
+    :return: Description du jeu généré (nombre de lignes de chaque fichier), aussi écrite dans synthetic.json.
+    """
+    check_output(output_dir, force)
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    users_per_class = int(round(n_users * scale))
+    summary = {"users_per_class": users_per_class, "scale": scale, "distribution": distribution, "seed": seed,
+               "rows": {}}
+
+    next_tweet_id = 0
+    files = dataset_files(output_dir)
+    for offset, (label, prefix) in enumerate(CLASS_FILES.items()):
+        profile = PROFILES[label]
+        paths = files[label]
+        rows = {kind: 0 for kind in paths}
+        for path in paths.values():
+            open(path, "w").close()
+
+        for start in range(0, users_per_class, chunk_users):
+            # Identifiants entrelacés entre les deux classes, comme dans le jeu d'origine
+            user_ids = (np.arange(start, min(start + chunk_users, users_per_class)) * 2 + offset + 1) * 3
+            counts = tweet_counts(rng, len(user_ids), profile["tweets_per_user"], distribution)
+            frames = {
+                "users": generate_users(rng, user_ids, profile),
+                "tweets": generate_tweets(rng, user_ids, counts, next_tweet_id, profile),
+                "followings": generate_followings(rng, user_ids, profile),
+            }
+            next_tweet_id += len(frames["tweets"])
+            for kind, frame in frames.items():
+                frame.to_csv(paths[kind], sep="\t", header=False, index=False, mode="a")
+                rows[kind] += len(frame)
+        summary["rows"][prefix] = rows
+        print(f"{label} : {rows['users']} utilisateurs, {rows['tweets']} tweets, {rows['followings']} séries")
+
+    with open(os.path.join(output_dir, SUMMARY_FILE), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération d'un jeu de données synthétique au format brut")
+    parser.add_argument("--output", default=OUTPUT_DIR, help="Dossier de sortie des fichiers bruts")
+    parser.add_argument("--users", type=int, default=BASE_USERS, help="Utilisateurs par classe à l'échelle 1")
+    parser.add_argument("--scale", type=float, default=1.0, help="Facteur d'échelle (ex. 10 ou 100)")
+    parser.add_argument("--distribution", choices=["poisson", "lognormal"], default="poisson",
+                        help="Loi du nombre de tweets par utilisateur")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true",
+                        help="Écrase les fichiers bruts d'un dossier qui n'a pas été produit par ce générateur")
+    args = parser.parse_args()
+
+    try:
+        generate_dataset(args.output, args.users, args.scale, args.distribution, args.seed, force=args.force)
+    except FileExistsError as e:
+        parser.error(str(e))
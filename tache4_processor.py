@@ -1,28 +1,74 @@
+import argparse
+import itertools
 import os
 import pandas as pd
 import numpy as np
-import pickle
-import matplotlib.pyplot as plt
-import seaborn as sns
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import BaggingClassifier, AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
 from sklearn.naive_bayes import GaussianNB
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, roc_auc_score, confusion_matrix
+from data_loader import load_data_frame
+from instrumentation import REPORT, record, stage
+from metrics import curves_frame, evaluate_scores, positive_scores, threshold_table
+from model_store import ModelStore, dataset_hash
+from reporting import ChartRenderer, render_bar, render_lines, render_table
+from parallel_training import train_models
+from shared_matrix import SharedMatrix
+
+
+def scenario_indices(labels, num_legitimate, polluter_ratio, test_size=0.2, random_state=42):
+    """
+    Sous-ensemble déséquilibré décrit par des indices de lignes, sans copie des données.
+    Le tirage reproduit celui de `create_imbalanced_dataset` (mêmes lignes, même ordre, même découpage).
+    :param labels: Labels de toutes les lignes (1 = pollueur).
+    :param num_legitimate: Nombre d'utilisateurs légitimes tirés (plafonné au nombre disponible).
+    :param polluter_ratio: Nombre de pollueurs en proportion des légitimes.
+    :return: (indices d'entraînement, indices de test) ou None si le scénario est irréalisable.
+    """
+    legitimate = np.flatnonzero(labels == 0)
+    polluters = np.flatnonzero(labels == 1)
+    num_legitimate = min(num_legitimate, len(legitimate))
+    num_polluters = int(num_legitimate * polluter_ratio)
+    if num_polluters < 2 or num_polluters > len(polluters):
+        return None
+
+    # Même générateur que DataFrame.sample(random_state=...) pour chaque tirage
+    legitimate_sample = legitimate[np.random.RandomState(random_state).choice(len(legitimate), num_legitimate, replace=False)]
+    polluter_sample = polluters[np.random.RandomState(random_state).choice(len(polluters), num_polluters, replace=False)]
+    sample = np.concatenate([legitimate_sample, polluter_sample])
+    sample = sample[np.random.RandomState(random_state).choice(len(sample), len(sample), replace=False)]
+    return train_test_split(sample, test_size=test_size, random_state=random_state, stratify=labels[sample])
+
+
+def sweep_job(model, shared, train_index, test_index):
+    """
+    Tâche d'un processus du balayage : s'attache au bloc partagé, entraîne une copie du modèle
+    sur les lignes d'entraînement du scénario et retourne les probabilités de la classe 1 sur ses lignes de test.
+    """
+    X, y = shared.attach()
+    labels = shared.labels(y)
+    estimator = clone(model).fit(X[train_index], labels[train_index])
+    return positive_scores(estimator, X[test_index])
 
 class Tache4Processor:
-    def __init__(self, data_path, test_size=0.2, random_state=42):
+    def __init__(self, data_path, test_size=0.2, random_state=42, n_jobs=1, plots=None):
         """
         Classe qui effectue toute la Tâche 4 : création du sous-ensemble, entraînement et évaluation.
+        :param n_jobs: Nombre de processus pour l'entraînement des modèles (-1 = tous les cœurs).
+        :param plots: Génère les graphiques (par défaut selon PIPELINE_PLOTS) ; ils sont rendus en arrière-plan.
         """
         self.data_path = data_path
         self.test_size = test_size
         self.random_state = random_state
+        self.n_jobs = n_jobs
         self.save_dir = "Datatest/Tache4"
         self.train_dir = os.path.join(self.save_dir, "Entrainement")
         self.result_dir = os.path.join(self.save_dir, "Results")
-        os.makedirs(self.train_dir, exist_ok=True)
         os.makedirs(self.result_dir, exist_ok=True)
+        self.store = ModelStore(self.train_dir)
+        self.renderer = ChartRenderer(self.result_dir, enabled=plots)
         
         # Chargement des données
         self.data = self.load_data()
@@ -42,10 +88,8 @@ class Tache4Processor:
         }
 
     def load_data(self):
-        """Charge les données finales."""
-        if not os.path.exists(self.data_path):
-            raise FileNotFoundError(f"Le fichier {self.data_path} est introuvable.")
-        return pd.read_csv(self.data_path, sep=',', encoding='utf-8')
+        """Charge les données finales (format colonnes typé ou CSV), partagées avec la Tâche 3 dans un même processus."""
+        return load_data_frame(self.data_path)
     
     def create_imbalanced_dataset(self):
         """Crée un sous-ensemble déséquilibré avec 5% de pollueurs."""
@@ -70,79 +114,128 @@ class Tache4Processor:
         return train_test_split(X, y, test_size=self.test_size, random_state=self.random_state, stratify=y)
 
     def train_models(self):
-        """Entraîne et sauvegarde les modèles."""
-        for name, model in self.models.items():
-            model.fit(self.X_train, self.y_train)
-            model_path = os.path.join(self.train_dir, f"{name}.pkl")
-            with open(model_path, 'wb') as f:
-                pickle.dump(model, f)
+        """Entraîne (en parallèle) et sauvegarde les modèles."""
+        results = train_models(self.models, self.X_train, self.y_train, cv=None, n_jobs=self.n_jobs)
+        data_hash = dataset_hash(self.X_train, self.y_train)
+        for name in self.models:
+            record(f"fit.{name}", results[name]["fit_seconds"], results[name]["fit_cpu_seconds"],
+                   rows_in=len(self.X_train))
+            model = self.models[name] = results[name]["model"]
+            self.store.save(name, model, data_hash=data_hash)
     
     def evaluate_models(self):
         """Évalue les modèles et génère les graphiques."""
-        results = {}
-        for name, model in self.models.items():
-            y_pred = model.predict(self.X_test)
-            y_prob = model.predict_proba(self.X_test)[:, 1] if hasattr(model, "predict_proba") else None
-            tn, fp, fn, tp = confusion_matrix(self.y_test, y_pred).ravel()
-            tp_rate = tp / (tp + fn) if (tp + fn) > 0 else 0
-            fp_rate = fp / (fp + tn) if (fp + tn) > 0 else 0
-            f1 = classification_report(self.y_test, y_pred, output_dict=True)['1']['f1-score']
-            auc = roc_auc_score(self.y_test, y_prob) if y_prob is not None else np.nan
-            results[name] = {"TP_Rate": tp_rate, "FP_Rate": fp_rate, "F1-score": f1, "AUC": auc}
+        # Une seule inférence par modèle : les labels sont déduits des probabilités
+        scores = {name: positive_scores(model, self.X_test) for name, model in self.models.items()}
+        results_df, curves = evaluate_scores(self.y_test, scores)
+        for name, metrics in results_df.to_dict(orient="index").items():
+            if name in self.store.manifest:
+                self.store.record_metrics(name, metrics)
 
         # Sauvegarde CSV
-        results_df = pd.DataFrame.from_dict(results, orient='index')
         results_path = os.path.join(self.result_dir, "model_performance.csv")
         results_df.to_csv(results_path, index=True, sep=',', encoding='utf-8')
+        curves_frame(curves).to_csv(os.path.join(self.result_dir, "roc_pr_curves.csv"), index=False, sep=',', encoding='utf-8')
+        threshold_table(curves).to_csv(os.path.join(self.result_dir, "threshold_metrics.csv"), index=False, sep=',', encoding='utf-8')
 
         # Génération des graphiques individuels
         for metric in ["TP_Rate", "FP_Rate", "F1-score", "AUC"]:
-            plt.figure(figsize=(10, 5))
-            sns.barplot(x=results_df.index, y=results_df[metric], hue=results_df.index, palette="viridis", legend=False)
-            plt.xticks(rotation=45)
-            plt.title(f"Comparaison des performances - {metric}")
             save_path = os.path.join(self.result_dir, f"{metric}_comparaison.png")
-            plt.savefig(save_path)
-            plt.close()
+            self.renderer.submit(render_bar, save_path, labels=results_df.index.tolist(),
+                                 values=results_df[metric].tolist(), title=f"Comparaison des performances - {metric}")
 
         # Graphique global comparatif
-        plt.figure(figsize=(12, 6))
         models = list(results_df.index)
         colors = ["blue", "red", "green", "purple"]
         markers = ["o", "s", "D", "*"]
-        
-        for metric, color, marker in zip(["TP_Rate", "FP_Rate", "F1-score", "AUC"], colors, markers):
-            scores = results_df[metric].tolist()
-            plt.plot(models, scores, marker=marker, linestyle="-", linewidth=2, markersize=8, label=metric, color=color)
-        
-        plt.xlabel("Modèles")
-        plt.ylabel("Score")
-        plt.title("Comparaison globale des performances des modèles")
-        plt.legend()
-        
+        series = [{"values": results_df[metric].tolist(), "label": metric, "color": color, "marker": marker}
+                  for metric, color, marker in zip(["TP_Rate", "FP_Rate", "F1-score", "AUC"], colors, markers)]
         save_path = os.path.join(self.result_dir, "comparaison_globale.png")
-        plt.savefig(save_path)
-        plt.close()
+        self.renderer.submit(render_lines, save_path, x=models, series=series,
+                             title="Comparaison globale des performances des modèles")
 
         # Tableau en PNG
-        fig, ax = plt.subplots(figsize=(10, 4))
-        ax.axis('tight')
-        ax.axis('off')
-        table = ax.table(cellText=results_df.round(4).values, 
-                         colLabels=results_df.columns,
-                         rowLabels=results_df.index,
-                         cellLoc='center', loc='center')
-        table.auto_set_font_size(False)
-        table.set_fontsize(10)
-        table.scale(1.2, 1.2)
-
         table_path = os.path.join(self.result_dir, "model_performance.png")
-        plt.savefig(table_path, bbox_inches='tight')
-        plt.close()
+        self.renderer.submit(render_table, table_path, values=results_df.round(4).values.tolist(),
+                             columns=results_df.columns.tolist(), index=results_df.index.tolist())
+        self.renderer.close()
+
+
+    def run_sweep(self, polluter_ratios, sample_sizes, n_jobs=None):
+        """
+        Balayage des scénarios de déséquilibre : toutes les combinaisons (proportion de pollueurs,
+        nombre de légitimes) et tous les modèles sont entraînés et évalués en parallèle.
+        Les données sont copiées une seule fois dans un bloc projeté en mémoire ; chaque scénario n'est qu'un couple
+        de tableaux d'indices et chaque processus ne matérialise que les lignes de la tâche en cours.
+        :param polluter_ratios: Proportions de pollueurs (par ex. [0.01, 0.05, 0.1]).
+        :param sample_sizes: Nombres d'utilisateurs légitimes (par ex. [1000, 10000]).
+        :param n_jobs: Nombre de processus (par défaut celui de la classe).
+        :return: Tableau consolidé (une ligne par scénario et par modèle), aussi enregistré en CSV.
+        """
+        X = self.data.drop(columns=['Classe'])
+        labels = self.data['Classe'].to_numpy()
+        scenarios = []
+        for ratio, size in itertools.product(polluter_ratios, sample_sizes):
+            split = scenario_indices(labels, size, ratio, self.test_size, self.random_state)
+            if split is None:
+                print(f"Scénario ignoré (pas assez de pollueurs) : ratio={ratio}, légitimes={size}")
+                continue
+            scenarios.append((ratio, size, *split))
+
+        shared = SharedMatrix.from_frame(X, self.data['Classe'])
+        jobs = [(scenario, name) for scenario in range(len(scenarios)) for name in self.models]
+        outputs = Parallel(n_jobs=self.n_jobs if n_jobs is None else n_jobs)(
+            delayed(sweep_job)(self.models[name], shared, scenarios[scenario][2], scenarios[scenario][3])
+            for scenario, name in jobs
+        )
+        shared.release()
+
+        tables = []
+        for scenario, (ratio, size, train_index, test_index) in enumerate(scenarios):
+            scores = {name: proba for (job_scenario, name), proba in zip(jobs, outputs) if job_scenario == scenario}
+            results_df, _ = evaluate_scores(labels[test_index], scores)
+            y_scenario = labels[np.concatenate([train_index, test_index])]
+            tables.append(results_df.rename_axis("Model").reset_index().assign(
+                Polluter_Ratio=ratio, Legitimate=int((y_scenario == 0).sum()), Polluters=int(y_scenario.sum()),
+                Train_Size=len(train_index), Test_Size=len(test_index)))
+
+        sweep_df = pd.concat(tables, ignore_index=True)
+        sweep_df = sweep_df[["Polluter_Ratio", "Legitimate", "Polluters", "Train_Size", "Test_Size", "Model",
+                             "TP_Rate", "FP_Rate", "F1-score", "AUC"]]
+        sweep_path = os.path.join(self.result_dir, "sweep_results.csv")
+        sweep_df.to_csv(sweep_path, index=False, sep=',', encoding='utf-8')
+        print(f"Résultats du balayage ({len(scenarios)} scénarios x {len(self.models)} modèles) : {sweep_path}")
+        return sweep_df
+
 
 # Exécution de la Tâche 4
-if __name__ == "__main__":
-    processor = Tache4Processor("Datatest/Tache2_donnees_final/data_final.csv")
-    processor.train_models()
-    processor.evaluate_models()
+def main(argv=None):
+    """Point d'entrée du script : entraîne et évalue les modèles de la Tâche 4."""
+    parser = argparse.ArgumentParser(description="Tâche 4 : données déséquilibrées")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Nombre de processus (-1 = tous les cœurs)")
+    parser.add_argument("--no-plots", action="store_true", help="N'écrit que les tableaux, sans graphiques")
+    parser.add_argument("--sweep-ratios", type=float, nargs="+", default=None,
+                        help="Balayage : proportions de pollueurs (par ex. 0.01 0.05 0.1)")
+    parser.add_argument("--sweep-sizes", type=int, nargs="+", default=[10000],
+                        help="Balayage : nombres d'utilisateurs légitimes")
+    args = parser.parse_args(argv)
+
+    with stage("tache4.prepare") as prepared:
+        processor = Tache4Processor("Datatest/Tache2_donnees_final/data_final", n_jobs=args.n_jobs,
+                                    plots=False if args.no_plots else None)
+        prepared["rows_in"], prepared["rows_out"] = len(processor.data), len(processor.imbalanced_data)
+    if args.sweep_ratios:
+        with stage("tache4.run_sweep", rows_in=len(processor.data)) as sweep:
+            sweep["rows_out"] = len(processor.run_sweep(args.sweep_ratios, args.sweep_sizes))
+        return processor
+    with stage("tache4.train_models", rows_in=len(processor.X_train)):
+        processor.train_models()
+    with stage("tache4.evaluate_models", rows_in=len(processor.X_test)):
+        processor.evaluate_models()
     print("************* Tâche 4 terminée avec succès !***********")
+    return processor
+
+
+if __name__ == "__main__":
+    main()
+    REPORT.save()
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from timestamps import MISSING, elapsed_days, parse_timestamps
+from token_counter import count_tokens
+from tweet_stats import TweetStatsAccumulator, aggregate_tweets
+
+# Comparaison avec l'ancienne implémentation (pd.to_datetime, .dt.days et groupby().diff() sur les dates)
+# L'ancienne conversion du format de l'API passait par l'inférence de format de pandas (avertissement attendu)
+pytestmark = pytest.mark.filterwarnings("ignore:Could not infer format")
+
+ISO_DATES = ["2009-02-04 02:01:34", "2009-02-04 02:01:34", None, "2010-12-31 23:59:59", "2009-03-01 00:00:00"]
+DAY_DATES = ["2009-02-04", None, "2012-02-29", "2009-02-04"]
+# Format de l'API Twitter (dates en UTC, décalage +0000)
+API_DATES = ["Wed Feb 04 02:01:34 +0000 2009", "Thu Feb 05 10:00:00 +0000 2009", None,
+             "Sat Jan 01 00:00:00 +0000 2011"]
+
+
+def reference_seconds(values):
+    """Ancienne conversion : pd.to_datetime (NaT si manquante), ramenée en secondes UTC."""
+    parsed = pd.to_datetime(pd.Series(values)).values.astype('datetime64[s]').view('int64')
+    parsed[pd.isna(pd.Series(values)).to_numpy()] = MISSING
+    return parsed
+
+
+def reference_stats(tweets, sort_by_time=False):
+    """Ancienne version de aggregate_tweets : dates pandas et écarts par groupby().diff()."""
+    per_tweet = count_tokens(tweets[2]).reset_index(drop=True)
+    per_tweet.insert(0, 'UserId', tweets[0].values)
+    per_tweet['CreatedAt'] = pd.to_datetime(tweets[3]).values
+    if sort_by_time:
+        per_tweet = per_tweet.sort_values(by=['UserId', 'CreatedAt'], kind='mergesort', ignore_index=True)
+
+    codes, user_ids = pd.factorize(per_tweet['UserId'])
+    per_tweet['TimeDiff'] = per_tweet.groupby(codes, sort=False)['CreatedAt'].diff().dt.total_seconds().abs() / 60
+    stats = per_tweet.groupby(codes, sort=False).agg(
+        TweetCount=('UserId', 'size'),
+        URLCount=('URLCount', 'sum'),
+        MentionCount=('MentionCount', 'sum'),
+        HashtagCount=('HashtagCount', 'sum'),
+        MeanTimeBetweenTweets=('TimeDiff', 'mean'),
+        MaxTimeBetweenTweets=('TimeDiff', 'max')
+    )
+    stats.insert(0, 'UserId', user_ids[stats.index])
+    return stats.reset_index(drop=True)
+
+
+def make_tweets(dates):
+    """
+    Tweets bruts (colonnes 0 = UserId, 1 = TweetId, 2 = texte, 3 = date) :
+    l'utilisateur 7 n'a qu'un tweet, les autres ont des tweets mélangés dans le fichier.
+    """
+    users = [1, 2, 1, 7, 2, 1, 2, 1, 3, 3][:len(dates)]
+    text = ["hello @bob", "http://t.co/x #tag", "RT @a @b", "#x#y", "mail@site", "free",
+            "https://bit.ly/z", "@user #win", "a#b", "plain"][:len(dates)]
+    return pd.DataFrame({0: users, 1: np.arange(len(dates)), 2: text, 3: pd.Series(dates, dtype=object)})
+
+
+def assert_same_stats(result, expected):
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("dates", [ISO_DATES, DAY_DATES, API_DATES], ids=["iso", "day", "api"])
+def test_parse_timestamps_matches_to_datetime(dates):
+    np.testing.assert_array_equal(parse_timestamps(pd.Series(dates, dtype=object)), reference_seconds(dates))
+
+
+def test_parse_timestamps_converts_offsets_to_utc():
+    # Décalages différents dans une même colonne : l'ancienne conversion échouait, ils sont ramenés en UTC
+    dates = ["Wed Feb 04 02:01:34 +0200 2009", "Wed Feb 04 02:01:34 -0500 2009"]
+    expected = pd.to_datetime(pd.Series(dates), utc=True).values.astype('datetime64[s]').view('int64')
+    np.testing.assert_array_equal(parse_timestamps(pd.Series(dates, dtype=object)), expected)
+
+
+def test_parse_timestamps_all_missing():
+    assert (parse_timestamps(pd.Series([None, np.nan], dtype=object)) == MISSING).all()
+
+
+def test_elapsed_days_matches_timedelta_days():
+    created = ["2009-02-04 02:01:34", "2009-02-04 23:00:00", None, "2010-01-01 00:00:00", "2010-01-01 00:00:00"]
+    collected = ["2009-02-05 02:01:33", "2009-02-04 22:00:00", "2010-01-01 00:00:00", None, "2011-03-01 12:00:00"]
+    expected = (pd.to_datetime(pd.Series(collected)) - pd.to_datetime(pd.Series(created))).dt.days
+    result = elapsed_days(parse_timestamps(pd.Series(created, dtype=object)),
+                          parse_timestamps(pd.Series(collected, dtype=object)))
+    np.testing.assert_array_equal(result, expected.to_numpy(dtype=np.float64))
+
+
+@pytest.mark.parametrize("sort_by_time", [False, True])
+@pytest.mark.parametrize("dates", [
+    ["2009-02-04 02:01:34", "2009-02-04 03:00:00", "2009-02-03 12:00:00", "2009-02-06 00:00:00", None,
+     "2009-02-04 02:01:34", "2009-02-05 00:00:00", "2009-02-01 08:30:00", "2009-02-01 00:00:00", None],
+    ["Wed Feb 04 02:01:34 +0000 2009", "Wed Feb 04 03:00:00 +0000 2009", "Tue Feb 03 12:00:00 +0000 2009",
+     "Fri Feb 06 00:00:00 +0000 2009", "Wed Feb 04 02:01:34 +0000 2009", "Thu Feb 05 00:00:00 +0000 2009",
+     "Sat Feb 07 00:00:00 +0000 2009", "Sun Feb 01 08:30:00 +0000 2009", None, None],
+], ids=["iso", "api"])
+def test_aggregate_tweets_matches_groupby_diff(dates, sort_by_time):
+    tweets = make_tweets(dates)
+    assert_same_stats(aggregate_tweets(tweets, sort_by_time), reference_stats(tweets, sort_by_time))
+
+
+def test_single_tweet_user_has_no_gap():
+    stats = aggregate_tweets(make_tweets(ISO_DATES + ["2009-02-04 02:01:34"] * 5))
+    single = stats[stats['UserId'] == 7].iloc[0]
+    assert single['TweetCount'] == 1
+    assert np.isnan(single['MeanTimeBetweenTweets']) and np.isnan(single['MaxTimeBetweenTweets'])
+
+
+@pytest.mark.parametrize("split", [1, 3, 5, 8])
+def test_chunks_match_whole_file(split):
+    # Les tweets des utilisateurs 1 et 2 sont répartis sur les deux blocs (date manquante comprise)
+    dates = ["2009-02-04 02:01:34", "2009-02-04 03:00:00", "2009-02-03 12:00:00", "2009-02-06 00:00:00", None,
+             "2009-02-04 02:01:34", "2009-02-05 00:00:00", "2009-02-01 08:30:00", "2009-02-01 00:00:00",
+             "2009-02-02 00:00:00"]
+    tweets = make_tweets(dates)
+    accumulator = TweetStatsAccumulator()
+    accumulator.update(tweets.iloc[:split])
+    accumulator.update(tweets.iloc[split:])
+    assert_same_stats(accumulator.result(), reference_stats(tweets))
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Formats connus des dates des fichiers bruts, essayés dans l'ordre :
+# "2009-02-04 02:01:34" (utilisateurs et tweets), date seule, puis format de l'API Twitter
+TIMESTAMP_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%a %b %d %H:%M:%S %z %Y"]
+
+# Valeur entière d'une date manquante ou illisible (même représentation que NaT)
+MISSING = np.iinfo('int64').min
+
+
+class TimestampParser:
+    def __init__(self, formats=TIMESTAMP_FORMATS, max_cache=100_000):
+        """
+        Conversion de dates texte en secondes depuis l'époque Unix (int64).
+        Chaque chaîne distincte n'est analysée qu'une fois : les valeurs d'une colonne sont d'abord factorisées.
+        Les dates des colonnes répétitives (dates de collecte, de création des comptes) sont aussi mémorisées
+        d'un appel à l'autre ; les colonnes presque sans doublons (dates des tweets) ne remplissent pas le cache.
+        Les chaînes nouvelles sont converties avec les formats déclarés, sans inférence de format ; seules celles
+        qu'aucun format ne reconnaît passent par l'inférence de pandas.
+        :param formats: Formats strptime essayés dans l'ordre.
+        :param max_cache: Nombre maximal de chaînes mémorisées.
+        """
+        self.formats = list(formats)
+        self.max_cache = max_cache
+        self.cache = pd.Series(dtype='int64', index=pd.Index([], dtype=object))
+
+    def convert(self, strings):
+        """Convertit des chaînes distinctes en secondes (MISSING si illisible)."""
+        strings = pd.Series(strings, dtype=object)
+        try:
+            # Chemin rapide : dates ISO ("2009-02-04 02:01:34" ou "2009-02-04"), lues directement par numpy
+            return np.array(strings.to_numpy(), dtype='datetime64[s]').view('int64')
+        except ValueError:
+            pass
+
+        seconds = np.full(len(strings), MISSING, dtype='int64')
+        pending = np.ones(len(strings), dtype=bool)
+        for fmt in self.formats + ['mixed']:
+            if not pending.any():
+                break
+            # Les dates avec fuseau sont ramenées en UTC
+            aware = fmt == 'mixed' or '%z' in fmt
+            parsed = pd.to_datetime(strings[pending], format=fmt, errors='coerce', utc=aware)
+            valid = parsed.notna().to_numpy()
+            if aware:
+                parsed = parsed.dt.tz_localize(None)
+            rows = np.flatnonzero(pending)[valid]
+            seconds[rows] = parsed[valid].to_numpy('datetime64[s]').view('int64')
+            pending[rows] = False
+        return seconds
+
+    def parse(self, values):
+        """
+        :param values: Colonne de dates (texte ; les valeurs manquantes donnent MISSING).
+        :return: Tableau int64 de secondes depuis l'époque Unix, aligné sur `values`.
+        """
+        codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+        uniques = pd.Index(uniques, dtype=object)
+        positions = self.cache.index.get_indexer(uniques) if len(self.cache) else np.full(len(uniques), -1)
+        known = positions >= 0
+
+        seconds = np.empty(len(uniques), dtype='int64')
+        seconds[known] = self.cache.to_numpy()[positions[known]]
+        if not known.all():
+            fresh = self.convert(uniques[~known])
+            seconds[~known] = fresh
+            repetitive = len(uniques) <= len(codes) // 2
+            if repetitive and len(self.cache) + len(fresh) <= self.max_cache:
+                self.cache = pd.concat([self.cache, pd.Series(fresh, index=uniques[~known])])
+
+        result = seconds[codes] if len(seconds) else np.full(len(codes), MISSING, dtype='int64')
+        result[codes < 0] = MISSING
+        return result
+
+
+# Analyseur partagé par le processus (le cache sert à toutes les colonnes de dates)
+PARSER = TimestampParser()
+
+
+def parse_timestamps(values):
+    """Dates texte -> secondes depuis l'époque Unix (int64, MISSING si absente), via le cache du processus."""
+    return PARSER.parse(values)
+
+
+def elapsed_days(start, end):
+    """
+    Nombre de jours entiers entre deux tableaux de secondes (arrondi vers le bas, comme Timedelta.days).
+    :return: Tableau int64, ou float64 avec NaN si une date manque.
+    """
+    missing = (start == MISSING) | (end == MISSING)
+    days = (end - np.where(missing, end, start)) // 86400
+    if missing.any():
+        return np.where(missing, np.nan, days)
+    return days
@@ -0,0 +1,59 @@
+import re
+import pandas as pd
+
+# Caractères considérés comme des espaces par `str.split()` (écrits explicitement pour que le motif
+# se comporte de la même façon avec le moteur `re` et avec le moteur RE2 des chaînes Arrow)
+WHITESPACE = '[\t-\r\x1c-\x20\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]'
+
+# Jetons comptés sur le texte des tweets : nom de colonne -> (motif, mode) ou fonction vectorisée.
+#  - mode 'count'       : nombre d'occurrences du motif regex dans le tweet
+#  - mode 'contains'    : 1 si le motif regex apparaît dans le tweet, 0 sinon
+#  - mode 'word_prefix' : nombre de mots (au sens de `str.split()`) commençant par le texte donné
+# Une fonction reçoit la Series de texte et doit retourner une Series alignée.
+TWEET_TOKENS = {
+    # Tweet contenant au moins une URL
+    'URLCount': (r'http://|https://', 'contains'),
+    # Mots commençant par '@' (équivalent à `word.startswith('@')` après `str.split()`)
+    'MentionCount': ('@', 'word_prefix'),
+    # Caractères '#'
+    'HashtagCount': (r'#', 'count'),
+}
+
+# Exemples de jetons supplémentaires pouvant être ajoutés à TWEET_TOKENS ou passés à count_tokens()
+EXTRA_TOKENS = {
+    # Marqueur de retweet "RT" isolé
+    'RetweetCount': (r'(?<!\S)RT(?!\S)', 'count'),
+    # Caractères emoji (plans symboles et pictogrammes)
+    'EmojiCount': ('[\U0001F300-\U0001FAFF\u2600-\u27BF]', 'count'),
+    # Proportion de lettres majuscules parmi les lettres
+    'UppercaseRatio': lambda text: (text.str.count(r'[A-Z]') / text.str.count(r'[A-Za-z]')).fillna(0),
+}
+
+
+def count_tokens(text, tokens=None):
+    """
+    Calcule en opérations de colonne toutes les statistiques de jetons d'une Series de tweets.
+    :param text: Series contenant le texte des tweets (les valeurs manquantes comptent pour 0).
+    :param tokens: Dictionnaire de jetons (par défaut TWEET_TOKENS).
+    :return: DataFrame avec une colonne par jeton, aligné sur l'index de `text`.
+    """
+    if tokens is None:
+        tokens = TWEET_TOKENS
+
+    counts = pd.DataFrame(index=text.index)
+    for name, spec in tokens.items():
+        if callable(spec):
+            counts[name] = spec(text)
+            continue
+
+        pattern, mode = spec
+        if mode == 'contains':
+            counts[name] = text.str.contains(pattern, regex=True, na=False).astype('int64')
+        elif mode == 'count':
+            counts[name] = text.str.count(pattern).fillna(0).astype('int64')
+        elif mode == 'word_prefix':
+            # Un espace ajouté en tête évite l'ancre '^', mal gérée par le comptage regex d'Arrow
+            counts[name] = (' ' + text).str.count(WHITESPACE + re.escape(pattern)).fillna(0).astype('int64')
+        else:
+            raise ValueError(f"Mode de jeton inconnu pour {name} : {mode}")
+    return counts
@@ -0,0 +1,313 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy.special import expit, logit, softmax
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import AdaBoostClassifier, BaggingClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+# Feuille d'un arbre sklearn (tree_.feature == -2 et enfants == -1)
+LEAF = -2
+
+# Vérification de l'export : écart maximal toléré avec `predict_proba` du modèle d'origine
+CHECK_ROWS = 256
+CHECK_ATOL = 1e-9
+
+
+class PackedEnsemble:
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, depth, bias, link, classes,
+                 feature_names=None):
+        """
+        Ensemble d'arbres aplati dans des tableaux de nœuds communs à tous les arbres.
+        Chaque feuille pointe vers elle-même (enfants gauche et droit = la feuille) : un lot de lignes parcourt
+        tous les arbres en `depth` étapes vectorisées, sans test de fin par arbre.
+        :param feature, threshold: Caractéristique et seuil de chaque nœud (indices de colonnes de X).
+        :param left, right: Indices globaux des enfants.
+        :param missing_left: Vrai si une valeur manquante part à gauche.
+        :param value: Contribution de chaque feuille à la sortie brute (n_nœuds x n_sorties), pondération comprise.
+        :param roots: Indice global de la racine de chaque arbre.
+        :param depth: Profondeur maximale des arbres.
+        :param bias: Constante ajoutée à la somme des contributions.
+        :param link: Transformation de la sortie brute en probabilités ('mean', 'samme', 'logistic', 'softmax').
+        :param classes: Classes du modèle d'origine.
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.link = str(link)
+        self.classes_ = np.asarray(classes)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def apply(self, X, chunk_rows=2048):
+        """
+        Feuille atteinte dans chaque arbre : tableau (n_lignes x n_arbres) d'indices globaux.
+        Seuls les couples (ligne, arbre) qui ne sont pas encore sur une feuille avancent d'un niveau à chaque étape,
+        et les lignes sont traitées par blocs de `chunk_rows` pour que les tableaux de travail restent en cache.
+        """
+        # Les arbres sklearn comparent les valeurs en float32 aux seuils en float64
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        # Enfants entrelacés : l'enfant suivi est children[2 * nœud + (aller à droite)]
+        children = np.column_stack([self.left, self.right]).ravel()
+        is_leaf = self.left == np.arange(self.n_nodes)
+        has_missing = self.missing_left.any()
+        leaves = np.empty(len(X) * self.n_trees, dtype=np.intp)
+        for start in range(0, len(X), chunk_rows):
+            block = X[start:start + chunk_rows]
+            values = block.ravel()
+            node = np.tile(self.roots, len(block))
+            offsets = np.repeat(np.arange(len(block)) * block.shape[1], self.n_trees)
+            active = np.arange(len(node))
+            current = node
+            for _ in range(self.depth):
+                keep = ~is_leaf.take(current)
+                if not keep.all():
+                    active, current, offsets = active[keep], current[keep], offsets[keep]
+                if len(active) == 0:
+                    break
+                x = values.take(offsets + self.feature.take(current))
+                go_right = ~(x <= self.threshold.take(current))
+                if has_missing:
+                    go_right &= ~(np.isnan(x) & self.missing_left.take(current))
+                current = children.take(2 * current + go_right)
+                node[active] = current
+            leaves[start * self.n_trees:(start + len(block)) * self.n_trees] = node
+        return leaves.reshape(len(X), self.n_trees)
+
+    def raw_predict(self, X):
+        """Sortie brute : biais + somme des contributions des feuilles atteintes."""
+        return self.bias + self.value[self.apply(X)].sum(axis=1)
+
+    def predict_proba(self, X):
+        raw = self.raw_predict(X)
+        if self.link == "mean":
+            return raw
+        if self.link == "samme":
+            if len(self.classes_) == 2:
+                decision = raw[:, 1] - raw[:, 0]
+                return softmax(np.vstack([-decision, decision]).T / 2, axis=1)
+            return softmax(raw / (len(self.classes_) - 1), axis=1)
+        if self.link == "logistic":
+            proba = expit(raw[:, 0])
+            return np.column_stack([1 - proba, proba])
+        return softmax(raw, axis=1)
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def save(self, path):
+        """Enregistre les tableaux de nœuds (.npz non compressé)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                 missing_left=self.missing_left, value=self.value, roots=self.roots, depth=self.depth,
+                 bias=self.bias, link=self.link, classes=self.classes_,
+                 feature_names=np.array(self.feature_names if self.feature_names is not None else [], dtype=str))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+        feature_names = arrays.pop("feature_names").tolist() or None
+        return cls(**arrays, feature_names=feature_names)
+
+
+def normalized(value):
+    """Proportions par classe d'une feuille de classification (même règle que `predict_proba` d'un arbre)."""
+    normalizer = value.sum(axis=1, keepdims=True)
+    normalizer[normalizer == 0.0] = 1.0
+    return value / normalizer
+
+
+def pack(trees, n_outputs):
+    """
+    Concatène les nœuds d'arbres sklearn.
+    :param trees: Liste de (tree_, valeurs des feuilles (n_nœuds x n_outputs), correspondance des colonnes ou None).
+    :return: Dictionnaire des tableaux de PackedEnsemble (sans biais ni lien).
+    """
+    features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+    offset, depth = 0, 0
+    for tree, value, columns in trees:
+        leaf = tree.feature == LEAF
+        own = np.arange(tree.node_count)
+        feature = np.where(leaf, 0, tree.feature)
+        if columns is not None:
+            feature = np.asarray(columns)[feature]
+        features.append(feature)
+        thresholds.append(np.where(leaf, np.inf, tree.threshold))
+        lefts.append(np.where(leaf, own, tree.children_left) + offset)
+        rights.append(np.where(leaf, own, tree.children_right) + offset)
+        missing.append(np.asarray(tree.missing_go_to_left, dtype=bool) & ~leaf)
+        values.append(np.where(leaf[:, np.newaxis], value, 0.0).reshape(tree.node_count, n_outputs))
+        roots.append(offset)
+        offset += tree.node_count
+        depth = max(depth, tree.max_depth)
+    return {
+        "feature": np.concatenate(features).astype(np.intp),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "left": np.concatenate(lefts).astype(np.intp),
+        "right": np.concatenate(rights).astype(np.intp),
+        "missing_left": np.concatenate(missing),
+        "value": np.concatenate(values).astype(np.float64),
+        "roots": np.array(roots, dtype=np.intp),
+        "depth": depth
+    }
+
+
+def class_columns(estimator_classes, n_classes):
+    """Place les probabilités d'un sous-estimateur (classes encodées 0..k-1, parfois incomplètes) sur k colonnes."""
+    def expand(value):
+        full = np.zeros((value.shape[0], n_classes))
+        full[:, np.asarray(estimator_classes, dtype=np.intp)] = value
+        return full
+    return expand
+
+
+def gradient_boosting_bias(model, n_outputs):
+    """
+    Sortie brute initiale d'un GradientBoostingClassifier, à partir de ses attributs publics :
+    0 pour init="zero", sinon le lien de la perte appliqué aux probabilités a priori (DummyClassifier "prior"),
+    comme sklearn : logit(p) (log_loss binaire), logit(p) / 2 (exponential), log(p) centré (multiclasse).
+    """
+    if isinstance(model.init_, str):
+        return np.zeros(n_outputs)
+    eps = np.finfo(np.float64).eps
+    prior = np.clip(model.init_.class_prior_, eps, 1 - eps)
+    if n_outputs == 1:
+        return np.array([logit(prior[1]) / (2 if model.loss == "exponential" else 1)])
+    log_prior = np.log(prior)
+    return log_prior - log_prior.mean()
+
+
+def probe_rows(packed, n_features, n_rows=CHECK_ROWS, seed=0):
+    """
+    Lignes de contrôle : chaque caractéristique prend une valeur juste au-dessus ou au-dessous d'un des seuils
+    des arbres, pour que les lignes parcourent des branches variées (0 pour les caractéristiques jamais testées).
+    """
+    rng = np.random.default_rng(seed)
+    split = np.isfinite(packed.threshold)
+    X = np.zeros((n_rows, n_features))
+    for column in range(n_features):
+        thresholds = packed.threshold[split & (packed.feature == column)]
+        if len(thresholds):
+            picked = thresholds[rng.integers(0, len(thresholds), n_rows)]
+            X[:, column] = picked + rng.choice([-1.0, 1.0], n_rows) * 1e-3 * np.maximum(np.abs(picked), 1.0)
+    return X
+
+
+def check_export(model, packed):
+    """
+    Compare les probabilités de l'export et du modèle d'origine sur des lignes de contrôle : un écart
+    (par ex. après un changement interne de sklearn) fait échouer l'export au lieu de fausser les prédictions.
+    :raises RuntimeError: Écart supérieur à CHECK_ATOL.
+    """
+    X = probe_rows(packed, model.n_features_in_)
+    expected = model.predict_proba(pd.DataFrame(X, columns=packed.feature_names)
+                                   if packed.feature_names is not None else X)
+    error = np.abs(packed.predict_proba(X) - expected).max()
+    if not error <= CHECK_ATOL:
+        raise RuntimeError(f"Export de {type(model).__name__} incohérent avec predict_proba (écart {error:.2e})")
+
+
+def export_model(model):
+    """
+    Aplatit un modèle d'arbres entraîné en PackedEnsemble, puis vérifie que ses probabilités sont celles du modèle.
+    Modèles pris en charge : DecisionTree, RandomForest, Bagging (d'arbres), AdaBoost (SAMME, arbres)
+    et GradientBoosting (initialisation par défaut).
+    :raises TypeError: Modèle non pris en charge (par ex. GaussianNB).
+    :raises RuntimeError: Probabilités différentes de celles du modèle d'origine (voir check_export).
+    """
+    packed = pack_model(model)
+    check_export(model, packed)
+    return packed
+
+
+def pack_model(model):
+    """Construit le PackedEnsemble d'un modèle d'arbres (sans vérification, voir export_model)."""
+    feature_names = getattr(model, "feature_names_in_", None)
+    classes = model.classes_
+
+    if isinstance(model, DecisionTreeClassifier):
+        value = normalized(model.tree_.value[:, 0, :])
+        arrays = pack([(model.tree_, value, None)], len(classes))
+        return PackedEnsemble(**arrays, bias=np.zeros(len(classes)), link="mean", classes=classes,
+                              feature_names=feature_names)
+
+    if isinstance(model, RandomForestClassifier) and model.n_outputs_ == 1:
+        n_trees = len(model.estimators_)
+        trees = [(tree.tree_, normalized(tree.tree_.value[:, 0, :]) / n_trees, None) for tree in model.estimators_]
+        return PackedEnsemble(**pack(trees, len(classes)), bias=np.zeros(len(classes)), link="mean",
+                              classes=classes, feature_names=feature_names)
+
+    if isinstance(model, BaggingClassifier) and all(isinstance(tree, DecisionTreeClassifier)
+                                                    for tree in model.estimators_):
+        n_trees = len(model.estimators_)
+        trees = []
+        for tree, columns in zip(model.estimators_, model.estimators_features_):
+            expand = class_columns(tree.classes_, len(classes))
+            trees.append((tree.tree_, expand(normalized(tree.tree_.value[:, 0, :])) / n_trees, columns))
+        return PackedEnsemble(**pack(trees, len(classes)), bias=np.zeros(len(classes)), link="mean",
+                              classes=classes, feature_names=feature_names)
+
+    if isinstance(model, AdaBoostClassifier) and all(isinstance(tree, DecisionTreeClassifier)
+                                                     for tree in model.estimators_):
+        n_classes = len(classes)
+        weights = model.estimator_weights_[:len(model.estimators_)]
+        trees = []
+        for tree, weight in zip(model.estimators_, weights):
+            # Vote SAMME : +w pour la classe prédite par la feuille, -w/(k-1) pour les autres
+            proba = class_columns(np.searchsorted(classes, tree.classes_), n_classes)(tree.tree_.value[:, 0, :])
+            vote = np.where(np.arange(n_classes) == np.argmax(proba, axis=1)[:, np.newaxis],
+                            weight, -weight / (n_classes - 1))
+            trees.append((tree.tree_, vote / model.estimator_weights_.sum(), None))
+        return PackedEnsemble(**pack(trees, n_classes), bias=np.zeros(n_classes), link="samme",
+                              classes=classes, feature_names=feature_names)
+
+    if isinstance(model, GradientBoostingClassifier) and (
+            (isinstance(model.init_, str) and model.init_ == "zero")
+            or (isinstance(model.init_, DummyClassifier) and model.init_.strategy == "prior")):
+        n_outputs = model.estimators_.shape[1]
+        trees = []
+        for stage in model.estimators_:
+            for k, tree in enumerate(stage):
+                value = np.zeros((tree.tree_.node_count, n_outputs))
+                value[:, k] = model.learning_rate * tree.tree_.value[:, 0, 0]
+                trees.append((tree.tree_, value, None))
+        packed = PackedEnsemble(**pack(trees, n_outputs), bias=gradient_boosting_bias(model, n_outputs), link="logistic" if n_outputs == 1 else "softmax",
+                                classes=classes, feature_names=feature_names)
+        if model.loss == "exponential":
+            # Perte exponentielle : p = expit(2 * F(x))
+            packed.value, packed.bias = packed.value * 2, packed.bias * 2
+        return packed
+
+    raise TypeError(f"Modèle non pris en charge par l'export en tableaux : {type(model).__name__}")
+
+
+def export_models(models, save_dir=None):
+    """
+    Exporte tous les modèles d'arbres d'un dictionnaire nom -> modèle (par ex. `ModelTrainer.models`).
+    Les modèles non pris en charge sont ignorés.
+    :param save_dir: Dossier où enregistrer chaque export sous `<nom>.npz` (facultatif).
+    """
+    packed = {}
+    for name, model in models.items():
+        try:
+            packed[name] = export_model(model)
+        except TypeError as e:
+            print(f"{name} ignoré : {e}")
+            continue
+        if save_dir is not None:
+            packed[name].save(os.path.join(save_dir, f"{name}.npz"))
+    return packed
@@ -0,0 +1,254 @@
+import numpy as np
+import pandas as pd
+from artifact_io import load_frame, save_frame
+from schema import PER_TWEET, RAW_TWEETS, RAW_TWEETS_COLUMNS, narrow
+from timestamps import MISSING, parse_timestamps
+from token_counter import count_tokens
+
+# Valeur entière représentant une date manquante (NaT) en nanosecondes
+NAT = np.iinfo('int64').min
+
+
+# Colonnes produites par les agrégations de tweets, dans l'ordre
+STATS_COLUMNS = ['UserId', 'TweetCount', 'URLCount', 'MentionCount', 'HashtagCount',
+                 'MeanTimeBetweenTweets', 'MaxTimeBetweenTweets']
+
+# Nombre de tweets lus à la fois quand seules les colonnes par tweet sont conservées (voir read_tweet_columns)
+TWEET_BLOCK = 200000
+
+
+def read_tweets(tweets_file, chunksize=None):
+    """
+    Lit un fichier de tweets brut avec le schéma compact : UserId, texte et date (chaînes Arrow).
+    L'identifiant des tweets n'est pas lu.
+    :param chunksize: Si fourni, retourne un lecteur par blocs de `chunksize` lignes.
+    """
+    text_columns = {column: dtype for column, dtype in RAW_TWEETS.items() if column != 0}
+    return pd.read_csv(tweets_file, sep='\t', header=None, usecols=RAW_TWEETS_COLUMNS, dtype=text_columns,
+                       chunksize=chunksize)
+
+
+def read_tweet_columns(tweets_file, chunksize=TWEET_BLOCK):
+    """
+    Lit un fichier de tweets par blocs et ne garde que les colonnes par tweet (voir tweet_columns).
+    Le texte d'un bloc est libéré avant la lecture du suivant : la mémoire nécessaire ne dépend plus de la
+    taille du texte du fichier, mais seulement de celle d'un bloc et des colonnes compactes.
+    :return: DataFrame des colonnes par tweet, dans l'ordre du fichier.
+    """
+    return pd.concat([tweet_columns(chunk) for chunk in read_tweets(tweets_file, chunksize)], ignore_index=True)
+
+
+def tweet_columns(tweets):
+    """
+    Calcule les colonnes par tweet nécessaires aux statistiques par utilisateur.
+    Le texte n'est pas conservé : seuls les compteurs (uint32), l'utilisateur (int32) et la date en secondes
+    restent en mémoire, et le DataFrame brut peut être libéré dès le retour.
+    :param tweets: DataFrame brut des tweets (colonnes 0 = UserId, 2 = texte, 3 = date).
+    :return: DataFrame avec UserId, URLCount, MentionCount, HashtagCount et CreatedAt
+             (secondes depuis l'époque Unix, MISSING si la date manque).
+    """
+    per_tweet = narrow(count_tokens(tweets[2]).reset_index(drop=True), PER_TWEET)
+    per_tweet.insert(0, 'UserId', tweets[0].values)
+    per_tweet['CreatedAt'] = parse_timestamps(tweets[3])
+    return narrow(per_tweet, PER_TWEET)
+
+
+def time_gaps(codes, created):
+    """
+    Écart absolu (minutes) entre chaque tweet et le tweet précédent du même utilisateur, dans l'ordre des lignes.
+    Les écarts sont des différences d'entiers (secondes) ; le premier tweet d'un utilisateur et les écarts
+    impliquant une date manquante valent NaN.
+    :param codes: Code entier de l'utilisateur de chaque tweet.
+    :param created: Dates en secondes (int64).
+    """
+    # Tri stable par utilisateur : les tweets d'un même utilisateur deviennent contigus, dans leur ordre
+    order = np.argsort(codes, kind='stable')
+    ordered_codes, ordered = codes[order], created[order]
+    valid = (ordered_codes[1:] == ordered_codes[:-1]) & (ordered[1:] != MISSING) & (ordered[:-1] != MISSING)
+    gaps = np.full(len(codes), np.nan)
+    gaps[order[1:][valid]] = np.abs(ordered[1:][valid] - ordered[:-1][valid]) / 60
+    return gaps
+
+
+def aggregate_tweets(tweets, sort_by_time=False):
+    """
+    Calcule en une seule passe toutes les statistiques de tweets par utilisateur.
+    :param tweets: DataFrame brut des tweets.
+    :param sort_by_time: Si True, les écarts sont calculés après tri chronologique des tweets de chaque
+                         utilisateur ; sinon dans l'ordre du fichier (écart absolu).
+    :return: DataFrame avec les colonnes STATS_COLUMNS.
+    """
+    return aggregate_tweet_columns(tweet_columns(tweets), sort_by_time)
+
+
+def aggregate_tweet_columns(per_tweet, sort_by_time=False):
+    """
+    Statistiques par utilisateur à partir des colonnes par tweet (voir tweet_columns).
+    Les identifiants sont factorisés une seule fois ; écarts et agrégats sont calculés sur ces codes entiers.
+    """
+    if sort_by_time:
+        # Les dates manquantes sont placées après les autres, comme NaT
+        sort_key = per_tweet['CreatedAt'].replace(MISSING, np.iinfo('int64').max)
+        per_tweet = per_tweet.iloc[np.lexsort((sort_key.to_numpy(), per_tweet['UserId'].to_numpy()))]
+        per_tweet = per_tweet.reset_index(drop=True)
+
+    codes, user_ids = pd.factorize(per_tweet['UserId'])
+    per_tweet['TimeDiff'] = time_gaps(codes, per_tweet['CreatedAt'].to_numpy())
+
+    stats = per_tweet.groupby(codes, sort=False).agg(
+        TweetCount=('UserId', 'size'),
+        URLCount=('URLCount', 'sum'),
+        MentionCount=('MentionCount', 'sum'),
+        HashtagCount=('HashtagCount', 'sum'),
+        MeanTimeBetweenTweets=('TimeDiff', 'mean'),
+        MaxTimeBetweenTweets=('TimeDiff', 'max')
+    )
+    stats.insert(0, 'UserId', user_ids[stats.index])
+    return stats.reset_index(drop=True)
+
+
+class TweetStatsAccumulator:
+    # Compteurs entiers conservés pour chaque utilisateur
+    COUNT_COLUMNS = ['TweetCount', 'URLCount', 'MentionCount', 'HashtagCount', 'TimeDiffCount']
+    # Colonnes de l'état persisté (LastCreatedAt en nanosecondes depuis l'époque Unix)
+    STATE_COLUMNS = ['UserId'] + COUNT_COLUMNS + ['TimeDiffSum', 'TimeDiffMax', 'LastCreatedAt']
+
+    def __init__(self, capacity=1024):
+        """
+        Accumulateurs par utilisateur alimentés bloc par bloc (compteurs, sommes, max et dernier horodatage).
+        La mémoire utilisée dépend du nombre d'utilisateurs et non du nombre de tweets, et le coût d'une
+        mise à jour dépend seulement de la taille du bloc ajouté.
+        :param capacity: Nombre initial de lignes allouées (doublé au besoin).
+        """
+        self.user_ids = []
+        self.positions = {}  # UserId -> ligne dans les tableaux d'état
+        self.arrays = self.allocate(capacity)
+
+    @classmethod
+    def allocate(cls, capacity):
+        """Tableaux d'état vides pour `capacity` utilisateurs."""
+        arrays = {name: np.zeros(capacity, dtype='int64') for name in cls.COUNT_COLUMNS}
+        arrays['TimeDiffSum'] = np.zeros(capacity, dtype='float64')
+        arrays['TimeDiffMax'] = np.full(capacity, np.nan, dtype='float64')
+        arrays['LastCreatedAt'] = np.full(capacity, NAT, dtype='int64')
+        return arrays
+
+    def rows(self, user_ids):
+        """
+        Lignes d'état des utilisateurs donnés ; les utilisateurs inconnus reçoivent une nouvelle ligne.
+        :param user_ids: Identifiants distincts.
+        """
+        rows = np.empty(len(user_ids), dtype='int64')
+        for i, user in enumerate(user_ids):
+            row = self.positions.get(user)
+            if row is None:
+                row = self.positions[user] = len(self.user_ids)
+                self.user_ids.append(user)
+            rows[i] = row
+
+        capacity = len(self.arrays['TweetCount'])
+        if len(self.user_ids) > capacity:
+            new_capacity = max(2 * capacity, len(self.user_ids))
+            grown = self.allocate(new_capacity)
+            for name, values in self.arrays.items():
+                grown[name][:capacity] = values
+            self.arrays = grown
+        return rows
+
+    def update(self, chunk):
+        """
+        Ajoute un bloc de tweets (colonnes 0 = UserId, 2 = texte, 3 = date) aux accumulateurs.
+        Les écarts entre tweets suivent l'ordre du fichier, comme `groupby(0).diff()` sur le fichier complet.
+        :param chunk: DataFrame brut lu depuis un fichier de tweets.
+        :return: Identifiants des utilisateurs touchés par le bloc.
+        """
+        tweets = tweet_columns(chunk)
+        codes, user_ids = pd.factorize(tweets['UserId'])
+        rows = self.rows(user_ids.tolist())
+        # L'état garde les dates en nanosecondes (format persisté) ; les écarts sont calculés en secondes
+        created = tweets['CreatedAt'].to_numpy()
+
+        # Écart avec le tweet précédent du même utilisateur, y compris celui vu dans un bloc antérieur
+        minutes = time_gaps(codes, created)
+        first_rows = ~pd.Series(codes).duplicated(keep='first').values
+        last_seen = self.arrays['LastCreatedAt'][rows[codes[first_rows]]]
+        previous = np.where(last_seen == NAT, MISSING, last_seen // 10 ** 9)
+        valid = (previous != MISSING) & (created[first_rows] != MISSING)
+        minutes[np.flatnonzero(first_rows)[valid]] = np.abs(created[first_rows][valid] - previous[valid]) / 60
+
+        counted = ~np.isnan(minutes)
+        n_users = len(user_ids)
+        self.arrays['TweetCount'][rows] += np.bincount(codes, minlength=n_users)
+        for name in ['URLCount', 'MentionCount', 'HashtagCount']:
+            self.arrays[name][rows] += np.bincount(codes, weights=tweets[name].values, minlength=n_users).astype('int64')
+        self.arrays['TimeDiffCount'][rows] += np.bincount(codes[counted], minlength=n_users)
+        self.arrays['TimeDiffSum'][rows] += np.bincount(codes[counted], weights=minutes[counted], minlength=n_users)
+        chunk_max = pd.Series(minutes).groupby(codes, sort=False).max().reindex(range(n_users)).values
+        self.arrays['TimeDiffMax'][rows] = np.fmax(self.arrays['TimeDiffMax'][rows], chunk_max)
+
+        last_rows = ~pd.Series(codes).duplicated(keep='last').values
+        last_created = created[last_rows]
+        self.arrays['LastCreatedAt'][rows[codes[last_rows]]] = np.where(last_created == MISSING, NAT,
+                                                                        last_created * 10 ** 9)
+        return user_ids
+
+    def result(self, user_ids=None):
+        """
+        Retourne les statistiques par utilisateur.
+        :param user_ids: Utilisateurs demandés (tous par défaut) ; ceux sans tweet sont ignorés.
+        :return: DataFrame avec les colonnes STATS_COLUMNS.
+        """
+        if user_ids is None:
+            users = self.user_ids
+            rows = np.arange(len(users))
+        else:
+            users = [user for user in user_ids if user in self.positions]
+            rows = np.array([self.positions[user] for user in users], dtype='int64')
+
+        arrays = {name: values[rows] for name, values in self.arrays.items()}
+        counts = arrays['TimeDiffCount']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(counts > 0, arrays['TimeDiffSum'] / counts, np.nan)
+        return pd.DataFrame({
+            'UserId': users,
+            'TweetCount': arrays['TweetCount'],
+            'URLCount': arrays['URLCount'],
+            'MentionCount': arrays['MentionCount'],
+            'HashtagCount': arrays['HashtagCount'],
+            'MeanTimeBetweenTweets': mean,
+            'MaxTimeBetweenTweets': arrays['TimeDiffMax']
+        }, columns=STATS_COLUMNS)
+
+    def to_frame(self):
+        """État complet sous forme de DataFrame (une ligne par utilisateur)."""
+        size = len(self.user_ids)
+        state = pd.DataFrame({name: values[:size] for name, values in self.arrays.items()})
+        state.insert(0, 'UserId', self.user_ids)
+        return state[self.STATE_COLUMNS]
+
+    def save(self, path):
+        """Enregistre l'état des accumulateurs (format colonnes typé, CSV en repli)."""
+        return save_frame(self.to_frame(), path)
+
+    @classmethod
+    def load(cls, path):
+        """Recharge un état enregistré par save()."""
+        state = load_frame(path)
+        accumulator = cls(capacity=max(len(state), 1024))
+        accumulator.user_ids = state['UserId'].tolist()
+        accumulator.positions = {user: row for row, user in enumerate(accumulator.user_ids)}
+        for name in cls.STATE_COLUMNS[1:]:
+            accumulator.arrays[name][:len(state)] = state[name].values
+        return accumulator
+
+
+def aggregate_tweets_in_chunks(tweets_file, chunksize=100000):
+    """
+    Lit un fichier de tweets par blocs et retourne les statistiques par utilisateur.
+    :param tweets_file: Chemin du fichier de tweets (séparé par des tabulations, sans en-tête).
+    :param chunksize: Nombre de lignes lues à la fois.
+    """
+    accumulator = TweetStatsAccumulator()
+    for chunk in read_tweets(tweets_file, chunksize):
+        accumulator.update(chunk)
+    return accumulator.result()